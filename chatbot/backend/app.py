@@ -12,6 +12,8 @@ from gemini_service import GeminiService
 from nvidia_service import NvidiaService
 from code_executor import AgentService
 from mcp_server import MCPServer, run_async
+from services.response_cache import ResponseCache
+from utils.image_pipeline import ImagePipeline
 from utils.response_formatter import prepare_response
 from chatbot.backend.routes.agent import agent_bp # Added for agent routes
 import config
@@ -35,10 +37,30 @@ CORS(app, resources={r"/*": {"origins": config.CORS_ORIGINS}})
 app.register_blueprint(agent_bp)
 
 # Initialize the AI services
-gemini_service = GeminiService()
-nvidia_service = NvidiaService(config.NVIDIA_API_KEY, config.NVIDIA_MODEL)
+gemini_service = GeminiService(
+    max_sessions=config.CONVERSATION_MAX_SESSIONS,
+    session_ttl_seconds=config.CONVERSATION_TTL_SECONDS,
+    max_history_messages=config.CONVERSATION_MAX_MESSAGES
+)
+nvidia_service = NvidiaService(
+    config.NVIDIA_API_KEY,
+    config.NVIDIA_MODEL,
+    max_sessions=config.CONVERSATION_MAX_SESSIONS,
+    session_ttl_seconds=config.CONVERSATION_TTL_SECONDS,
+    max_history_messages=config.CONVERSATION_MAX_MESSAGES,
+    image_pipeline=ImagePipeline(
+        config.IMAGE_CACHE_DIR,
+        max_base64_bytes=config.IMAGE_MAX_BASE64_BYTES,
+        max_dimension=config.IMAGE_MAX_DIMENSION
+    )
+)
 agent_service = AgentService()
-mcp_server = MCPServer()
+mcp_server = MCPServer(config.MCP_SERVER_URL)
+response_cache = ResponseCache(
+    cache_dir=config.RESPONSE_CACHE_DIR,
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS
+) if config.RESPONSE_CACHE_ENABLED else None
 
 # Initialize MCP server connection
 try:
@@ -73,6 +95,31 @@ def allowed_file(filename):
     """Check if the file extension is allowed."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def cached_gemini_response(prompt, session_id="default"):
+    """
+    Generate a Gemini response for a self-contained prompt, using the response cache.
+
+    Args:
+        prompt (str): The prompt. It must not depend on earlier conversation turns.
+        session_id (str, optional): The conversation a generated response is added to.
+
+    Returns:
+        str: The generated or cached response.
+    """
+    if not response_cache:
+        return gemini_service.generate_response(prompt, session_id=session_id)
+
+    cache_key = response_cache.make_key(config.GEMINI_MODEL, prompt)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached["text"]
+
+    response_text = gemini_service.generate_response(prompt, session_id=session_id)
+    if response_text and not response_text.startswith("I'm sorry"):
+        response_cache.set(cache_key, response_text, config.GEMINI_MODEL)
+
+    return response_text
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
@@ -103,19 +150,19 @@ def chat():
         # Try NVIDIA service first if requested
         if file_path:
             # NVIDIA service can handle images
-            response_text, success = nvidia_service.generate_response(user_message, file_path)
+            response_text, success = nvidia_service.generate_response(user_message, file_path, session_id=chat_id)
         else:
             # Standard text response
-            response_text, success = nvidia_service.generate_response(user_message)
+            response_text, success = nvidia_service.generate_response(user_message, session_id=chat_id)
 
         # If NVIDIA API fails, fall back to Gemini
         if not success:
             print(f"NVIDIA API connection failed, falling back to Gemini")
-            response_text = gemini_service.generate_response(user_message)
+            response_text = gemini_service.generate_response(user_message, session_id=chat_id)
     else:
         # Use Gemini service
         print(f"Using Gemini model for this request")
-        response_text = gemini_service.generate_response(user_message)
+        response_text = gemini_service.generate_response(user_message, session_id=chat_id)
 
     # Prepare the response
     response = prepare_response(response_text)
@@ -176,11 +223,12 @@ def reset():
     """
     data = request.json or {}
     model = data.get('model', config.DEFAULT_MODEL).lower()
+    chat_id = data.get('chat_id', "default")
 
     if model == "nvidia":
-        result = nvidia_service.reset_chat()
+        result = nvidia_service.reset_chat(chat_id)
     else:
-        result = gemini_service.reset_chat()
+        result = gemini_service.reset_chat(chat_id)
 
     return jsonify({"message": result})
 
@@ -217,6 +265,9 @@ def upload_file():
             "mimetype": file.mimetype
         }
 
+        # Each upload starts a new chat
+        chat_id = str(int(time.time()))
+
         # Determine the file type and generate an appropriate prompt
         file_type = file.mimetype
         file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
@@ -225,11 +276,11 @@ def upload_file():
         if file_type.startswith('image/'):
             # For images, use NVIDIA service which can handle images better
             prompt = f"I've uploaded an image file named {filename}. Please analyze this image and describe what you see in detail."
-            response_text, success = nvidia_service.generate_response(prompt, file_path)
+            response_text, success = nvidia_service.generate_response(prompt, file_path, session_id=chat_id)
 
             # Fall back to Gemini if NVIDIA fails
             if not success:
-                response_text = gemini_service.generate_response(f"I've uploaded an image file named {filename}. Please note that you can't see the image, but I'd like you to help me understand what kinds of information I might extract from images like this.")
+                response_text = cached_gemini_response(f"I've uploaded an image file named {filename}. Please note that you can't see the image, but I'd like you to help me understand what kinds of information I might extract from images like this.", chat_id)
 
         elif file_type.startswith('text/') or file_extension in ['txt', 'csv', 'json']:
             # For text files, read the content and send it to the AI
@@ -243,19 +294,19 @@ def upload_file():
                     file_content = file_content[:max_length] + "...[content truncated due to length]"
 
                 prompt = f"I've uploaded a text file named {filename}. Here's the content:\n\n{file_content}\n\nPlease analyze this content and provide insights."
-                response_text = gemini_service.generate_response(prompt)
+                response_text = cached_gemini_response(prompt, chat_id)
             except Exception as e:
                 response_text = f"I encountered an error while reading the file: {str(e)}. Please make sure the file is a valid text file with proper encoding."
 
         elif file_extension in ['pdf', 'docx']:
             # For documents, we can't process them directly but can acknowledge them
             prompt = f"I've uploaded a document file named {filename} of type {file_type}. While I can't read the content directly, can you tell me what kind of information is typically found in {file_extension.upper()} files and how I might extract and analyze that data?"
-            response_text = gemini_service.generate_response(prompt)
+            response_text = cached_gemini_response(prompt, chat_id)
 
         else:
             # For other file types
             prompt = f"I've uploaded a file named {filename} of type {file_type}. Can you tell me more about this file type and how I might work with it?"
-            response_text = gemini_service.generate_response(prompt)
+            response_text = cached_gemini_response(prompt, chat_id)
 
         # Prepare the response
         response = prepare_response(response_text)
@@ -264,7 +315,6 @@ def upload_file():
 
         # Save to chat history
         try:
-            chat_id = str(int(time.time()))
             history_file = os.path.join(HISTORY_FOLDER, f"{chat_id}.json")
 
             # Create a new chat history entry
@@ -425,7 +475,7 @@ def stream_response():
     """
     Stream a response from the AI model.
 
-    Expects a JSON payload with a 'message' field and optional 'model' field.
+    Expects a JSON payload with a 'message' field and optional 'model' and 'chat_id' fields.
     Returns a streaming response with the AI's reply.
     """
     data = request.json
@@ -435,6 +485,7 @@ def stream_response():
 
     user_message = data['message']
     model = data.get('model', config.DEFAULT_MODEL).lower()
+    chat_id = data.get('chat_id', "default")
 
     print(f"Streaming response for message: {user_message[:100]}... using model: {model}")
 
@@ -470,7 +521,7 @@ def stream_response():
 
             if "```python" in user_message or "generate code" in user_message.lower() or "write code" in user_message.lower():
                 # For code generation requests
-                response_text, success = nvidia_service.generate_response(user_message)
+                response_text, success = nvidia_service.generate_response(user_message, session_id=chat_id)
 
                 if not success:
                     # Fall back to Gemini if NVIDIA fails
@@ -478,11 +529,11 @@ def stream_response():
                         "type": "status",
                         "text": "NVIDIA API connection failed, falling back to Gemini..."
                     }) + "\n"
-                    response_text = gemini_service.generate_response(user_message)
+                    response_text = gemini_service.generate_response(user_message, session_id=chat_id)
                     actual_model_used = "gemini"
             else:
                 # For regular requests
-                response_text, success = nvidia_service.generate_response(user_message)
+                response_text, success = nvidia_service.generate_response(user_message, session_id=chat_id)
 
                 if not success:
                     # Fall back to Gemini if NVIDIA fails
@@ -490,11 +541,11 @@ def stream_response():
                         "type": "status",
                         "text": "NVIDIA API connection failed, falling back to Gemini..."
                     }) + "\n"
-                    response_text = gemini_service.generate_response(user_message)
+                    response_text = gemini_service.generate_response(user_message, session_id=chat_id)
                     actual_model_used = "gemini"
         else:
             # Use Gemini service directly
-            response_text = gemini_service.generate_response(user_message)
+            response_text = gemini_service.generate_response(user_message, session_id=chat_id)
 
         # Check if this is an MCP-related request
         print(f"Checking if message is MCP-related: {user_message}")
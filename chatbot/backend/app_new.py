@@ -1,6 +1,7 @@
 """
 Main application file for the chatbot API.
 """
+import atexit
 import logging
 import os
 import asyncio
@@ -10,9 +11,21 @@ from flask_cors import CORS
 import config
 from services.gemini_service import GeminiService
 from services.nvidia_service import NvidiaService
+from services.openai_service import OpenAICompatibleService
+from services.provider_registry import ProviderRegistry
 from services.mcp_service import MCPService
+from services.mcp.result_cache import ToolResultCache
+from services.mcp.timeouts import AdaptiveTimeouts
+from services.mcp.jobs import MCPJobQueue
 from services.chat_service import ChatService
 from services.agent_service import AgentService
+from services.model_router import ModelRouter
+from services.response_cache import ResponseCache
+from services.question_cache import QuestionCache
+from services.single_flight import StreamCoalescer
+from services.rate_limiter import ProviderRateLimiter, RetryPolicy
+from services.warmup_service import WarmupService
+from services.background_loop import BackgroundLoop
 from routes.chat import chat_bp, init_routes as init_chat_routes
 from routes.mcp import mcp_bp, init_routes as init_mcp_routes
 from routes.health import health_bp, init_routes as init_health_routes
@@ -37,33 +50,167 @@ app = Flask(__name__)
 # Enable CORS for all routes
 CORS(app, supports_credentials=True, origins="*", allow_headers=["Content-Type", "Authorization", "Accept"])
 
+# Initialize the client-side rate limiter and retry policy shared by the model providers
+rate_limiter = ProviderRateLimiter(config.RATE_LIMITS, max_wait_seconds=config.RATE_LIMIT_MAX_WAIT_SECONDS)
+retry_policy = RetryPolicy(
+    max_retries=config.RETRY_MAX_RETRIES,
+    base_delay=config.RETRY_BASE_DELAY_SECONDS,
+    max_delay=config.RETRY_MAX_DELAY_SECONDS,
+    rate_limiter=rate_limiter
+)
+
+# Long-lived event loop for pooled connections shared across requests
+background_loop = BackgroundLoop()
+
 # Initialize services
-gemini_service = GeminiService(api_key=config.GEMINI_API_KEY)
-nvidia_service = NvidiaService(api_key=config.NVIDIA_API_KEY)
-mcp_service = MCPService()
+gemini_service = GeminiService(api_key=config.GEMINI_API_KEY, rate_limiter=rate_limiter, retry_policy=retry_policy)
+nvidia_service = NvidiaService(
+    api_key=config.NVIDIA_API_KEY,
+    rate_limiter=rate_limiter,
+    retry_policy=retry_policy,
+    background_loop=background_loop,
+    pool_limit=config.NVIDIA_POOL_LIMIT,
+    pool_limit_per_host=config.NVIDIA_POOL_LIMIT_PER_HOST,
+    connect_timeout=config.NVIDIA_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=config.NVIDIA_READ_TIMEOUT_SECONDS,
+    keepalive_timeout=config.NVIDIA_KEEPALIVE_SECONDS
+)
+
+# Additional OpenAI-compatible providers (e.g. a local inference server), each with its own pool
+openai_providers = {
+    name: OpenAICompatibleService.from_config(
+        name, spec, rate_limiter=rate_limiter, retry_policy=retry_policy, background_loop=background_loop
+    )
+    for name, spec in config.OPENAI_COMPATIBLE_PROVIDERS.items()
+}
+
+# Map requested models to providers
+provider_registry = ProviderRegistry("gemini", model_map=config.MODEL_PROVIDERS)
+provider_registry.register("gemini", gemini_service)
+provider_registry.register("nvidia", nvidia_service)
+for name, provider in openai_providers.items():
+    provider_registry.register(name, provider)
+atexit.register(lambda: run_async(provider_registry.close()))
+mcp_service = MCPService(
+    server_url=config.MCP_SERVER_URL,
+    servers=config.MCP_SERVERS,
+    catalog_timeout=config.MCP_SERVER_CATALOG_TIMEOUT_SECONDS,
+    background_loop=background_loop,
+    ping_interval=config.MCP_PING_INTERVAL_SECONDS,
+    max_concurrent_calls=config.MCP_MAX_CONCURRENT_CALLS,
+    snapshot_path=config.MCP_CATALOG_SNAPSHOT_PATH,
+    result_cache=ToolResultCache(
+        default_ttl_seconds=config.MCP_RESULT_CACHE_TTL_SECONDS,
+        tool_ttls=config.MCP_RESULT_CACHE_TOOL_TTLS,
+        read_only_tools=config.MCP_READ_ONLY_TOOLS,
+        max_entries=config.MCP_RESULT_CACHE_MAX_ENTRIES
+    ) if config.MCP_RESULT_CACHE_ENABLED else None,
+    timeouts=AdaptiveTimeouts(
+        default_seconds=config.MCP_TIMEOUT_DEFAULT_SECONDS,
+        floor_seconds=config.MCP_TIMEOUT_FLOOR_SECONDS,
+        ceiling_seconds=config.MCP_TIMEOUT_CEILING_SECONDS,
+        percentile=config.MCP_TIMEOUT_PERCENTILE,
+        multiplier=config.MCP_TIMEOUT_MULTIPLIER,
+        min_samples=config.MCP_TIMEOUT_MIN_SAMPLES
+    )
+)
+atexit.register(lambda: run_async(mcp_service.disconnect()))
 agent_service = AgentService()
 
-# Connect to MCP server and fetch available tools
-logger.info("Connecting to MCP server...")
-mcp_connected = run_async(mcp_service.connect())
-if mcp_connected:
-    # Get available tools
-    available_tools = run_async(mcp_service.list_available_tools())
-    logger.info(f"Fetched {len(available_tools)} tools from MCP server")
+# Pre-create models and open provider connections in the background
+warmup_service = WarmupService(gemini_service, nvidia_service, probe=config.WARMUP_PROBE, providers=openai_providers)
+if config.WARMUP_ENABLED:
+    warmup_service.start()
 
-    # Update Gemini service with available tools
-    gemini_service.set_available_tools(available_tools)
+def apply_tool_catalog(tools_service, diff):
+    """Hot-swap a new MCP tool catalog into the Gemini service."""
+    # Update Gemini service with available tools (rebuilds the tool index and prompt report)
+    gemini_service.set_available_tools(tools_service.describe_tools())
     logger.info("Updated Gemini service with available tools")
+
+    # Let Gemini call the tools directly through the MCP service
+    if config.FUNCTION_CALLING_ENABLED:
+        gemini_service.enable_function_calling(
+            tools_service.available_tools,
+            mcp_service.call_tool,
+            max_rounds=config.FUNCTION_CALLING_MAX_ROUNDS
+        )
+
+mcp_service.tools_service.on_change(apply_tool_catalog)
+
+# Serve from the catalog snapshot right away and connect in the background;
+# without a snapshot, wait for the MCP server as before
+if mcp_service.tools_service.load_snapshot():
+    logger.info("Connecting to MCP server in the background...")
+    background_loop.submit(mcp_service.connect())
 else:
-    logger.warning("Failed to connect to MCP server")
+    logger.info("Connecting to MCP server...")
+    if not run_async(mcp_service.connect()):
+        logger.warning("Failed to connect to MCP server")
+
+mcp_service.tools_service.start_refresh(background_loop, config.MCP_CATALOG_TTL_SECONDS)
+
+# Run long tool calls as background jobs, resuming those journaled before a restart
+mcp_jobs = None
+if config.MCP_JOBS_ENABLED:
+    mcp_jobs = MCPJobQueue(
+        mcp_service,
+        journal_path=config.MCP_JOBS_JOURNAL_PATH,
+        workers=config.MCP_JOBS_WORKERS,
+        max_queued=config.MCP_JOBS_MAX_QUEUED,
+        job_timeout_seconds=config.MCP_JOB_TIMEOUT_SECONDS,
+        retention_seconds=config.MCP_JOB_RETENTION_SECONDS,
+        compact_after=config.MCP_JOBS_JOURNAL_COMPACT_AFTER
+    )
+    mcp_jobs.start()
+    atexit.register(mcp_jobs.stop)
+
+# Initialize the model router used for model=auto
+model_router = ModelRouter(
+    GeminiService.MODELS,
+    latency_target_ms=config.MODEL_ROUTER_LATENCY_TARGET_MS,
+    decision_log_path=config.MODEL_ROUTER_LOG_PATH
+)
+
+# Initialize the exact-match response cache
+response_cache = ResponseCache(
+    cache_dir=config.RESPONSE_CACHE_DIR,
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS,
+    max_disk_entries=config.RESPONSE_CACHE_MAX_DISK_ENTRIES
+) if config.RESPONSE_CACHE_ENABLED else None
+
+# Initialize the near-duplicate question cache
+question_cache = QuestionCache(
+    max_distance=config.QUESTION_CACHE_MAX_DISTANCE,
+    max_entries=config.QUESTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.QUESTION_CACHE_TTL_SECONDS
+) if config.QUESTION_CACHE_ENABLED else None
 
 # Initialize chat service
-chat_service = ChatService(gemini_service, nvidia_service, mcp_service)
+chat_service = ChatService(
+    gemini_service,
+    nvidia_service,
+    mcp_service,
+    model_router=model_router,
+    response_cache=response_cache,
+    question_cache=question_cache,
+    request_coalescer=StreamCoalescer(),
+    speculative_tool_calls=config.SPECULATIVE_TOOL_CALLS_ENABLED,
+    provider_registry=provider_registry
+)
 
 # Initialize routes
 init_chat_routes(chat_service)
-init_mcp_routes(mcp_service)
-init_health_routes(mcp_service)
+init_mcp_routes(mcp_service, jobs=mcp_jobs)
+init_health_routes(
+    mcp_service,
+    jobs=mcp_jobs,
+    limiter=rate_limiter,
+    warmup=warmup_service if config.WARMUP_ENABLED else None,
+    prompts=gemini_service.prompt_service,
+    registry=provider_registry
+)
 
 # Register blueprints
 app.register_blueprint(chat_bp)
@@ -1,6 +1,7 @@
 """
 Configuration settings for the chatbot application.
 """
+import json
 import os
 from dotenv import load_dotenv
 
@@ -14,10 +15,135 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 # NVIDIA API settings
 NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY", "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")
 NVIDIA_MODEL = os.getenv("NVIDIA_MODEL", "mistralai/mistral-medium-3-instruct")
+NVIDIA_POOL_LIMIT = int(os.getenv("NVIDIA_POOL_LIMIT", "16"))
+NVIDIA_POOL_LIMIT_PER_HOST = int(os.getenv("NVIDIA_POOL_LIMIT_PER_HOST", "8"))
+NVIDIA_CONNECT_TIMEOUT_SECONDS = float(os.getenv("NVIDIA_CONNECT_TIMEOUT_SECONDS", "10"))
+NVIDIA_READ_TIMEOUT_SECONDS = float(os.getenv("NVIDIA_READ_TIMEOUT_SECONDS", "60"))
+NVIDIA_KEEPALIVE_SECONDS = float(os.getenv("NVIDIA_KEEPALIVE_SECONDS", "60"))
+
+# Additional OpenAI-compatible providers, e.g. a local inference server:
+# {"local": {"base_url": "http://127.0.0.1:8000/v1", "model": "llama-3.1-8b-instruct",
+#            "api_key_env": null, "pool_limit": 32, "pool_limit_per_host": 32, "read_timeout": 120}}
+OPENAI_COMPATIBLE_PROVIDERS = json.loads(os.getenv("OPENAI_COMPATIBLE_PROVIDERS", "{}"))
+
+# Requested model -> "provider" or "provider:upstream-model"; keys may be glob patterns ("llama-*").
+# Provider names ("nvidia", "local") select themselves and anything unmapped goes to Gemini.
+MODEL_PROVIDERS = json.loads(os.getenv("MODEL_PROVIDERS", "{}"))
 
 # Default model to use (gemini or nvidia)
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gemini")
 
+# Model router settings (used when a request asks for model "auto")
+MODEL_ROUTER_LATENCY_TARGET_MS = int(os.getenv("MODEL_ROUTER_LATENCY_TARGET_MS", "4000"))
+MODEL_ROUTER_LOG_PATH = os.getenv("MODEL_ROUTER_LOG_PATH", os.path.join(os.path.dirname(__file__), "logs", "model_router.jsonl"))
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache", "responses"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+# Cap of the on-disk tier; expired and excess entries are swept at startup and every few hundred writes
+RESPONSE_CACHE_MAX_DISK_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_DISK_ENTRIES", "4096"))
+
+# Near-duplicate question cache settings
+QUESTION_CACHE_ENABLED = os.getenv("QUESTION_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+QUESTION_CACHE_MAX_DISTANCE = int(os.getenv("QUESTION_CACHE_MAX_DISTANCE", "3"))
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "2048"))
+QUESTION_CACHE_TTL_SECONDS = int(os.getenv("QUESTION_CACHE_TTL_SECONDS", "3600"))
+
+# Client-side rate limits per provider ("gemini") or provider:model ("gemini:gemini-2.5-pro")
+RATE_LIMITS = json.loads(os.getenv("RATE_LIMITS", json.dumps({
+    "gemini": {"requests_per_minute": 60, "tokens_per_minute": 1000000},
+    "gemini:gemini-2.5-pro": {"requests_per_minute": 5, "tokens_per_minute": 250000},
+    "nvidia": {"requests_per_minute": 40, "tokens_per_minute": 200000}
+})))
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_SECONDS", "60"))
+
+# Retry settings for provider calls
+RETRY_MAX_RETRIES = int(os.getenv("RETRY_MAX_RETRIES", "3"))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "20"))
+
+# Per-session conversation state of the legacy services (app.py)
+CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "1000"))
+CONVERSATION_TTL_SECONDS = int(os.getenv("CONVERSATION_TTL_SECONDS", "3600"))
+CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", "40"))
+
+# Image preprocessing for vision requests (legacy NVIDIA service)
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(os.path.dirname(__file__), "cache", "images"))
+IMAGE_MAX_BASE64_BYTES = int(os.getenv("IMAGE_MAX_BASE64_BYTES", "180000"))
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1568"))
+
+# MCP server URL; empty uses the default Zapier endpoint (point at loadtest.fake_server for offline runs)
+MCP_SERVER_URL = os.getenv("MCP_SERVER_URL") or None
+# Several MCP servers by name in priority order, e.g. {"zapier": "https://...", "internal": "http://..."};
+# their catalogs are merged and a tool name offered twice is renamed <server>__<tool> for later servers
+MCP_SERVERS = json.loads(os.getenv("MCP_SERVERS", "{}"))
+# Seconds to wait for each of several MCP servers at startup and per catalog fetch before going on without it
+MCP_SERVER_CATALOG_TIMEOUT_SECONDS = float(os.getenv("MCP_SERVER_CATALOG_TIMEOUT_SECONDS", "10"))
+
+# Persistent MCP session settings
+MCP_PING_INTERVAL_SECONDS = float(os.getenv("MCP_PING_INTERVAL_SECONDS", "30"))
+MCP_MAX_CONCURRENT_CALLS = int(os.getenv("MCP_MAX_CONCURRENT_CALLS", "16"))
+
+# MCP call timeouts: each tool's is its observed p99 latency times the multiplier, clamped to the
+# floor and ceiling, and the default until MCP_TIMEOUT_MIN_SAMPLES calls have been seen
+MCP_TIMEOUT_DEFAULT_SECONDS = float(os.getenv("MCP_TIMEOUT_DEFAULT_SECONDS", "60"))
+MCP_TIMEOUT_FLOOR_SECONDS = float(os.getenv("MCP_TIMEOUT_FLOOR_SECONDS", "5"))
+MCP_TIMEOUT_CEILING_SECONDS = float(os.getenv("MCP_TIMEOUT_CEILING_SECONDS", "120"))
+MCP_TIMEOUT_PERCENTILE = float(os.getenv("MCP_TIMEOUT_PERCENTILE", "0.99"))
+MCP_TIMEOUT_MULTIPLIER = float(os.getenv("MCP_TIMEOUT_MULTIPLIER", "3"))
+MCP_TIMEOUT_MIN_SAMPLES = int(os.getenv("MCP_TIMEOUT_MIN_SAMPLES", "20"))
+# Request deadline for MCP calls; clients may ask for another with an X-Request-Timeout header (seconds)
+MCP_REQUEST_TIMEOUT_SECONDS = float(os.getenv("MCP_REQUEST_TIMEOUT_SECONDS", "90"))
+MCP_REQUEST_TIMEOUT_MAX_SECONDS = float(os.getenv("MCP_REQUEST_TIMEOUT_MAX_SECONDS", "300"))
+
+# POST /api/mcp/batch limits
+MCP_BATCH_MAX_CALLS = int(os.getenv("MCP_BATCH_MAX_CALLS", "50"))
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "8"))
+
+# Seconds without progress from a running MCP tool before /api/mcp/call reports it is still running
+MCP_PROGRESS_HEARTBEAT_SECONDS = float(os.getenv("MCP_PROGRESS_HEARTBEAT_SECONDS", "5"))
+
+# Background MCP jobs (POST /api/mcp/jobs), journaled so they survive a restart
+MCP_JOBS_ENABLED = os.getenv("MCP_JOBS_ENABLED", "True").lower() in ("true", "1", "t")
+MCP_JOBS_JOURNAL_PATH = os.getenv("MCP_JOBS_JOURNAL_PATH", os.path.join(os.path.dirname(__file__), "cache", "mcp_jobs.jsonl"))
+MCP_JOBS_WORKERS = int(os.getenv("MCP_JOBS_WORKERS", "4"))
+MCP_JOBS_MAX_QUEUED = int(os.getenv("MCP_JOBS_MAX_QUEUED", "100"))
+MCP_JOB_TIMEOUT_SECONDS = float(os.getenv("MCP_JOB_TIMEOUT_SECONDS", "600"))
+MCP_JOB_RETENTION_SECONDS = float(os.getenv("MCP_JOB_RETENTION_SECONDS", "3600"))
+MCP_JOBS_JOURNAL_COMPACT_AFTER = int(os.getenv("MCP_JOBS_JOURNAL_COMPACT_AFTER", "1000"))
+MCP_JOB_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("MCP_JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# MCP tool catalog snapshot, loaded at startup and refreshed in the background
+MCP_CATALOG_SNAPSHOT_PATH = os.getenv("MCP_CATALOG_SNAPSHOT_PATH", os.path.join(os.path.dirname(__file__), "cache", "mcp_catalog.json"))
+MCP_CATALOG_TTL_SECONDS = float(os.getenv("MCP_CATALOG_TTL_SECONDS", "900"))
+
+# Cache of read-only MCP tool results; write tools invalidate their service's entries
+MCP_RESULT_CACHE_ENABLED = os.getenv("MCP_RESULT_CACHE_ENABLED", "True").lower() in ("true", "1", "t")
+MCP_RESULT_CACHE_TTL_SECONDS = float(os.getenv("MCP_RESULT_CACHE_TTL_SECONDS", "120"))
+MCP_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("MCP_RESULT_CACHE_MAX_ENTRIES", "1024"))
+# Per-tool TTLs by name or glob, e.g. {"gmail_find_*": 30, "google_drive_*": 600}; 0 disables caching
+MCP_RESULT_CACHE_TOOL_TTLS = json.loads(os.getenv("MCP_RESULT_CACHE_TOOL_TTLS", "{}"))
+# Extra read-only tools (names or globs) whose names the verb heuristic does not recognise
+MCP_READ_ONLY_TOOLS = [name.strip() for name in os.getenv("MCP_READ_ONLY_TOOLS", "").split(",") if name.strip()]
+
+# Native Gemini function calling of MCP tools
+FUNCTION_CALLING_ENABLED = os.getenv("FUNCTION_CALLING_ENABLED", "True").lower() in ("true", "1", "t")
+FUNCTION_CALLING_MAX_ROUNDS = int(os.getenv("FUNCTION_CALLING_MAX_ROUNDS", "5"))
+
+# Start detected read-only MCP lookups alongside the model stream (send/create tools are never speculated)
+SPECULATIVE_TOOL_CALLS_ENABLED = os.getenv("SPECULATIVE_TOOL_CALLS_ENABLED", "True").lower() in ("true", "1", "t")
+
+# Relevance filtering of the tools described in the system prompt (0 describes every tool)
+TOOL_PROMPT_TOP_K = int(os.getenv("TOOL_PROMPT_TOP_K", "8"))
+TOOL_PROMPT_HISTORY_MESSAGES = int(os.getenv("TOOL_PROMPT_HISTORY_MESSAGES", "2"))
+TOOL_PROMPT_FORMAT = os.getenv("TOOL_PROMPT_FORMAT", "compact")  # "compact" or "markdown"
+
+# Provider warm-up settings
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "True").lower() in ("true", "1", "t")
+WARMUP_PROBE = os.getenv("WARMUP_PROBE", "False").lower() in ("true", "1", "t")
+
 # Flask application settings
 DEBUG = os.getenv("DEBUG", "True").lower() in ("true", "1", "t")
 HOST = os.getenv("HOST", "127.0.0.1")
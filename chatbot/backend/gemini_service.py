@@ -3,12 +3,25 @@ Service for interacting with the Gemini API.
 """
 import google.generativeai as genai
 from config import GEMINI_API_KEY, GEMINI_MODEL
+from utils.session_store import SessionStore, trim_messages
+
+# Priming exchange every chat session starts with
+PRIMING_HISTORY = [
+    {"role": "user", "parts": ["System: You are a helpful AI assistant with access to external tools through the MCP (Multi-Cloud Protocol) server. When users ask about sending emails, creating meetings, finding files, or any other task that might require external tools, tell them you can help with that using your MCP tools. Do not list specific tools unless asked - just say you can help with the task. When you use these tools, the system will show a 'Connecting to tool...' message. Please introduce yourself briefly without mentioning these tools unless asked."]},
+    {"role": "model", "parts": ["I'm a helpful AI assistant ready to assist you with a wide range of tasks. How can I help you today?"]}
+]
 
 class GeminiService:
     """Service for interacting with the Gemini API."""
 
-    def __init__(self):
-        """Initialize the Gemini service."""
+    def __init__(self, max_sessions=1000, session_ttl_seconds=3600, max_history_messages=40):
+        """Initialize the Gemini service.
+
+        Args:
+            max_sessions (int): Maximum number of chat sessions kept in memory.
+            session_ttl_seconds (float): Idle chat sessions older than this are dropped.
+            max_history_messages (int): Maximum messages kept per chat session, including the priming exchange.
+        """
         # Configure the Gemini API with the API key
         genai.configure(api_key=GEMINI_API_KEY)
 
@@ -50,18 +63,42 @@ $$x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}$$
 IMPORTANT: Do not mention LaTeX formatting or MCP tools to the user unless they specifically ask about them. Just use these capabilities naturally in your responses.
 """
 
-        # Start a chat session with the system prompt
-        self.chat_session = self.model.start_chat(history=[
-            {"role": "user", "parts": ["System: You are a helpful AI assistant with access to external tools through the MCP (Multi-Cloud Protocol) server. When users ask about sending emails, creating meetings, finding files, or any other task that might require external tools, tell them you can help with that using your MCP tools. Do not list specific tools unless asked - just say you can help with the task. When you use these tools, the system will show a 'Connecting to tool...' message. Please introduce yourself briefly without mentioning these tools unless asked."]},
-            {"role": "model", "parts": ["I'm a helpful AI assistant ready to assist you with a wide range of tasks. How can I help you today?"]}
-        ])
+        # One chat session per conversation, each starting with the priming exchange
+        self.max_history_messages = max_history_messages
+        self.chat_sessions = SessionStore(self._new_chat, max_sessions=max_sessions, ttl_seconds=session_ttl_seconds)
+
+    def _new_chat(self):
+        """Start a chat session with the system prompt."""
+        return self.model.start_chat(history=PRIMING_HISTORY)
 
-    def generate_response(self, message):
+    def _send(self, session_id, message):
+        """
+        Send a message in a session's chat, keeping only its recent exchanges.
+
+        Args:
+            session_id (str): The conversation the message belongs to.
+            message (str): The message to send.
+
+        Returns:
+            The Gemini response.
+        """
+        chat_session = self.chat_sessions.get(session_id)
+        response = chat_session.send_message(message)
+
+        if len(chat_session.history) > self.max_history_messages:
+            chat_session.history = trim_messages(
+                chat_session.history, self.max_history_messages, keep_first=len(PRIMING_HISTORY)
+            )
+
+        return response
+
+    def generate_response(self, message, session_id="default"):
         """
         Generate a response from the Gemini API.
 
         Args:
             message (str): The user's message.
+            session_id (str, optional): The conversation the message belongs to.
 
         Returns:
             str: The generated response.
@@ -80,10 +117,10 @@ IMPORTANT: Do not mention LaTeX formatting or MCP tools to the user unless they
                 # Add a reminder about MCP tools
                 reminder = "Remember: You have access to MCP tools for emails, meetings, files, and more. Tell the user you can help with these tasks using your tools."
                 enhanced_message = f"{message}\n\n{reminder}"
-                response = self.chat_session.send_message(enhanced_message)
+                response = self._send(session_id, enhanced_message)
             else:
                 # Regular message
-                response = self.chat_session.send_message(message)
+                response = self._send(session_id, message)
 
             # Return the response text
             return response.text
@@ -93,7 +130,7 @@ IMPORTANT: Do not mention LaTeX formatting or MCP tools to the user unless they
             # Try to recreate the chat session and try again
             try:
                 print("Attempting to recreate chat session and retry...")
-                self.reset_chat()
+                self.reset_chat(session_id)
 
                 # Check if this is a request about MCP tools
                 is_mcp_related = any(keyword in message.lower() for keyword in [
@@ -108,21 +145,21 @@ IMPORTANT: Do not mention LaTeX formatting or MCP tools to the user unless they
                     # Add a reminder about MCP tools
                     reminder = "Remember: You have access to MCP tools for emails, meetings, files, and more. Tell the user you can help with these tasks using your tools."
                     enhanced_message = f"{message}\n\n{reminder}"
-                    response = self.chat_session.send_message(enhanced_message)
+                    response = self._send(session_id, enhanced_message)
                 else:
                     # Regular message
-                    response = self.chat_session.send_message(message)
+                    response = self._send(session_id, message)
 
                 return response.text
             except Exception as retry_error:
                 print(f"Error on retry: {retry_error}")
                 return f"I'm sorry, I encountered an error communicating with the Gemini API. Please try again later."
 
-    def reset_chat(self):
-        """Reset the chat history."""
-        # Start a new chat session with the system prompt
-        self.chat_session = self.model.start_chat(history=[
-            {"role": "user", "parts": ["System: You are a helpful AI assistant with access to external tools through the MCP (Multi-Cloud Protocol) server. When users ask about sending emails, creating meetings, finding files, or any other task that might require external tools, tell them you can help with that using your MCP tools. Do not list specific tools unless asked - just say you can help with the task. When you use these tools, the system will show a 'Connecting to tool...' message. Please introduce yourself briefly without mentioning these tools unless asked."]},
-            {"role": "model", "parts": ["I'm a helpful AI assistant ready to assist you with a wide range of tasks. How can I help you today?"]}
-        ])
+    def reset_chat(self, session_id="default"):
+        """Reset the chat history.
+
+        Args:
+            session_id (str, optional): The conversation to reset.
+        """
+        self.chat_sessions.reset(session_id)
         return "Chat history has been reset."
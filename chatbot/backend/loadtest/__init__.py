@@ -0,0 +1,3 @@
+"""
+Offline load testing of the MCP code paths against a local stand-in server.
+"""
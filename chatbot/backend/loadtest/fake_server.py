@@ -0,0 +1,163 @@
+"""
+Local stand-in for the Zapier MCP server, serving a synthetic tool catalog.
+
+Run it from the backend directory and point the app or the harness at it:
+
+    python -m loadtest.fake_server --tools 200 --latency-ms 80 --error-rate 0.01
+    MCP_SERVER_URL=http://127.0.0.1:8765/mcp python app_new.py
+"""
+import argparse
+import asyncio
+import logging
+import random
+from typing import Dict, List, Any
+
+from fastmcp import FastMCP, Context
+from fastmcp.exceptions import ToolError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Services and actions the synthetic tool names are built from, so that name-based
+# policies (read-only detection, service grouping) behave as they do against Zapier
+SERVICES = ["gmail", "google_drive", "google_calendar", "slack", "notion", "zoom", "github", "trello"]
+ACTIONS = ["find_email", "search_files", "get_event", "list_channels", "find_page",
+           "send_email", "create_meeting", "update_record", "add_comment"]
+
+def synthetic_tool_names(count: int) -> List[str]:
+    """
+    Build a catalog of tool names.
+
+    Args:
+        count: Number of tools.
+
+    Returns:
+        Names like gmail_find_email, cycling through services and actions and numbering
+        repeats (gmail_find_email_2) once every combination is used.
+    """
+    names = []
+    combinations = [(service, action) for action in ACTIONS for service in SERVICES]
+    for index in range(count):
+        service, action = combinations[index % len(combinations)]
+        round_number = index // len(combinations)
+        names.append(f"{service}_{action}" + (f"_{round_number + 1}" if round_number else ""))
+    return names
+
+class FaultProfile:
+    """Latency, failure and payload behaviour injected into every synthetic tool."""
+
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 0.0, slow_rate: float = 0.0,
+                 slow_ms: float = 0.0, error_rate: float = 0.0, payload_bytes: int = 512,
+                 progress_steps: int = 0, seed: int = None):
+        """
+        Initialize the profile.
+
+        Args:
+            latency_ms: Base latency of every call.
+            jitter_ms: Uniform random latency added on top of the base.
+            slow_rate: Fraction of calls that take ``slow_ms`` extra, to shape the tail.
+            slow_ms: Extra latency of slow calls.
+            error_rate: Fraction of calls that fail with a tool error.
+            payload_bytes: Size of the filler text in each result.
+            progress_steps: Progress notifications sent over the course of each call.
+            seed: Optional random seed for reproducible runs.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.payload_bytes = payload_bytes
+        self.progress_steps = progress_steps
+        self.random = random.Random(seed)
+
+    def delay_seconds(self) -> float:
+        """Draw the latency of one call."""
+        delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+        if self.random.random() < self.slow_rate:
+            delay += self.slow_ms
+        return delay / 1000
+
+    def should_fail(self) -> bool:
+        """Decide whether one call fails."""
+        return self.random.random() < self.error_rate
+
+def build_server(tool_count: int = 50, profile: FaultProfile = None) -> FastMCP:
+    """
+    Build the stand-in server.
+
+    Args:
+        tool_count: Number of synthetic tools in the catalog.
+        profile: The injected latency, errors and payload size.
+
+    Returns:
+        The FastMCP server, not yet running.
+    """
+    profile = profile or FaultProfile()
+    server = FastMCP(name="loadtest-mcp")
+
+    for tool_name in synthetic_tool_names(tool_count):
+        server.tool(name=tool_name, description=f"Synthetic {tool_name.replace('_', ' ')} tool for load tests")(
+            _make_handler(tool_name, profile)
+        )
+
+    logger.info(f"Built synthetic MCP catalog of {tool_count} tools")
+    return server
+
+def _make_handler(tool_name: str, profile: FaultProfile):
+    """Create the handler of one synthetic tool."""
+    async def handler(query: str, ctx: Context, limit: int = 10, instructions: str = "") -> Dict[str, Any]:
+        delay = profile.delay_seconds()
+        steps = profile.progress_steps
+
+        # Spread the latency over the progress notifications
+        for step in range(steps):
+            await asyncio.sleep(delay / (steps + 1))
+            await ctx.report_progress(step + 1, steps + 1)
+        await asyncio.sleep(delay / (steps + 1) if steps else delay)
+
+        if profile.should_fail():
+            raise ToolError(f"Injected failure in {tool_name}")
+
+        return {
+            "tool": tool_name,
+            "query": query,
+            "results": [{"id": f"{tool_name}-{index}", "title": f"{query} #{index}"} for index in range(min(limit, 5))],
+            "payload": "x" * profile.payload_bytes
+        }
+
+    return handler
+
+def main():
+    """Run the stand-in server over streamable HTTP."""
+    parser = argparse.ArgumentParser(description="Local stand-in MCP server with a synthetic tool catalog")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tools", type=int, default=50, help="number of synthetic tools")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of calls given --slow-ms extra latency")
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--progress-steps", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    profile = FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        error_rate=args.error_rate,
+        payload_bytes=args.payload_bytes,
+        progress_steps=args.progress_steps,
+        seed=args.seed
+    )
+    server = build_server(args.tools, profile)
+    logger.info(f"Serving on http://{args.host}:{args.port}/mcp")
+    server.run(transport="streamable-http", host=args.host, port=args.port, path="/mcp")
+
+if __name__ == "__main__":
+    main()
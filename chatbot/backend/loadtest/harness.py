@@ -0,0 +1,208 @@
+"""
+Drive MCPService.call_tool at a fixed concurrency and report throughput and latency.
+
+Starts the local stand-in server unless --server-url is given:
+
+    python -m loadtest.harness --calls 2000 --concurrency 32 --latency-ms 80 --jitter-ms 40
+    python -m loadtest.harness --server-url http://127.0.0.1:8765/mcp --calls 500 --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any
+
+from services.mcp_service import MCPService
+from services.mcp.result_cache import ToolResultCache
+from services.mcp.tool_policy import is_read_only_tool
+from services.background_loop import BackgroundLoop
+from .stats import summarize
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def start_fake_server(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Start the stand-in server in a subprocess and wait for it to accept connections.
+
+    Args:
+        args: The harness arguments, carrying the server's catalog and fault options.
+
+    Returns:
+        The server process.
+    """
+    command = [
+        sys.executable, "-m", "loadtest.fake_server",
+        "--port", str(args.port),
+        "--tools", str(args.tools),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--slow-rate", str(args.slow_rate),
+        "--slow-ms", str(args.slow_ms),
+        "--error-rate", str(args.error_rate),
+        "--payload-bytes", str(args.payload_bytes)
+    ]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Stand-in MCP server exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", args.port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError("Stand-in MCP server did not start within 15 seconds")
+
+def select_tools(tools: List[Dict[str, Any]], mix: str) -> List[str]:
+    """
+    Pick the tools a run calls.
+
+    Args:
+        tools: The catalog, as returned by ``describe_tools``.
+        mix: "read" for read-only tools, "write" for the rest, "all" for every tool.
+
+    Returns:
+        The tool names.
+    """
+    names = [tool["name"] for tool in tools]
+    if mix == "read":
+        names = [name for name in names if is_read_only_tool(name)]
+    elif mix == "write":
+        names = [name for name in names if not is_read_only_tool(name)]
+    if not names:
+        raise RuntimeError(f"The catalog has no tools for mix {mix}")
+    return names
+
+async def run_load(service: MCPService, tool_names: List[str], calls: int, concurrency: int,
+                   distinct_queries: int, label: str = "load test") -> Dict[str, Any]:
+    """
+    Call tools round-robin and measure each call.
+
+    Args:
+        service: A connected MCP service.
+        tool_names: The tools to cycle through.
+        calls: Total number of calls.
+        concurrency: Calls in flight at once.
+        distinct_queries: Number of distinct query values; fewer than ``calls`` repeats
+            identical calls, exercising the result cache and single-flight.
+        label: Prefix of the query values, keeping warm-up calls apart from measured ones.
+
+    Returns:
+        The summary of the run.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies_ms = []
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        tool_name = tool_names[index % len(tool_names)]
+        params = {"query": f"{label} {index % distinct_queries}"}
+        async with semaphore:
+            started = time.monotonic()
+            result = await service.call_tool(tool_name, params)
+            latencies_ms.append((time.monotonic() - started) * 1000)
+        if isinstance(result, dict) and "error" in result:
+            errors += 1
+
+    started = time.monotonic()
+    await asyncio.gather(*(one(index) for index in range(calls)))
+    return summarize(latencies_ms, errors, time.monotonic() - started)
+
+def main():
+    """Run the harness."""
+    parser = argparse.ArgumentParser(description="Load test MCPService.call_tool")
+    parser.add_argument("--server-url", default=None, help="existing MCP server; otherwise the stand-in is started")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup-calls", type=int, default=20)
+    parser.add_argument("--mix", choices=["read", "write", "all"], default="all")
+    parser.add_argument("--distinct-queries", type=int, default=None,
+                        help="distinct query values (default: one per call, so nothing is cached)")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="MCP session concurrency limit")
+    parser.add_argument("--result-cache", action="store_true", help="enable the read-only result cache")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    # Stand-in server options
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tools", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = None
+    server_url = args.server_url
+    if server_url is None:
+        server = start_fake_server(args)
+        server_url = f"http://127.0.0.1:{args.port}/mcp"
+
+    background_loop = BackgroundLoop(name="loadtest")
+    service = MCPService(
+        server_url,
+        background_loop=background_loop,
+        max_concurrent_calls=args.max_in_flight,
+        result_cache=ToolResultCache() if args.result_cache else None
+    )
+
+    try:
+        if not background_loop.submit(service.connect()).result():
+            raise RuntimeError(f"Could not connect to MCP server at {server_url}")
+
+        tool_names = select_tools(service.tools_service.describe_tools(), args.mix)
+        if args.warmup_calls:
+            background_loop.submit(run_load(service, tool_names, args.warmup_calls, args.concurrency,
+                                            args.warmup_calls, label="warm-up")).result()
+
+        report = background_loop.submit(run_load(
+            service, tool_names, args.calls, args.concurrency, args.distinct_queries or args.calls
+        )).result()
+        report.update({
+            "server_url": server_url,
+            "concurrency": args.concurrency,
+            "tools": len(tool_names),
+            "session": service.client.get_state(),
+            "result_cache": service.get_result_cache_stats()
+        })
+    finally:
+        background_loop.submit(service.disconnect()).result()
+        background_loop.stop()
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{report['calls']} calls to {report['tools']} tools at concurrency {report['concurrency']} "
+          f"in {report['duration_seconds']}s")
+    print(f"  throughput  {report['throughput_per_second']}/s")
+    print(f"  latency     p50 {report['p50_ms']} ms, p90 {report['p90_ms']} ms, "
+          f"p99 {report['p99_ms']} ms, max {report['max_ms']} ms")
+    print(f"  errors      {report['errors']} ({report['error_rate']:.2%})")
+    print(f"  session     {report['session']['reconnects']} reconnects, "
+          f"{report['session']['call_failures']} failed calls")
+    if report["result_cache"]:
+        print(f"  cache       hit rate {report['result_cache']['hit_rate']}, "
+              f"{report['result_cache']['coalesced']} coalesced")
+
+if __name__ == "__main__":
+    main()
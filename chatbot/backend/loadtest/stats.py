@@ -0,0 +1,50 @@
+"""
+Latency and throughput summaries of load test runs.
+"""
+import math
+from typing import Dict, List, Any
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """
+    Get a percentile by the nearest-rank method.
+
+    Args:
+        samples: The measurements, in any order.
+        fraction: The percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        The smallest sample with at least ``fraction`` of the samples at or below it, or 0.0
+        for no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+def summarize(latencies_ms: List[float], errors: int, duration_seconds: float) -> Dict[str, Any]:
+    """
+    Summarize a run.
+
+    Args:
+        latencies_ms: Latency of every completed call, successful or not.
+        errors: Number of calls that returned an error.
+        duration_seconds: Wall-clock duration of the run.
+
+    Returns:
+        A dictionary with call and error counts, throughput, and mean, p50, p90, p99 and
+        maximum latency in milliseconds.
+    """
+    calls = len(latencies_ms)
+    return {
+        "calls": calls,
+        "errors": errors,
+        "error_rate": round(errors / calls, 4) if calls else 0.0,
+        "duration_seconds": round(duration_seconds, 3),
+        "throughput_per_second": round(calls / duration_seconds, 1) if duration_seconds > 0 else 0.0,
+        "mean_ms": round(sum(latencies_ms) / calls, 1) if calls else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 0.50), 1),
+        "p90_ms": round(percentile(latencies_ms, 0.90), 1),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 1),
+        "max_ms": round(max(latencies_ms), 1) if calls else 0.0
+    }
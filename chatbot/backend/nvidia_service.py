@@ -2,20 +2,26 @@
 Service for interacting with the NVIDIA API.
 """
 import requests
-import base64
 import json
 import os
 from io import BytesIO
+from utils.session_store import SessionStore, trim_messages
+from utils.image_pipeline import ImagePipeline, ImageProcessingError
 
 class NvidiaService:
     """Service for interacting with the NVIDIA API."""
 
-    def __init__(self, api_key, model_name="mistralai/mistral-medium-3-instruct"):
+    def __init__(self, api_key, model_name="mistralai/mistral-medium-3-instruct",
+                 max_sessions=1000, session_ttl_seconds=3600, max_history_messages=40, image_pipeline=None):
         """Initialize the NVIDIA service.
 
         Args:
             api_key (str): The NVIDIA API key.
             model_name (str): The model name to use.
+            max_sessions (int): Maximum number of conversations kept in memory.
+            session_ttl_seconds (float): Idle conversations older than this are dropped.
+            max_history_messages (int): Maximum messages kept per conversation, including the system prompt.
+            image_pipeline (ImagePipeline, optional): Fits uploaded images to the inline size limit.
         """
         self.api_key = api_key
         self.model_name = model_name
@@ -24,7 +30,10 @@ class NvidiaService:
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json"
         }
-        self.conversation_history = []
+        self.max_history_messages = max_history_messages
+        self.image_pipeline = image_pipeline or ImagePipeline(
+            os.path.join(os.path.dirname(__file__), "cache", "images")
+        )
 
         # Add system prompt to conversation history
         self.system_prompt = r"""You are a helpful AI assistant. When responding with mathematical formulas or equations:
@@ -41,40 +50,45 @@ Example of good LaTeX formatting:
 - Display: The quadratic formula is:
 $$x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}$$
 """
-        self.conversation_history.append({
-            "role": "system",
-            "content": self.system_prompt
-        })
 
-    def generate_response(self, message, image_path=None):
+        # One conversation per session, each starting with the system prompt
+        self.conversations = SessionStore(
+            lambda: [{"role": "system", "content": self.system_prompt}],
+            max_sessions=max_sessions,
+            ttl_seconds=session_ttl_seconds
+        )
+
+    def generate_response(self, message, image_path=None, session_id="default"):
         """
         Generate a response from the NVIDIA API.
 
         Args:
             message (str): The user's message.
             image_path (str, optional): Path to an image file to include.
+            session_id (str, optional): The conversation the message belongs to.
 
         Returns:
             str: The generated response.
             bool: Whether the API call was successful.
         """
+        conversation_history = self.conversations.get(session_id)
+
         try:
             # Add user message to conversation history
             content = message
 
             # If image is provided, encode it and add to the message
             if image_path and os.path.exists(image_path):
-                with open(image_path, "rb") as f:
-                    image_b64 = base64.b64encode(f.read()).decode()
+                # Downsample and re-encode the image if it exceeds the inline limit
+                try:
+                    image_uri = self.image_pipeline.to_data_uri(image_path)
+                except ImageProcessingError as e:
+                    return str(e), False
 
-                # Check image size
-                if len(image_b64) >= 180_000:
-                    return "Image is too large. Please use an image smaller than 180KB.", False
-
-                content = f'{message} <img src="data:image/png;base64,{image_b64}" />'
+                content = f'{message} <img src="{image_uri}" />'
 
             # Add user message to conversation history
-            self.conversation_history.append({
+            conversation_history.append({
                 "role": "user",
                 "content": content
             })
@@ -82,7 +96,7 @@ $$x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}$$
             # Prepare the payload
             payload = {
                 "model": self.model_name,
-                "messages": self.conversation_history,
+                "messages": conversation_history,
                 "max_tokens": 1024,
                 "temperature": 0.7,
                 "top_p": 0.95,
@@ -102,31 +116,41 @@ $$x = \frac{-b \pm \sqrt{b^2 - 4ac}}{2a}$$
                 response_data = response.json()
                 assistant_message = response_data["choices"][0]["message"]["content"]
 
-                # Add assistant message to conversation history
-                self.conversation_history.append({
+                # Add assistant message to conversation history, keeping only recent exchanges
+                conversation_history.append({
                     "role": "assistant",
                     "content": assistant_message
                 })
+                conversation_history[:] = trim_messages(conversation_history, self.max_history_messages, keep_first=1)
 
                 return assistant_message, True
             else:
                 error_message = f"API error: {response.status_code} - {response.text}"
                 print(error_message)
+                self._discard_unanswered(conversation_history)
                 return f"I'm sorry, I encountered an error: {error_message}", False
 
         except requests.exceptions.RequestException as e:
             error_message = f"Connection error with NVIDIA API: {str(e)}"
             print(error_message)
+            self._discard_unanswered(conversation_history)
             return error_message, False
         except Exception as e:
             error_message = f"Error generating response: {str(e)}"
             print(error_message)
+            self._discard_unanswered(conversation_history)
             return error_message, False
 
-    def reset_chat(self):
-        """Reset the chat history."""
-        self.conversation_history = [{
-            "role": "system",
-            "content": self.system_prompt
-        }]
+    def _discard_unanswered(self, conversation_history):
+        """Remove a user message that got no reply, so the conversation keeps alternating roles."""
+        if len(conversation_history) > 1 and conversation_history[-1]["role"] == "user":
+            conversation_history.pop()
+
+    def reset_chat(self, session_id="default"):
+        """Reset the chat history.
+
+        Args:
+            session_id (str, optional): The conversation to reset.
+        """
+        self.conversations.reset(session_id)
         return "Chat history has been reset."
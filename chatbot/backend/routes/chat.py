@@ -9,6 +9,8 @@ from flask import Blueprint, request, jsonify, Response, stream_with_context
 
 from services.chat_service import ChatService
 from services.mcp.client import run_async
+from services.mcp.timeouts import request_deadline
+import config
 
 # Helper function to collect results from an async generator
 async def collect_async_generator(async_gen):
@@ -85,11 +87,15 @@ def stream():
     if not message:
         return jsonify({"error": "No message provided"}), 400
 
+    # MCP calls made for this request share its deadline
+    deadline = request_deadline(request.headers.get('X-Request-Timeout'), config.MCP_REQUEST_TIMEOUT_SECONDS,
+                                config.MCP_REQUEST_TIMEOUT_MAX_SECONDS)
+
     async def async_generate():
         """Generate streaming response asynchronously."""
         try:
             # Stream response from chat service
-            async for chunk in chat_service.stream_chat_response(message, session_id, model):
+            async for chunk in chat_service.stream_chat_response(message, session_id, model, deadline=deadline):
                 yield json.dumps(chunk) + "\n"
 
             # Final message to indicate completion
@@ -118,3 +124,21 @@ def reset():
     chat_service.reset_chat_history(session_id)
 
     return jsonify({"success": True})
+
+@chat_bp.route('/api/cache', methods=['POST'])
+def set_cache():
+    """
+    Opt the current session in to or out of the response cache.
+    """
+    data = request.json or {}
+    session_id = request.cookies.get('session_id', 'default')
+
+    if 'enabled' not in data:
+        return jsonify({"error": "enabled is required"}), 400
+
+    chat_service.set_cache_enabled(session_id, bool(data['enabled']))
+
+    return jsonify({
+        "success": True,
+        "cache_enabled": chat_service.is_cache_enabled(session_id)
+    })
@@ -5,6 +5,11 @@ import logging
 from flask import Blueprint, jsonify
 
 from services.mcp_service import MCPService
+from services.rate_limiter import ProviderRateLimiter
+from services.warmup_service import WarmupService
+from services.prompt_service import PromptService
+from services.provider_registry import ProviderRegistry
+from services.mcp.jobs import MCPJobQueue
 import config
 
 # Configure logging
@@ -14,18 +19,34 @@ logger = logging.getLogger(__name__)
 # Create a blueprint for health routes
 health_bp = Blueprint('health', __name__)
 
-# MCP service will be set by the app
+# MCP service, rate limiter, warm-up service, prompt service, provider registry and job queue will be set by the app
 mcp_service = None
+rate_limiter = None
+warmup_service = None
+prompt_service = None
+provider_registry = None
+job_queue = None
 
-def init_routes(service: MCPService):
+def init_routes(service: MCPService, limiter: ProviderRateLimiter = None, warmup: WarmupService = None,
+                prompts: PromptService = None, registry: ProviderRegistry = None, jobs: MCPJobQueue = None):
     """
     Initialize the health routes with the MCP service.
 
     Args:
         service: The MCP service to use.
+        limiter: Optional provider rate limiter whose counters are reported.
+        warmup: Optional warm-up service whose state is reported.
+        prompts: Optional prompt service whose tool index statistics are reported.
+        registry: Optional provider registry whose providers and model map are reported.
+        jobs: Optional MCP job queue whose counters are reported.
     """
-    global mcp_service
+    global mcp_service, rate_limiter, warmup_service, prompt_service, provider_registry, job_queue
     mcp_service = service
+    rate_limiter = limiter
+    warmup_service = warmup
+    prompt_service = prompts
+    provider_registry = registry
+    job_queue = jobs
 
 @health_bp.route('/api/health', methods=['GET'])
 def health_check():
@@ -33,12 +54,23 @@ def health_check():
     Health check endpoint.
     """
     mcp_services = list(mcp_service.tools_service.tool_categories.keys()) if hasattr(mcp_service.tools_service, 'tool_categories') else []
+    mcp_session = mcp_service.client.get_state()
 
     return jsonify({
         "status": "ok",
         "gemini_api_configured": bool(config.GEMINI_API_KEY),
         "nvidia_api_configured": bool(config.NVIDIA_API_KEY),
         "default_model": config.DEFAULT_MODEL,
-        "mcp_connected": mcp_service.client.client.is_connected() if hasattr(mcp_service.client.client, 'is_connected') else False,
-        "mcp_services": mcp_services
+        "mcp_connected": mcp_session["connected"],
+        "mcp_session": mcp_session,
+        "mcp_catalog": mcp_service.tools_service.get_catalog_state(),
+        "mcp_result_cache": mcp_service.get_result_cache_stats(),
+        "mcp_timeouts": mcp_service.timeouts.get_stats(),
+        "mcp_jobs": job_queue.get_stats() if job_queue else None,
+        "mcp_services": mcp_services,
+        "rate_limits": rate_limiter.get_stats() if rate_limiter else {},
+        "warmup": warmup_service.get_state() if warmup_service else {"status": "disabled"},
+        "tool_index": prompt_service.get_tool_index_stats() if prompt_service else None,
+        "prompt_tokens": prompt_service.get_prompt_report() if prompt_service else None,
+        "providers": provider_registry.get_stats() if provider_registry else None
     })
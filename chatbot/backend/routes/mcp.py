@@ -8,6 +8,9 @@ from flask import Blueprint, request, jsonify, Response, stream_with_context
 
 from services.mcp_service import MCPService
 from services.mcp.client import run_async
+from services.mcp.timeouts import request_deadline
+from services.mcp.jobs import MCPJobQueue, JobQueueFull, JobJournalError, FINAL_STATES
+import config
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -16,18 +19,26 @@ logger = logging.getLogger(__name__)
 # Create a blueprint for MCP routes
 mcp_bp = Blueprint('mcp', __name__)
 
-# MCP service will be set by the app
+# MCP service and job queue will be set by the app
 mcp_service = None
+job_queue = None
 
-def init_routes(service: MCPService):
+def init_routes(service: MCPService, jobs: MCPJobQueue = None):
     """
     Initialize the MCP routes with the MCP service.
 
     Args:
         service: The MCP service to use.
+        jobs: Optional queue backing the /api/mcp/jobs endpoints.
     """
-    global mcp_service
+    global mcp_service, job_queue
     mcp_service = service
+    job_queue = jobs
+
+def _request_deadline() -> float:
+    """Get the deadline of the current request from its X-Request-Timeout header."""
+    return request_deadline(request.headers.get('X-Request-Timeout'), config.MCP_REQUEST_TIMEOUT_SECONDS,
+                            config.MCP_REQUEST_TIMEOUT_MAX_SECONDS)
 
 @mcp_bp.route('/api/mcp/services', methods=['GET'])
 def list_services():
@@ -87,6 +98,7 @@ def call_tool():
 
     tool_name = data['tool_name']
     params = data['params']
+    deadline = _request_deadline()
 
     logger.debug(f"Calling MCP tool: {tool_name} with params: {params}")
 
@@ -105,15 +117,12 @@ def call_tool():
                 "text": f"Connecting to {service} {action} tool..."
             }) + "\n"
 
-            # Call the MCP tool
-            result = run_async(mcp_service.call_tool(tool_name, params))
-            logger.debug(f"MCP tool result: {result}")
-
-            # Send the result
-            yield json.dumps({
-                "success": True,
-                "result": result
-            }) + "\n"
+            # Drive the call on the loop that owns the MCP session, relaying progress as it arrives
+            for chunk in mcp_service.background_loop.iterate(
+                    mcp_service.stream_tool(tool_name, params, config.MCP_PROGRESS_HEARTBEAT_SECONDS, deadline)):
+                if chunk["type"] == "result":
+                    logger.debug(f"MCP tool result: {chunk}")
+                yield json.dumps(chunk) + "\n"
         except Exception as e:
             logger.error(f"Error calling MCP tool: {e}")
             import traceback
@@ -124,3 +133,124 @@ def call_tool():
             }) + "\n"
 
     return Response(stream_with_context(generate()), mimetype='text/event-stream')
+
+@mcp_bp.route('/api/mcp/batch', methods=['POST'])
+def call_batch():
+    """
+    Call several MCP tools concurrently, streaming each result as newline-delimited JSON
+    as soon as it completes, followed by a summary line.
+    """
+    data = request.json
+    calls = data.get('calls') if isinstance(data, dict) else None
+
+    if not isinstance(calls, list) or not calls:
+        return jsonify({"error": "calls must be a non-empty list"}), 400
+
+    if len(calls) > config.MCP_BATCH_MAX_CALLS:
+        return jsonify({"error": f"At most {config.MCP_BATCH_MAX_CALLS} calls per batch"}), 400
+
+    for index, call in enumerate(calls):
+        if not isinstance(call, dict) or not isinstance(call.get('tool_name'), str):
+            return jsonify({"error": f"calls[{index}].tool_name is required"}), 400
+        if not isinstance(call.get('params', {}), dict):
+            return jsonify({"error": f"calls[{index}].params must be an object"}), 400
+
+    concurrency = data.get('concurrency', config.MCP_BATCH_CONCURRENCY)
+    if not isinstance(concurrency, int) or concurrency < 1:
+        return jsonify({"error": "concurrency must be a positive integer"}), 400
+    concurrency = min(concurrency, config.MCP_BATCH_CONCURRENCY)
+    logger.debug(f"MCP batch of {len(calls)} calls with concurrency {concurrency}")
+    deadline = _request_deadline()
+
+    def generate() -> Generator[str, None, None]:
+        """Generate streaming response."""
+        try:
+            # Run the batch on the loop that owns the MCP session
+            for chunk in mcp_service.background_loop.iterate(mcp_service.call_batch(calls, concurrency, deadline)):
+                yield json.dumps(chunk) + "\n"
+        except Exception as e:
+            logger.error(f"Error running MCP batch: {e}")
+            yield json.dumps({
+                "type": "error",
+                "error": str(e)
+            }) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@mcp_bp.route('/api/mcp/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue an MCP tool call and return its job id without waiting for it to run.
+    """
+    if job_queue is None:
+        return jsonify({"error": "MCP jobs are disabled"}), 404
+
+    data = request.json
+    if not isinstance(data, dict) or not isinstance(data.get('tool_name'), str):
+        return jsonify({"error": "tool_name is required"}), 400
+
+    params = data.get('params', {})
+    if not isinstance(params, dict):
+        return jsonify({"error": "params must be an object"}), 400
+
+    # Reject calls that cannot succeed before they take a queue slot
+    errors = mcp_service.tools_service.validate_call(data['tool_name'], params)
+    if errors:
+        return jsonify({"error": f"Invalid parameters for MCP tool {data['tool_name']}: {'; '.join(errors)}"}), 400
+
+    try:
+        job = job_queue.submit(data['tool_name'], params)
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 429
+    except JobJournalError as e:
+        return jsonify({"error": str(e)}), 503
+
+    return jsonify({
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/mcp/jobs/{job['id']}",
+        "events_url": f"/api/mcp/jobs/{job['id']}/events"
+    }), 202
+
+@mcp_bp.route('/api/mcp/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """
+    Get the status, progress and result of an MCP job.
+    """
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    return jsonify({"success": True, "job": job})
+
+@mcp_bp.route('/api/mcp/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id: str):
+    """
+    Stream an MCP job's status changes as server-sent events until it finishes.
+    """
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+
+    def generate() -> Generator[str, None, None]:
+        """Generate the event stream."""
+        current = job
+        while True:
+            yield f"event: {current['status']}\nid: {current['version']}\ndata: {json.dumps(current)}\n\n"
+            if current["status"] in FINAL_STATES:
+                return
+
+            # Wait for the next change, keeping idle connections open with comments
+            while True:
+                latest = job_queue.wait(job_id, current["version"], config.MCP_JOB_EVENTS_KEEPALIVE_SECONDS)
+                if latest is None:
+                    yield f"event: expired\ndata: {json.dumps({'id': job_id})}\n\n"
+                    return
+                if latest["version"] > current["version"]:
+                    current = latest
+                    break
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
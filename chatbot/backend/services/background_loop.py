@@ -0,0 +1,174 @@
+"""
+Long-lived event loop for resources that must outlive a single request.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Marks the end of a bridged stream
+_DONE = object()
+
+class BackgroundLoop:
+    """
+    Runs an event loop in a daemon thread.
+
+    Every Flask request drives its own short-lived event loop, but pooled connections
+    (aiohttp sessions, MCP sessions) are bound to the loop that created them. Such
+    resources live on this loop instead, and callers on any other loop await them
+    through ``run`` and ``stream``.
+    """
+
+    def __init__(self, name: str = "background-loop"):
+        """
+        Initialize the background loop. The thread is started on first use.
+
+        Args:
+            name: The name of the thread running the loop.
+        """
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running background event loop, started if necessary."""
+        self.start()
+        return self._loop
+
+    def start(self):
+        """Start the loop thread. Calling it again is a no-op."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            started = threading.Event()
+            self._loop = asyncio.new_event_loop()
+
+            def run():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(started.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            started.wait()
+            logger.info(f"Started background event loop {self.name}")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the loop and wait for its thread to exit.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread.
+        """
+        with self._lock:
+            if self._thread is None:
+                return
+            loop, thread = self._loop, self._thread
+            self._thread = None
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the background loop from any thread.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            A concurrent future for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro: Awaitable) -> Any:
+        """
+        Await a coroutine on the background loop from any other event loop.
+
+        Cancelling the caller cancels the coroutine on the background loop.
+
+        Args:
+            coro: The coroutine to run.
+
+        Returns:
+            The coroutine's result.
+        """
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def stream(self, agen: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        Iterate an async generator on the background loop from any other event loop.
+
+        Args:
+            agen: The async generator to drive on the background loop.
+
+        Yields:
+            The generator's items, in order. Its exceptions are re-raised here.
+        """
+        if asyncio.get_running_loop() is self._loop:
+            async for item in agen:
+                yield item
+            return
+
+        caller_loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def publish(item):
+            caller_loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async def pump():
+            try:
+                async for item in agen:
+                    publish((item, None))
+            except BaseException as e:
+                publish((_DONE, e))
+                raise
+            else:
+                publish((_DONE, None))
+            finally:
+                await agen.aclose()
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is _DONE:
+                    if error is not None and not isinstance(error, asyncio.CancelledError):
+                        raise error
+                    return
+                yield item
+        finally:
+            # Stop the producer if the consumer went away early
+            future.cancel()
+
+    def iterate(self, agen: AsyncIterator[Any]) -> Iterator[Any]:
+        """
+        Iterate an async generator on the background loop from synchronous code.
+
+        Args:
+            agen: The async generator to drive on the background loop.
+
+        Yields:
+            The generator's items, in order.
+        """
+        iterator = agen.__aiter__()
+        try:
+            while True:
+                try:
+                    yield self.submit(iterator.__anext__()).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.submit(iterator.aclose()).result()
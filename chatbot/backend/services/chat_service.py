@@ -7,12 +7,19 @@ import os
 import re
 import traceback
 import asyncio
-from typing import Dict, List, Any, Optional, Generator, Tuple, AsyncGenerator
+import time
+from typing import Dict, List, Any, Optional, Generator, Tuple, AsyncGenerator, AsyncIterator, Awaitable, Callable
 
 from .gemini_service import GeminiService
 from .nvidia_service import NvidiaService
 from .mcp_service import MCPService
+from .model_router import ModelRouter
+from .response_cache import ResponseCache, replay_response
+from .question_cache import QuestionCache
+from .single_flight import StreamCoalescer
+from .provider_registry import ProviderRegistry
 from .mcp.client import run_async
+from .mcp.tool_policy import is_read_only_tool
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -21,7 +28,13 @@ logger = logging.getLogger(__name__)
 class ChatService:
     """Service for handling chat interactions."""
 
-    def __init__(self, gemini_service: GeminiService, nvidia_service: NvidiaService, mcp_service: MCPService):
+    # Model used when a request asks for "auto" but no router is configured
+    DEFAULT_AUTO_MODEL = "gemini-2.5-flash"
+
+    def __init__(self, gemini_service: GeminiService, nvidia_service: NvidiaService, mcp_service: MCPService,
+                 model_router: Optional[ModelRouter] = None, response_cache: Optional[ResponseCache] = None,
+                 question_cache: Optional[QuestionCache] = None, request_coalescer: Optional[StreamCoalescer] = None,
+                 speculative_tool_calls: bool = False, provider_registry: Optional[ProviderRegistry] = None):
         """
         Initialize the chat service.
 
@@ -29,10 +42,31 @@ class ChatService:
             gemini_service: The Gemini service to use.
             nvidia_service: The NVIDIA service to use.
             mcp_service: The MCP service to use.
+            model_router: Optional router used to resolve requests for model "auto".
+            response_cache: Optional exact-match cache placed in front of the model services.
+            question_cache: Optional near-duplicate cache consulted for first-turn questions.
+            request_coalescer: Optional coalescer that lets identical in-flight requests share one upstream call.
+            speculative_tool_calls: Start detected read-only tool calls alongside the model stream
+                instead of before it.
+            provider_registry: Maps models to provider services. Defaults to "nvidia" on the NVIDIA
+                service and everything else on Gemini.
         """
         self.gemini_service = gemini_service
         self.nvidia_service = nvidia_service
         self.mcp_service = mcp_service
+        self.model_router = model_router
+        self.response_cache = response_cache
+        self.question_cache = question_cache
+        self.request_coalescer = request_coalescer
+        self.speculative_tool_calls = speculative_tool_calls
+        self.providers = provider_registry
+        if self.providers is None:
+            self.providers = ProviderRegistry("gemini")
+            self.providers.register("gemini", gemini_service)
+            self.providers.register("nvidia", nvidia_service)
+        self.speculation_stats = {"started": 0, "folded_early": 0, "folded_late": 0, "failed": 0, "cancelled": 0,
+                                  "timed_out": 0}
+        self.cache_opt_out_sessions = set()
         self.chat_history_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'chat_history')
 
         # Create chat history directory if it doesn't exist
@@ -98,7 +132,7 @@ class ChatService:
         Args:
             message: The user's message.
             session_id: The session ID.
-            model: The model to use (gemini-2.5-pro, gemini-2.5-flash, nvidia, etc.).
+            model: The model to use (gemini-2.5-pro, gemini-2.5-flash, nvidia, auto, etc.).
 
         Returns:
             A tuple containing the response text and the model used.
@@ -106,17 +140,67 @@ class ChatService:
         # Get chat history
         history = self.get_chat_history(session_id)
 
+        # Resolve "auto" before the current message is added to the history
+        model = self.resolve_model(model, message, history)
+
+        # Identical prompts with identical recent context are served from the cache,
+        # and first-turn questions may match a near-duplicate asked before
+        first_turn = not history
+        cache_key = self._response_cache_key(session_id, model, message, history)
+        cached = self._get_cached_response(session_id, cache_key, model, message, first_turn)
+
         # Add user message to history
         history.append({"role": "user", "content": message})
 
+        if cached:
+            logger.info(f"Serving cached response for session {session_id}")
+            response, actual_model_used = cached["text"], cached["model_used"]
+        else:
+            response, actual_model_used, tool_calls = await self._coalesced_call(
+                model, message, history, lambda: self._generate_response(message, history, model)
+            )
+
+            # Answers that depended on tool calls reflect live data or side effects; never reuse them
+            if not tool_calls:
+                self._store_response(session_id, cache_key, model, message if first_turn else None,
+                                     response, actual_model_used)
+
+        # Add assistant response to history
+        history.append({"role": "assistant", "content": response})
+
+        # Save updated history
+        self.save_chat_history(session_id, history)
+
+        return response, actual_model_used
+
+    async def _generate_response(self, message: str, history: List[Dict[str, str]],
+                                 model: str) -> Tuple[str, str, List[Dict[str, Any]]]:
+        """
+        Generate a response from the requested model, falling back to the other provider on failure.
+
+        Args:
+            message: The user's message.
+            history: The chat history, including the current message.
+            model: The model to use.
+
+        Returns:
+            A tuple containing the response text, the model used and the tool calls the model made.
+        """
+        tool_calls = []
+
         # Try to get a response from the specified model
         try:
-            if model.lower() == "nvidia":
-                response = await self.nvidia_service.generate_response(message, history)
-                actual_model_used = "nvidia"
+            provider, provider_service, upstream_model = self.providers.resolve(model)
+            if provider != "gemini":
+                response = await provider_service.generate_response(message, history, upstream_model)
+                actual_model_used = provider
             else:
                 # Use Gemini service with the specified model
-                response, actual_model_used = await self.gemini_service.generate_response(message, history, model)
+                started = time.monotonic()
+                response, actual_model_used = await self.gemini_service.generate_response(
+                    message, history, upstream_model or model, tool_calls=tool_calls
+                )
+                self._record_latency(model, started, actual_model_used != "error")
         except Exception as e:
             logger.error(f"Error getting response from {model}: {e}")
             logger.error(traceback.format_exc())
@@ -130,7 +214,7 @@ class ChatService:
                 else:
                     # Fall back to Gemini if NVIDIA fails
                     response, actual_model_used = await self.gemini_service.generate_response(
-                        message, history, "gemini-2.5-flash"
+                        message, history, "gemini-2.5-flash", tool_calls=tool_calls
                     )
             except Exception as e2:
                 logger.error(f"Error getting response from fallback model: {e2}")
@@ -138,22 +222,18 @@ class ChatService:
                 response = "I'm sorry, I encountered an error and couldn't generate a response. Please try again later."
                 actual_model_used = "none"
 
-        # Add assistant response to history
-        history.append({"role": "assistant", "content": response})
-
-        # Save updated history
-        self.save_chat_history(session_id, history)
-
-        return response, actual_model_used
+        return response, actual_model_used, tool_calls
 
-    async def stream_chat_response(self, message: str, session_id: str, model: str = "gemini-2.5-flash") -> AsyncGenerator[Dict[str, Any], None]:
+    async def stream_chat_response(self, message: str, session_id: str, model: str = "gemini-2.5-flash",
+                                   deadline: float = None) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Stream a response from the chatbot.
 
         Args:
             message: The user's message.
             session_id: The session ID.
-            model: The model to use (gemini-2.5-pro, gemini-2.5-flash, nvidia, etc.).
+            model: The model to use (gemini-2.5-pro, gemini-2.5-flash, nvidia, auto, etc.).
+            deadline: Optional ``time.monotonic()`` time by which MCP tool calls must finish.
 
         Yields:
             Dictionaries containing response chunks and metadata.
@@ -161,12 +241,22 @@ class ChatService:
         # Get chat history
         history = self.get_chat_history(session_id)
 
+        # Resolve "auto" before the current message is added to the history
+        model = self.resolve_model(model, message, history)
+        first_turn = not history
+        cache_key = self._response_cache_key(session_id, model, message, history)
+
         # Add user message to history
         history.append({"role": "user", "content": message})
 
-        # Check if this is an MCP-related request
-        service, action, params = self._detect_mcp_action(message)
+        # Check if this is an MCP-related request. Gemini models with native function
+        # calling pick and call tools themselves, so the keyword heuristics only apply otherwise.
+        if self._uses_function_calling(model):
+            service, action, params = None, None, None
+        else:
+            service, action, params = self._detect_mcp_action(message)
 
+        speculative_call = None
         if service and action:
             # This is an MCP action
             await asyncio.sleep(0)  # Ensure this is truly asynchronous
@@ -175,8 +265,19 @@ class ChatService:
                 "text": f"Detected request to use {service} {action}..."
             }
 
+            tool_name = f"{service}_{action}"
+            if params and self.speculative_tool_calls and is_read_only_tool(tool_name):
+                # Read-only lookups start now and run alongside the model stream
+                speculative_call = asyncio.create_task(self.mcp_service.call_tool(tool_name, dict(params), deadline=deadline))
+                self.speculation_stats["started"] += 1
+                await asyncio.sleep(0)  # Ensure this is truly asynchronous
+                yield {
+                    "type": "status",
+                    "text": f"Running {service} {action} while the answer is generated..."
+                }
+
             # If we have parameters, call the tool directly
-            if params:
+            elif params:
                 await asyncio.sleep(0)  # Ensure this is truly asynchronous
                 yield {
                     "type": "status",
@@ -184,9 +285,8 @@ class ChatService:
                 }
 
                 # Call the MCP tool
-                tool_name = f"{service}_{action}"
                 try:
-                    result = await self.mcp_service.call_tool(tool_name, params)
+                    result = await self.mcp_service.call_tool(tool_name, params, deadline=deadline)
 
                     # Yield the result
                     await asyncio.sleep(0)  # Ensure this is truly asynchronous
@@ -226,51 +326,51 @@ class ChatService:
                     "text": f"Getting more information for {service} {action}..."
                 }
 
+        # Replay cached answers in the live stream format. Answers that fold in a live
+        # tool result are neither replayed nor stored.
+        if speculative_call:
+            cache_key, first_turn = None, False
+        cached = self._get_cached_response(session_id, cache_key, model, message, first_turn)
+        if cached:
+            logger.info(f"Replaying cached response for session {session_id}")
+            async for chunk in replay_response(cached["text"], cached["model_used"]):
+                yield chunk
+            return
+
         # Get the response from the AI model
         try:
             # Add a hint about MCP tools to the message if it's related to MCP
+            upstream_message = message
             if self._is_mcp_related(message):
-                enhanced_message = f"{message}\n\nRemember to use your MCP tools to help with this request."
-
-                # Use the streaming API directly for Gemini models
-                if model.lower() != "nvidia":
-                    # Stream directly from Gemini
-                    async for chunk in self.gemini_service.stream_response(enhanced_message, history, model):
-                        await asyncio.sleep(0)  # Ensure this is truly asynchronous
-                        yield chunk
-
-                    # Save the last complete response to history
-                    # This will be handled by the frontend
-                    return
-                else:
-                    # For NVIDIA, we don't have streaming yet, so use the regular API
-                    response_text, actual_model_used = await self.get_chat_response(enhanced_message, session_id, model)
+                upstream_message = f"{message}\n\nRemember to use your MCP tools to help with this request."
+
+            provider, provider_service, upstream_model = self.providers.resolve(model)
+            if provider == "gemini":
+                # Stream directly from Gemini, shared with identical in-flight requests
+                def upstream():
+                    return self._stream_gemini(upstream_message, history, upstream_model or model, session_id,
+                                               cache_key, message if first_turn else None, deadline)
             else:
-                # Use the streaming API directly for Gemini models
-                if model.lower() != "nvidia":
-                    # Stream directly from Gemini
-                    async for chunk in self.gemini_service.stream_response(message, history, model):
-                        await asyncio.sleep(0)  # Ensure this is truly asynchronous
-                        yield chunk
+                # Stream from the mapped provider, shared with identical in-flight requests
+                def upstream():
+                    return self._stream_provider(provider_service, upstream_model, model, upstream_message, history,
+                                                 session_id, cache_key, message if first_turn else None)
 
-                    # Save the last complete response to history
-                    # This will be handled by the frontend
-                    return
-                else:
-                    # For NVIDIA, we don't have streaming yet, so use the regular API
-                    response_text, actual_model_used = await self.get_chat_response(message, session_id, model)
+            stream = self._coalesced_stream(model, upstream_message, history, upstream)
+            if speculative_call:
+                stream = self._fold_in_tool_result(stream, speculative_call, service, action, deadline)
 
-            # For NVIDIA or if we reached here, yield the full response
-            await asyncio.sleep(0)  # Ensure this is truly asynchronous
-            yield {
-                "type": "content",
-                "text": response_text,
-                "model_used": actual_model_used
-            }
+            async for chunk in stream:
+                await asyncio.sleep(0)  # Ensure this is truly asynchronous
+                yield chunk
+
+                # Gemini history is saved by the frontend; other providers' history is saved here
+                if provider != "gemini" and chunk.get("type") == "complete":
+                    history.append({"role": "assistant", "content": chunk["text"]})
+                    self.save_chat_history(session_id, history)
 
-            # Add the response to the chat history
-            history.append({"role": "assistant", "content": response_text})
-            self.save_chat_history(session_id, history)
+            if provider == "gemini":
+                return
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             logger.error(traceback.format_exc())
@@ -279,6 +379,14 @@ class ChatService:
                 "type": "error",
                 "text": f"Error generating response: {str(e)}"
             }
+        finally:
+            if speculative_call and not speculative_call.done():
+                speculative_call.cancel()
+                self.speculation_stats["cancelled"] += 1
+
+        # A speculated tool call has already been answered
+        if speculative_call:
+            return
 
         # Detect MCP actions from the message
         service, action, params = self._detect_mcp_action(message)
@@ -295,7 +403,7 @@ class ChatService:
                 # Call the MCP tool
                 tool_name = f"{service}_{action}"
                 try:
-                    result = run_async(self.mcp_service.call_tool(tool_name, params))
+                    result = run_async(self.mcp_service.call_tool(tool_name, params, deadline=deadline))
 
                     # Yield the result
                     yield {
@@ -323,6 +431,395 @@ class ChatService:
                     "action": action
                 }
 
+    def _uses_function_calling(self, model: str) -> bool:
+        """
+        Check whether a model calls MCP tools natively.
+
+        Args:
+            model: The resolved model.
+
+        Returns:
+            True for Gemini models when function calling is enabled.
+        """
+        try:
+            provider = self.providers.resolve(model)[0]
+        except KeyError:
+            return False
+        return provider == "gemini" and self.gemini_service.function_calling_enabled
+
+    def resolve_model(self, model: str, message: str, history: List[Dict[str, str]] = None) -> str:
+        """
+        Resolve the model to use for a request.
+
+        Args:
+            model: The requested model. "auto" lets the model router choose.
+            message: The user's message.
+            history: The chat history, excluding the current message.
+
+        Returns:
+            The concrete model name.
+        """
+        if not model or model.lower() != "auto":
+            return model
+
+        if not self.model_router:
+            return self.DEFAULT_AUTO_MODEL
+
+        return self.model_router.route(message, history, default=self.DEFAULT_AUTO_MODEL)
+
+    def set_cache_enabled(self, session_id: str, enabled: bool):
+        """
+        Opt a session in to or out of the response cache.
+
+        Args:
+            session_id: The session ID.
+            enabled: Whether responses for this session may be served from and stored in the cache.
+        """
+        if enabled:
+            self.cache_opt_out_sessions.discard(session_id)
+        else:
+            self.cache_opt_out_sessions.add(session_id)
+
+    def is_cache_enabled(self, session_id: str) -> bool:
+        """
+        Check whether response caching is enabled for a session.
+
+        Args:
+            session_id: The session ID.
+
+        Returns:
+            True if a cache is configured and the session has not opted out.
+        """
+        has_cache = self.response_cache is not None or self.question_cache is not None
+        return has_cache and session_id not in self.cache_opt_out_sessions
+
+    def _response_cache_key(self, session_id: str, model: str, message: str,
+                            history: List[Dict[str, str]]) -> Optional[str]:
+        """
+        Build the response cache key for a request.
+
+        Args:
+            session_id: The session ID.
+            model: The resolved model.
+            message: The user's message.
+            history: The chat history preceding the message.
+
+        Returns:
+            The cache key, or None if caching is disabled for this session.
+        """
+        if self.response_cache is None or not self.is_cache_enabled(session_id):
+            return None
+
+        return self.response_cache.make_key(model.lower(), message, history)
+
+    def _get_cached_response(self, session_id: str, cache_key: Optional[str], model: str, message: str,
+                             first_turn: bool) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached answer, trying the exact-match cache before the near-duplicate cache.
+
+        Args:
+            session_id: The session ID.
+            cache_key: The response cache key, or None if the exact-match cache is unavailable.
+            model: The resolved model.
+            message: The user's message.
+            first_turn: Whether the session has no prior context.
+
+        Returns:
+            A dictionary with "text" and "model_used", or None on a miss.
+        """
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached:
+                return cached
+
+        if first_turn and self.question_cache is not None and self.is_cache_enabled(session_id):
+            return self.question_cache.lookup(message, model.lower())
+
+        return None
+
+    def _store_response(self, session_id: str, cache_key: Optional[str], model: str,
+                        first_turn_question: Optional[str], response: str, model_used: str):
+        """
+        Store a generated answer in the configured caches.
+
+        Args:
+            session_id: The session ID.
+            cache_key: The response cache key, or None if the exact-match cache is unavailable.
+            model: The resolved model.
+            first_turn_question: The question if it was the session's first turn, otherwise None.
+            response: The response text.
+            model_used: The model that produced the response.
+        """
+        if not self._is_cacheable(response, model_used):
+            return
+
+        if cache_key:
+            self.response_cache.set(cache_key, response, model_used)
+
+        if first_turn_question and self.question_cache is not None and self.is_cache_enabled(session_id):
+            self.question_cache.add(first_turn_question, model.lower(), response, model_used)
+
+    @staticmethod
+    def _is_cacheable(response: str, model_used: str) -> bool:
+        """
+        Check whether a response is worth caching.
+
+        Args:
+            response: The response text.
+            model_used: The model that produced it.
+
+        Returns:
+            False for empty responses and the apology text the services return on errors.
+        """
+        return bool(response) and model_used not in ("error", "none") and not response.startswith("I'm sorry, ")
+
+    def _coalesced_stream(self, model: str, message: str, history: List[Dict[str, str]],
+                          factory: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream from the upstream model, sharing the stream with identical in-flight requests.
+
+        Args:
+            model: The resolved model.
+            message: The message sent upstream.
+            history: The chat history sent upstream.
+            factory: Creates the upstream stream; only called if no identical request is in flight.
+
+        Returns:
+            An async iterator over the response chunks.
+        """
+        if not self.request_coalescer:
+            return factory()
+
+        key = self.request_coalescer.make_key(model.lower(), message, history)
+        return self.request_coalescer.stream(key, factory)
+
+    async def _coalesced_call(self, model: str, message: str, history: List[Dict[str, str]],
+                              factory: Callable[[], Awaitable[Tuple]]) -> Tuple:
+        """
+        Get a response from the upstream model, sharing the call with identical in-flight requests.
+
+        Args:
+            model: The resolved model.
+            message: The message sent upstream.
+            history: The chat history sent upstream.
+            factory: Creates the upstream call; only called if no identical request is in flight.
+
+        Returns:
+            The tuple returned by the factory.
+        """
+        if not self.request_coalescer:
+            return await factory()
+
+        key = self.request_coalescer.make_key(model.lower(), message, history)
+        return await self.request_coalescer.call(key, factory)
+
+    async def _fold_in_tool_result(self, stream: AsyncIterator[Dict[str, Any]], tool_call: "asyncio.Task",
+                                   service: str, action: str, deadline: float = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Merge a speculative tool call into a model stream.
+
+        The tool result is yielded as soon as it is ready, between model chunks. The
+        complete chunk is held back until the result is in; the result text is then
+        streamed after the model's answer and appended to the complete text, so the
+        saved answer includes it.
+
+        Args:
+            stream: The model's response chunks.
+            tool_call: The running MCP tool call.
+            service: The tool's service name.
+            action: The tool's action name.
+            deadline: Optional ``time.monotonic()`` time after which a tool call still
+                holding back the answer is cancelled and reported as timed out.
+
+        Yields:
+            The model chunks with the tool result folded in.
+        """
+        iterator = stream.__aiter__()
+        next_chunk = asyncio.ensure_future(iterator.__anext__())
+        result_text = None
+
+        try:
+            while True:
+                waiting = {next_chunk} if result_text is not None else {next_chunk, tool_call}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+
+                if tool_call in done and result_text is None:
+                    self.speculation_stats["folded_early"] += 1
+                    result_text, chunks = self._speculative_result_chunks(tool_call, service, action)
+                    for chunk in chunks:
+                        yield chunk
+
+                if next_chunk not in done:
+                    continue
+
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+
+                if chunk.get("type") == "complete":
+                    if result_text is None:
+                        await self._wait_for_speculation(tool_call, deadline)
+                        result_text, chunks = self._speculative_result_chunks(tool_call, service, action)
+                        for result_chunk in chunks:
+                            yield result_chunk
+                    yield {"type": "content", "text": f"\n\n{result_text}", "model_used": "mcp"}
+                    # Copy: coalesced streams share chunk dictionaries between subscribers
+                    chunk = dict(chunk, text=f"{chunk['text']}\n\n{result_text}")
+
+                yield chunk
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+
+            # The model stream ended without completing; still deliver the lookup
+            if result_text is None:
+                await self._wait_for_speculation(tool_call, deadline)
+                result_text, chunks = self._speculative_result_chunks(tool_call, service, action)
+                for chunk in chunks:
+                    yield chunk
+                yield {"type": "content", "text": result_text, "model_used": "mcp"}
+        finally:
+            if not next_chunk.done():
+                next_chunk.cancel()
+
+    async def _wait_for_speculation(self, tool_call: "asyncio.Task", deadline: float = None):
+        """
+        Wait for a speculative tool call the answer is held back for, at most until the deadline.
+
+        Args:
+            tool_call: The running MCP tool call; cancelled if the deadline passes.
+            deadline: Optional ``time.monotonic()`` time to stop waiting at.
+        """
+        timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+        done, _ = await asyncio.wait({tool_call}, timeout=timeout)
+        if done:
+            self.speculation_stats["folded_late"] += 1
+            return
+
+        tool_call.cancel()
+        self.speculation_stats["timed_out"] += 1
+        # Let the cancellation land so the call reports as cancelled
+        await asyncio.wait({tool_call})
+
+    def _speculative_result_chunks(self, tool_call: "asyncio.Task", service: str,
+                                   action: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Turn a finished speculative tool call into stream chunks.
+
+        Args:
+            tool_call: The finished MCP tool call.
+            service: The tool's service name.
+            action: The tool's action name.
+
+        Returns:
+            The text appended to the answer and the chunks to yield right away.
+        """
+        if tool_call.cancelled():
+            return (f"The {service} {action} lookup did not finish in time.",
+                    [{"type": "status", "text": f"{service} {action} timed out"}])
+
+        try:
+            result = tool_call.result()
+        except Exception as e:
+            self.speculation_stats["failed"] += 1
+            logger.error(f"Speculative call of {service}_{action} failed: {e}")
+            return (f"I couldn't get the {service} {action} result: {str(e)}",
+                    [{"type": "status", "text": f"{service} {action} failed: {str(e)}"}])
+
+        result_text = f"I used the {service} {action} tool for you. Here's the result: {result}"
+        return result_text, [{"type": "mcp_result", "service": service, "action": action, "result": result}]
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """
+        Get speculative tool call statistics.
+
+        Returns:
+            Counts of started calls, results folded in before or after the model finished,
+            failures, calls cancelled because the client went away, and calls cut off by
+            the request deadline.
+        """
+        return dict(self.speculation_stats, enabled=self.speculative_tool_calls)
+
+    def _record_latency(self, model: str, started: float, success: bool):
+        """
+        Feed an observed latency back to the model router.
+
+        Args:
+            model: The model that served the request.
+            started: The ``time.monotonic()`` value when the request started.
+            success: Whether the request succeeded.
+        """
+        if self.model_router:
+            self.model_router.record_latency(model, (time.monotonic() - started) * 1000, success)
+
+    async def _stream_gemini(self, message: str, history: List[Dict[str, str]], model: str, session_id: str = None,
+                             cache_key: str = None, first_turn_question: str = None,
+                             deadline: float = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a response from Gemini, recording its latency for the model router.
+
+        Args:
+            message: The message to send.
+            history: The chat history.
+            model: The Gemini model to use.
+            session_id: The session ID.
+            cache_key: Optional response cache key the completed answer is stored under.
+            first_turn_question: The original question if this is the session's first turn.
+            deadline: Optional ``time.monotonic()`` time by which the model's tool calls must
+                finish. Identical requests joining this stream share it.
+
+        Yields:
+            Dictionaries containing response chunks and metadata.
+        """
+        started = time.monotonic()
+        success = False
+
+        tool_executor = None
+        if deadline is not None:
+            def tool_executor(tool_name: str, params: Dict[str, Any]) -> Awaitable[Dict[str, Any]]:
+                return self.mcp_service.call_tool(tool_name, params, deadline=deadline)
+
+        async for chunk in self.gemini_service.stream_response(message, history, model, tool_executor=tool_executor):
+            if chunk.get("type") == "complete":
+                success = True
+                # Answers that depended on tool calls are never reused
+                if not chunk.get("tool_calls"):
+                    self._store_response(session_id, cache_key, model, first_turn_question,
+                                         chunk["text"], chunk["model_used"])
+            yield chunk
+
+        self._record_latency(model, started, success)
+
+    async def _stream_provider(self, service: Any, upstream_model: Optional[str], model: str, message: str,
+                               history: List[Dict[str, str]], session_id: str = None, cache_key: str = None,
+                               first_turn_question: str = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a response from a registered provider, recording its latency for the model router.
+
+        Args:
+            service: The provider service.
+            upstream_model: The provider's model, or None for its default.
+            model: The requested model, used for latency and cache bookkeeping.
+            message: The message to send.
+            history: The chat history.
+            session_id: The session ID.
+            cache_key: Optional response cache key the completed answer is stored under.
+            first_turn_question: The original question if this is the session's first turn.
+
+        Yields:
+            Dictionaries containing response chunks and metadata.
+        """
+        started = time.monotonic()
+        success = False
+
+        async for chunk in service.stream_response(message, history, upstream_model):
+            if chunk.get("type") == "complete":
+                success = True
+                self._store_response(session_id, cache_key, model, first_turn_question,
+                                     chunk["text"], chunk["model_used"])
+            yield chunk
+
+        self._record_latency(model, started, success)
+
     def _is_mcp_related(self, message: str) -> bool:
         """
         Check if a message is related to MCP tools.
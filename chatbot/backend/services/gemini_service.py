@@ -5,7 +5,9 @@ import logging
 import os
 import json
 import asyncio
-from typing import Dict, List, Any, Optional, Tuple, Generator, AsyncGenerator
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple, Generator, AsyncGenerator, Awaitable, Callable
 
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
@@ -13,6 +15,8 @@ from google.generativeai.types.generation_types import GenerationConfig
 
 import config
 from services.prompt_service import PromptService
+from services.rate_limiter import ProviderRateLimiter, RetryPolicy, estimate_tokens
+from services.mcp.functions import FunctionCatalog
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -31,19 +35,28 @@ class GeminiService:
         "gemini-1.5-flash": "gemini-1.5-flash"
     }
 
-    def __init__(self, api_key: str = None, model_name: str = "gemini-2.5-flash"):
+    def __init__(self, api_key: str = None, model_name: str = "gemini-2.5-flash",
+                 rate_limiter: ProviderRateLimiter = None, retry_policy: RetryPolicy = None):
         """
         Initialize the Gemini service.
 
         Args:
             api_key: The Gemini API key. If None, uses the GEMINI_API_KEY environment variable.
             model_name: The Gemini model name to use.
+            rate_limiter: Optional client-side rate limiter shared with other providers.
+            retry_policy: Retry policy for throttled and transient failures.
         """
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
         self.model_name = self.MODELS.get(model_name, model_name)
-        self.prompt_service = PromptService()
+        self.prompt_service = PromptService(top_k=config.TOOL_PROMPT_TOP_K, render_mode=config.TOOL_PROMPT_FORMAT)
         self.available_tools = []
         self.models = {}
+        self._models_lock = threading.Lock()
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(rate_limiter=rate_limiter)
+        self.function_catalog = None
+        self.tool_executor = None
+        self.max_function_rounds = 5
 
         if not self.api_key:
             logger.warning("No Gemini API key provided. The service will not work properly.")
@@ -73,37 +86,88 @@ class GeminiService:
         # Use the mapped model name if available
         actual_model_name = self.MODELS.get(model_name, model_name)
 
-        # Check if we already have this model initialized
+        # Check if we already have this model initialized (double-checked so concurrent
+        # requests and the warm-up thread create each model only once)
         if actual_model_name not in self.models:
-            # Configure generation parameters based on model
-            generation_config = None
-
-            # Configure thinking for 2.5 models
-            if "2.5" in actual_model_name:
-                generation_config = {
-                    "temperature": 0.7,
-                    "top_p": 0.95,
-                    "top_k": 64,
-                    "candidate_count": 1,
-                    "max_output_tokens": 8192,
-                }
+            with self._models_lock:
+                if actual_model_name not in self.models:
+                    # Configure generation parameters based on model
+                    generation_config = None
+
+                    # Configure thinking for 2.5 models
+                    if "2.5" in actual_model_name:
+                        generation_config = {
+                            "temperature": 0.7,
+                            "top_p": 0.95,
+                            "top_k": 64,
+                            "candidate_count": 1,
+                            "max_output_tokens": 8192,
+                        }
+
+                        # Add thinking for Pro models
+                        if "pro" in actual_model_name.lower():
+                            generation_config["thinking"] = {"enabled": True}
+
+                    # Create the model with appropriate configuration
+                    if generation_config:
+                        self.models[actual_model_name] = genai.GenerativeModel(
+                            actual_model_name,
+                            generation_config=generation_config
+                        )
+                    else:
+                        self.models[actual_model_name] = genai.GenerativeModel(actual_model_name)
+
+                    logger.info(f"Initialized model: {actual_model_name}")
 
-                # Add thinking for Pro models
-                if "pro" in actual_model_name.lower():
-                    generation_config["thinking"] = {"enabled": True}
+        return self.models[actual_model_name]
 
-            # Create the model with appropriate configuration
-            if generation_config:
-                self.models[actual_model_name] = genai.GenerativeModel(
-                    actual_model_name,
-                    generation_config=generation_config
-                )
-            else:
-                self.models[actual_model_name] = genai.GenerativeModel(actual_model_name)
+    def warm_up_model(self, model_name: str, probe: bool = False) -> Dict[str, Any]:
+        """
+        Pre-create a model and optionally send it a tiny probe request.
 
-            logger.info(f"Initialized model: {actual_model_name}")
+        The probe also opens the connection to the API so the first user request
+        does not pay for connection setup.
 
-        return self.models[actual_model_name]
+        Args:
+            model_name: The model name to warm up.
+            probe: Whether to send a one-token probe request.
+
+        Returns:
+            A dictionary describing the warm-up result.
+        """
+        if not self.api_key:
+            return {"status": "skipped", "error": "Gemini API key not configured"}
+
+        started = time.monotonic()
+        try:
+            model = self.get_model(model_name)
+            if probe:
+                model.generate_content("ping", generation_config={"max_output_tokens": 1})
+            return {"status": "ready", "probed": probe, "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+        except Exception as e:
+            logger.error(f"Error warming up Gemini model {model_name}: {e}")
+            return {"status": "failed", "error": str(e), "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Open the connection to the Gemini API without a billed generation request.
+
+        Counting the tokens of a one-word prompt goes through the same client as
+        generation, so its connection is established before the first user request.
+
+        Returns:
+            A dictionary describing the warm-up result.
+        """
+        if not self.api_key:
+            return {"status": "skipped", "error": "Gemini API key not configured"}
+
+        started = time.monotonic()
+        try:
+            self.get_model(self.model_name).count_tokens("ping")
+            return {"status": "ready", "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+        except Exception as e:
+            logger.error(f"Error warming up Gemini connection: {e}")
+            return {"status": "failed", "error": str(e), "duration_ms": round((time.monotonic() - started) * 1000, 1)}
 
     def set_available_tools(self, tools: List[Dict[str, Any]]):
         """
@@ -113,30 +177,172 @@ class GeminiService:
             tools: A list of dictionaries containing tool information.
         """
         self.available_tools = tools
+        self.prompt_service.build_index(tools)
         logger.info(f"Updated available tools: {len(self.available_tools)} tools")
 
-    def get_system_prompt(self) -> str:
+    def enable_function_calling(self, tools: List[Any], executor: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                                max_rounds: int = 5):
+        """
+        Let the model call MCP tools natively.
+
+        Declarations are rebuilt only when the catalog changes.
+
+        Args:
+            tools: MCP tool objects with name, description and inputSchema.
+            executor: Coroutine function that calls a tool by name with parameters.
+            max_rounds: Maximum function-call round trips per request.
+        """
+        if not self.function_catalog or self.function_catalog.version != FunctionCatalog.fingerprint(tools):
+            self.function_catalog = FunctionCatalog(tools)
+        self.tool_executor = executor
+        self.max_function_rounds = max_rounds
+
+    @property
+    def function_calling_enabled(self) -> bool:
+        """Whether requests expose MCP tools as callable functions."""
+        return bool(self.function_catalog and self.tool_executor and self.function_catalog.tools)
+
+    def _tool_kwargs(self) -> Dict[str, Any]:
+        """Get the request arguments that expose the function declarations."""
+        return {"tools": self.function_catalog.tools} if self.function_calling_enabled else {}
+
+    @staticmethod
+    def _parts(response) -> List[Any]:
+        """Get the content parts of a response or stream chunk."""
+        candidates = getattr(response, "candidates", None)
+        if not candidates or not getattr(candidates[0], "content", None):
+            return []
+        return list(candidates[0].content.parts)
+
+    @classmethod
+    def _response_text(cls, response) -> str:
+        """Get the text of a response or stream chunk, ignoring function-call parts."""
+        parts = cls._parts(response)
+        if not parts:
+            try:
+                return response.text or ""
+            except ValueError:
+                return ""
+        return "".join(part.text for part in parts if getattr(part, "text", None))
+
+    @classmethod
+    def _function_calls(cls, response) -> List[Any]:
+        """Get the function calls requested in a response or stream chunk."""
+        return [part.function_call for part in cls._parts(response)
+                if getattr(part, "function_call", None) and part.function_call.name]
+
+    @classmethod
+    def _to_plain(cls, value: Any) -> Any:
+        """Convert protobuf map/list values from function-call arguments into plain Python values."""
+        if hasattr(value, "items"):
+            return {key: cls._to_plain(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)) or (hasattr(value, "__iter__") and not isinstance(value, (str, bytes))):
+            return [cls._to_plain(item) for item in value]
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    async def _execute_function_calls(self, calls: List[Any], selected_tools: List[Dict[str, Any]] = None,
+                                      executor: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Execute the function calls of one model turn concurrently.
+
+        Args:
+            calls: The function calls requested by the model.
+            selected_tools: The tools described in the request's prompt, for hit-rate tracking.
+            executor: Optional executor replacing ``tool_executor`` for these calls.
+
+        Returns:
+            One dictionary per call with the function name, MCP tool name, arguments and result.
+        """
+        executor = executor or self.tool_executor
+
+        async def execute(call):
+            tool_name = self.function_catalog.resolve(call.name)
+            params = self._to_plain(call.args) if call.args else {}
+            started = time.monotonic()
+
+            if not tool_name:
+                result = {"error": f"Unknown function: {call.name}"}
+            else:
+                self.prompt_service.record_tool_use(tool_name, selected_tools)
+                try:
+                    result = await executor(tool_name, self.function_catalog.decode(call.name, params))
+                except Exception as e:
+                    logger.error(f"Error executing function {call.name}: {e}")
+                    result = {"error": str(e)}
+
+            logger.info(f"Function {call.name} finished in {(time.monotonic() - started) * 1000:.0f}ms")
+            return {"name": call.name, "tool": tool_name or call.name, "params": params, "result": result}
+
+        return await asyncio.gather(*(execute(call) for call in calls))
+
+    @staticmethod
+    def _function_response_parts(results: List[Dict[str, Any]]) -> List[Any]:
+        """Build the function-response parts sent back to the model."""
+        return [
+            genai.protos.Part(function_response=genai.protos.FunctionResponse(
+                name=result["name"],
+                response={"result": json.loads(json.dumps(result["result"], default=str))}
+            ))
+            for result in results
+        ]
+
+    def get_system_prompt(self, selected_tools: List[Dict[str, Any]] = None) -> str:
         """
         Get the system prompt with available tools.
 
+        Args:
+            selected_tools: If given, only these tools are described in detail.
+
         Returns:
             The system prompt string.
         """
-        return self.prompt_service.generate_system_prompt(self.available_tools)
+        return self.prompt_service.generate_system_prompt(self.available_tools, selected_tools)
 
-    def get_system_message(self) -> Dict[str, Any]:
+    def get_system_message(self, selected_tools: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Get the system message for the chat history.
 
+        Args:
+            selected_tools: If given, only these tools are described in detail.
+
         Returns:
             A dictionary containing the system message.
         """
         return {
             "role": "user",
-            "parts": [self.prompt_service.generate_user_system_message(self.available_tools)]
+            "parts": [self.prompt_service.generate_user_system_message(self.available_tools, selected_tools)]
         }
 
-    async def generate_response(self, message: str, history: List[Dict[str, str]] = None, model_name: str = None) -> Tuple[str, str]:
+    def _select_tools(self, message: str, history: List[Dict[str, str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Select the tools relevant to a request from the message and recent user turns.
+
+        Args:
+            message: The user's message.
+            history: The chat history.
+
+        Returns:
+            The relevant tools, or None if the whole catalog is described.
+        """
+        recent = [msg["content"] for msg in (history or []) if msg["role"] == "user"][-config.TOOL_PROMPT_HISTORY_MESSAGES:]
+        return self.prompt_service.select_tools(" ".join(recent + [message]))
+
+    async def _acquire(self, model_name: str, message: str, history: List[Dict[str, str]] = None):
+        """
+        Wait for rate limit capacity for a request.
+
+        Args:
+            model_name: The model the request is for.
+            message: The user's message.
+            history: The chat history sent with the message.
+        """
+        if self.rate_limiter:
+            await self.rate_limiter.acquire("gemini", model_name, estimate_tokens(message, history, 8192))
+
+    async def generate_response(self, message: str, history: List[Dict[str, str]] = None, model_name: str = None,
+                                tool_calls: List[Dict[str, Any]] = None) -> Tuple[str, str]:
         """
         Generate a response from the Gemini API.
 
@@ -144,6 +350,7 @@ class GeminiService:
             message: The user's message.
             history: The chat history.
             model_name: The model name to use. If None, uses the default model.
+            tool_calls: Optional list the executed function calls are appended to.
 
         Returns:
             A tuple containing the generated response and the model used.
@@ -159,9 +366,12 @@ class GeminiService:
             # Convert history to Gemini format
             gemini_history = []
 
-            # Add system message as the first message if we have available tools
+            # Add system message as the first message if we have available tools,
+            # describing only the tools relevant to this request
+            selected_tools = None
             if self.available_tools:
-                gemini_history.append(self.get_system_message())
+                selected_tools = self._select_tools(message, history)
+                gemini_history.append(self.get_system_message(selected_tools))
 
             if history:
                 for msg in history:
@@ -173,8 +383,28 @@ class GeminiService:
             # Create a chat session
             chat = model.start_chat(history=gemini_history)
 
-            # Generate a response
-            response = chat.send_message(message)
+            # Wait for rate limit capacity, then generate a response with retries
+            tool_kwargs = self._tool_kwargs()
+            await self._acquire(actual_model_name, message, history)
+            response = await self.retry_policy.call(
+                lambda: chat.send_message(message, **tool_kwargs), "gemini", actual_model_name
+            )
+
+            # Execute the model's function calls and send back the results until it answers
+            for _ in range(self.max_function_rounds):
+                calls = self._function_calls(response)
+                if not calls:
+                    break
+
+                results = await self._execute_function_calls(calls, selected_tools)
+                if tool_calls is not None:
+                    tool_calls.extend(results)
+
+                parts = self._function_response_parts(results)
+                await self._acquire(actual_model_name, message, history)
+                response = await self.retry_policy.call(
+                    lambda: chat.send_message(parts, **tool_kwargs), "gemini", actual_model_name
+                )
 
             # Check if there's thinking content
             thinking_content = ""
@@ -189,12 +419,13 @@ class GeminiService:
             if thinking_content:
                 logger.debug(f"Thinking content: {thinking_content}")
 
-            return response.text, actual_model_name
+            return self._response_text(response), actual_model_name
         except Exception as e:
             logger.error(f"Error generating response from Gemini: {e}")
             return f"I'm sorry, I encountered an error: {str(e)}", "error"
 
-    async def stream_response(self, message: str, history: List[Dict[str, str]] = None, model_name: str = None) -> AsyncGenerator[Dict[str, Any], None]:
+    async def stream_response(self, message: str, history: List[Dict[str, str]] = None, model_name: str = None,
+                              tool_executor: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]] = None) -> AsyncGenerator[Dict[str, Any], None]:
         """
         Stream a response from the Gemini API.
 
@@ -202,6 +433,8 @@ class GeminiService:
             message: The user's message.
             history: The chat history.
             model_name: The model name to use. If None, uses the default model.
+            tool_executor: Optional executor of this request's function calls, e.g. one bound
+                to the request's deadline. Defaults to the executor set by ``enable_function_calling``.
 
         Yields:
             Dictionaries containing response chunks and metadata.
@@ -222,9 +455,12 @@ class GeminiService:
             # Convert history to Gemini format
             gemini_history = []
 
-            # Add system message as the first message if we have available tools
+            # Add system message as the first message if we have available tools,
+            # describing only the tools relevant to this request
+            selected_tools = None
             if self.available_tools:
-                gemini_history.append(self.get_system_message())
+                selected_tools = self._select_tools(message, history)
+                gemini_history.append(self.get_system_message(selected_tools))
 
             if history:
                 for msg in history:
@@ -247,45 +483,84 @@ class GeminiService:
                     "text": "Thinking about your request..."
                 }
 
-            # Stream the response
-            response_stream = chat.send_message_streaming(message)
-
             # Track if we've seen thinking content
             thinking_shown = False
 
             # Collect the full response
             full_response = ""
+            tool_calls = []
+            tool_kwargs = self._tool_kwargs()
+            content = message
+
+            for round_number in range(self.max_function_rounds + 1):
+                # Wait for rate limit capacity, then start the stream with retries. Failures after
+                # the first chunk are not retried since content has already been sent.
+                await self._acquire(actual_model_name, message, history)
+                response_stream = await self.retry_policy.call(
+                    lambda: chat.send_message_streaming(content, **tool_kwargs), "gemini", actual_model_name
+                )
+
+                calls = []
+
+                # Process the stream
+                for chunk in response_stream:
+                    # Check for thinking content
+                    if hasattr(chunk, 'candidates') and chunk.candidates:
+                        for candidate in chunk.candidates:
+                            if hasattr(candidate, 'thinking') and candidate.thinking and not thinking_shown:
+                                # Yield thinking content
+                                await asyncio.sleep(0)  # Ensure this is truly asynchronous
+                                yield {
+                                    "type": "thinking",
+                                    "text": candidate.thinking
+                                }
+                                thinking_shown = True
+
+                    # Collect function calls; they are executed once the turn is complete
+                    calls.extend(self._function_calls(chunk))
+
+                    # Get the text chunk
+                    text = self._response_text(chunk)
+                    if text:
+                        full_response += text
+                        await asyncio.sleep(0)  # Ensure this is truly asynchronous
+                        yield {
+                            "type": "content",
+                            "text": text,
+                            "model_used": actual_model_name
+                        }
+
+                if not calls or round_number == self.max_function_rounds:
+                    break
+
+                # Execute all function calls of this turn concurrently
+                for call in calls:
+                    yield {
+                        "type": "status",
+                        "text": f"Connecting to {self.function_catalog.resolve(call.name) or call.name} tool..."
+                    }
 
-            # Process the stream
-            for chunk in response_stream:
-                # Check for thinking content
-                if hasattr(chunk, 'candidates') and chunk.candidates:
-                    for candidate in chunk.candidates:
-                        if hasattr(candidate, 'thinking') and candidate.thinking and not thinking_shown:
-                            # Yield thinking content
-                            await asyncio.sleep(0)  # Ensure this is truly asynchronous
-                            yield {
-                                "type": "thinking",
-                                "text": candidate.thinking
-                            }
-                            thinking_shown = True
-
-                # Get the text chunk
-                if chunk.text:
-                    full_response += chunk.text
-                    await asyncio.sleep(0)  # Ensure this is truly asynchronous
+                results = await self._execute_function_calls(calls, selected_tools, tool_executor)
+                tool_calls.extend(results)
+
+                for result in results:
+                    service, _, action = result["tool"].partition("_")
                     yield {
-                        "type": "content",
-                        "text": chunk.text,
-                        "model_used": actual_model_name
+                        "type": "mcp_result",
+                        "service": service,
+                        "action": action,
+                        "result": result["result"]
                     }
 
+                content = self._function_response_parts(results)
+
             # Final message with complete response
             await asyncio.sleep(0)  # Ensure this is truly asynchronous
             yield {
                 "type": "complete",
                 "text": full_response,
-                "model_used": actual_model_name
+                "model_used": actual_model_name,
+                "tool_calls": [result["tool"] for result in tool_calls]
             }
 
         except Exception as e:
@@ -0,0 +1,125 @@
+"""
+On-disk snapshots of the MCP tool catalog.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional, Tuple
+
+from .functions import FunctionCatalog
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+def diff_catalogs(old_tools: List[Any], new_tools: List[Any]) -> Dict[str, List[str]]:
+    """
+    Compare two tool catalogs.
+
+    Args:
+        old_tools: The previous MCP tool objects.
+        new_tools: The new MCP tool objects.
+
+    Returns:
+        The names of added, removed and changed tools.
+    """
+    old = {tool.name: FunctionCatalog.fingerprint([tool]) for tool in old_tools}
+    new = {tool.name: FunctionCatalog.fingerprint([tool]) for tool in new_tools}
+    return {
+        "added": sorted(set(new) - set(old)),
+        "removed": sorted(set(old) - set(new)),
+        "changed": sorted(name for name in set(old) & set(new) if old[name] != new[name])
+    }
+
+class CatalogSnapshot:
+    """A versioned copy of the tool catalog, loaded at startup before the MCP server answers."""
+
+    def __init__(self, path: str, server_url: str = None):
+        """
+        Initialize the snapshot.
+
+        Args:
+            path: The snapshot file.
+            server_url: The MCP server the catalog belongs to; snapshots of other servers are ignored.
+        """
+        self.path = path
+        self.server_url = server_url
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[Tuple[List[Any], Dict[str, Any]]]:
+        """
+        Load the snapshot.
+
+        Returns:
+            A tuple of (tools, metadata with "version" and "fetched_at"), or None if there is
+            no usable snapshot. Tools have the name, description and inputSchema attributes
+            of MCP tool objects.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool catalog snapshot {self.path}: {e}")
+            return None
+
+        if data.get("format") != SNAPSHOT_FORMAT or data.get("server_url") != self.server_url:
+            logger.info("Ignoring tool catalog snapshot of another format or server")
+            return None
+
+        tools = []
+        for tool in data.get("tools", []):
+            loaded = SimpleNamespace(name=tool["name"], description=tool.get("description"),
+                                     inputSchema=tool.get("inputSchema"))
+            # Tools of a federated catalog remember the server they are routed to
+            if tool.get("server"):
+                loaded.server = tool["server"]
+                loaded.server_tool_name = tool.get("server_tool_name") or tool["name"]
+            tools.append(loaded)
+        return tools, {"version": data.get("version"), "fetched_at": data.get("fetched_at")}
+
+    def save(self, tools: List[Any], version: str):
+        """
+        Write the snapshot atomically.
+
+        Args:
+            tools: MCP tool objects.
+            version: The catalog fingerprint.
+        """
+        data = {
+            "format": SNAPSHOT_FORMAT,
+            "server_url": self.server_url,
+            "version": version,
+            "fetched_at": time.time(),
+            "tools": [self._record(tool) for tool in tools]
+        }
+
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                temp_path = f"{self.path}.{threading.get_ident()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, default=str)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error(f"Error saving tool catalog snapshot: {e}")
+
+    @staticmethod
+    def _record(tool: Any) -> Dict[str, Any]:
+        """Serialize a tool, with its server if it belongs to a federated catalog."""
+        record = {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": getattr(tool, "inputSchema", None)
+        }
+        if getattr(tool, "server", None):
+            record["server"] = tool.server
+            record["server_tool_name"] = getattr(tool, "server_tool_name", tool.name)
+        return record
@@ -0,0 +1,197 @@
+"""
+Precomputed lookups and parameter validators for one version of the MCP tool catalog.
+"""
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+from .functions import FunctionCatalog
+from .tool_policy import catalog_services, tool_service
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Python types accepted for each JSON Schema type (bool is excluded from numbers below)
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list, tuple),
+    "object": (dict,),
+    "null": (type(None),)
+}
+
+# Parameters the MCP client fills in when a caller leaves them out
+GENERATED_PARAMETERS = {"instructions"}
+
+def _schema_types(schema: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """Get the JSON types a property schema allows, or None if any value is allowed."""
+    if "anyOf" in schema or "oneOf" in schema:
+        types = []
+        for alternative in schema.get("anyOf", []) + schema.get("oneOf", []):
+            alternative_types = _schema_types(alternative) if isinstance(alternative, dict) else None
+            if alternative_types is None:
+                return None
+            types.extend(alternative_types)
+        return tuple(types)
+
+    schema_type = schema.get("type")
+    if schema_type is None:
+        return None
+    types = tuple(schema_type) if isinstance(schema_type, list) else (schema_type,)
+    if schema.get("nullable"):
+        types += ("null",)
+    return types if all(t in JSON_TYPES for t in types) else None
+
+def _matches(value: Any, json_type: str) -> bool:
+    """Check a value against one JSON type."""
+    if json_type in ("integer", "number") and isinstance(value, bool):
+        return False
+    if isinstance(value, JSON_TYPES[json_type]):
+        return True
+    # Actions parsed from model text carry scalars as strings; the server coerces those
+    if isinstance(value, str) and json_type in ("integer", "number", "boolean"):
+        text = value.strip().lower()
+        if json_type == "boolean":
+            return text in ("true", "false")
+        try:
+            number = float(text)
+        except ValueError:
+            return False
+        return json_type == "number" or number.is_integer()
+    return False
+
+class ParameterValidator:
+    """Checks of a tool's required parameters, parameter types and enums, compiled from its inputSchema."""
+
+    def __init__(self, schema: Dict[str, Any]):
+        """
+        Compile the validator.
+
+        Args:
+            schema: The tool's inputSchema.
+        """
+        schema = schema if isinstance(schema, dict) else {}
+        properties = schema.get("properties") or {}
+
+        self.required = tuple(name for name in schema.get("required", []) if name not in GENERATED_PARAMETERS)
+        self.closed = schema.get("additionalProperties") is False
+        self.known = frozenset(properties) | GENERATED_PARAMETERS
+        self.checks = {}
+        for name, prop in properties.items():
+            if not isinstance(prop, dict):
+                continue
+            types = _schema_types(prop)
+            enum = prop.get("enum")
+            if types is not None or enum:
+                self.checks[name] = (types, tuple(enum) if enum else None)
+
+    def validate(self, params: Dict[str, Any]) -> List[str]:
+        """
+        Validate call parameters.
+
+        Args:
+            params: The parameters to pass to the tool.
+
+        Returns:
+            A list of problems; empty if the parameters are valid.
+        """
+        if not isinstance(params, dict):
+            return ["parameters must be an object"]
+
+        errors = [f"missing required parameter '{name}'" for name in self.required
+                  if params.get(name) in (None, "")]
+
+        for name, value in params.items():
+            check = self.checks.get(name)
+            if check is None:
+                if self.closed and name not in self.known:
+                    errors.append(f"unknown parameter '{name}'")
+                continue
+
+            types, enum = check
+            if value is None and (types is None or "null" in types):
+                continue
+            if types is not None and not any(_matches(value, json_type) for json_type in types):
+                errors.append(f"parameter '{name}' must be of type {' or '.join(types)}")
+            elif enum and value not in enum:
+                errors.append(f"parameter '{name}' must be one of {', '.join(map(str, enum))}")
+
+        return errors
+
+class CatalogIndex:
+    """
+    Name, service and validator lookups built once per catalog version.
+
+    Indexes are immutable; a catalog change builds a new index that is swapped in whole,
+    so readers never see a half-built catalog.
+    """
+
+    def __init__(self, tools: List[Any], version: str = None):
+        """
+        Build the index.
+
+        Args:
+            tools: MCP tool objects with name, description and inputSchema.
+            version: The catalog fingerprint, if already computed.
+        """
+        self.version = version or FunctionCatalog.fingerprint(tools)
+        self.tools = {}
+        self.descriptions = []
+        self.services = {}
+        self.validators = {}
+        self._service_names = catalog_services(tool.name for tool in tools)
+
+        for tool in tools:
+            schema = getattr(tool, "inputSchema", None) or {}
+            tool_info = {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": list((schema.get("properties") or {}).keys())
+            }
+            self.tools[tool.name] = tool
+            self.descriptions.append(tool_info)
+            self.services.setdefault(self.service_of(tool.name), []).append(tool_info)
+            self.validators[tool.name] = ParameterValidator(schema)
+
+    def service_of(self, tool_name: str) -> str:
+        """
+        Get the service a tool belongs to, as grouped in ``services``.
+
+        Args:
+            tool_name: The tool name; tools missing from the catalog are matched by prefix.
+
+        Returns:
+            The service name.
+        """
+        return tool_service(tool_name, self._service_names)
+
+    def get(self, tool_name: str) -> Optional[Any]:
+        """
+        Get a tool by name.
+
+        Args:
+            tool_name: The tool name.
+
+        Returns:
+            The MCP tool object, or None if the catalog has no such tool.
+        """
+        return self.tools.get(tool_name)
+
+    def validate(self, tool_name: str, params: Dict[str, Any]) -> List[str]:
+        """
+        Validate call parameters against a tool's schema.
+
+        Tools missing from the index are not rejected, since the catalog may trail the
+        server between refreshes; the server validates those itself.
+
+        Args:
+            tool_name: The tool name.
+            params: The parameters to pass to the tool.
+
+        Returns:
+            A list of problems; empty if the call may be dispatched.
+        """
+        validator = self.validators.get(tool_name)
+        return validator.validate(params) if validator else []
@@ -4,11 +4,14 @@ MCP client for interacting with the MCP server.
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable, Awaitable
 
 from fastmcp import Client
 from fastmcp.client.transports import StreamableHttpTransport
 
+from ..background_loop import BackgroundLoop
+from .session import MCPSession
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -16,27 +19,45 @@ logger = logging.getLogger(__name__)
 class MCPClient:
     """Client for interacting with the MCP server."""
 
-    def __init__(self, server_url: str = None):
+    def __init__(self, server_url: str = None, background_loop: BackgroundLoop = None,
+                 ping_interval: float = 30.0, max_concurrent_calls: int = 16):
         """
         Initialize the MCP client.
 
         Args:
             server_url: The MCP server URL. If None, uses the default URL.
+            background_loop: Event loop the persistent session lives on.
+            ping_interval: Seconds between keep-alive pings of the session.
+            max_concurrent_calls: Maximum tool calls in flight over the session.
         """
         # Default MCP server URL if none provided
         self.server_url = server_url or "https://mcp.zapier.com/api/mcp/s/ODk0NzRkOWYtYTRmYS00ODMzLWI0MTEtNjY1NTAzNDFmNWY3OjNkZmQ2YmNmLTJiZTMtNGNmOS05YjU1LTc0MTk0N2VlY2E1YQ==/mcp"
-        self.transport = StreamableHttpTransport(self.server_url)
-        self.client = Client(transport=self.transport)
-        
+
+        # One session is opened and shared by every call instead of a handshake per call
+        self.session = MCPSession(
+            self._new_client,
+            background_loop=background_loop,
+            ping_interval=ping_interval,
+            max_concurrent_calls=max_concurrent_calls
+        )
+
+    @property
+    def background_loop(self) -> BackgroundLoop:
+        """The event loop the persistent session lives on."""
+        return self.session.background_loop
+
+    def _new_client(self) -> Client:
+        """Create an unopened client for a new session."""
+        return Client(transport=StreamableHttpTransport(self.server_url))
+
     async def connect(self):
         """Connect to the MCP server."""
         try:
             logger.debug(f"Attempting to connect to MCP server at: {self.server_url}")
 
-            # The client is already initialized, so we just need to check the connection
-            async with self.client as client:
-                logger.info(f"Connected to MCP server: {client.is_connected()}")
-                return True
+            connected = await self.session.start()
+            logger.info(f"Connected to MCP server: {connected}")
+            return connected
         except Exception as e:
             logger.error(f"Error connecting to MCP server: {e}")
             logger.exception("Detailed exception information:")
@@ -45,21 +66,45 @@ class MCPClient:
     async def disconnect(self):
         """Disconnect from the MCP server."""
         try:
-            # The client is automatically disconnected when the context manager exits
-            # This method is kept for API compatibility
-            logger.info("MCP client will disconnect automatically when context manager exits")
+            await self.session.close()
             return True
         except Exception as e:
             logger.error(f"Error disconnecting from MCP server: {e}")
             return False
-            
-    async def call_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+
+    def is_connected(self) -> bool:
+        """Check whether the persistent session is open."""
+        return self.session.connected
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the state of the persistent session.
+
+        Returns:
+            A dictionary with the connection state, last ping and call counters.
+        """
+        return self.session.get_state()
+
+    async def list_tools(self) -> List[Any]:
+        """
+        List the tools the MCP server offers.
+
+        Returns:
+            The MCP tool objects.
+        """
+        return await self.session.list_tools()
+
+
+    async def call_tool(self, tool_name: str, params: Dict[str, Any],
+                        progress_handler: Callable[[float, Optional[float], Optional[str]], Awaitable[None]] = None) -> Dict[str, Any]:
         """
         Call a specific MCP tool with parameters.
 
         Args:
             tool_name: The name of the tool to call.
             params: The parameters to pass to the tool.
+            progress_handler: Optional coroutine function receiving the server's progress
+                notifications (progress, total, message) for this call.
 
         Returns:
             A dictionary containing the result of the operation.
@@ -77,16 +122,15 @@ class MCPClient:
 
             logger.debug(f"Calling MCP tool {tool_name} with params: {params}")
 
-            # Use a context manager to ensure proper connection handling
-            async with self.client as client:
-                result = await client.call_tool(tool_name, params)
-                logger.debug(f"Received result from MCP tool: {result}")
+            # Multiplexed over the persistent session
+            result = await self.session.call_tool(tool_name, params, progress_handler=progress_handler)
+            logger.debug(f"Received result from MCP tool: {result}")
 
-                # Parse the result
-                if result and hasattr(result[0], 'text'):
-                    parsed_result = json.loads(result[0].text)
-                    logger.debug(f"Parsed result: {parsed_result}")
-                    return parsed_result
+            # Parse the result
+            if result and hasattr(result[0], 'text'):
+                parsed_result = json.loads(result[0].text)
+                logger.debug(f"Parsed result: {parsed_result}")
+                return parsed_result
 
             logger.warning("No result returned from MCP tool")
             return {"error": "No result returned"}
@@ -0,0 +1,265 @@
+"""
+One MCP client facade over several MCP servers with a merged tool catalog.
+"""
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+
+from ..background_loop import BackgroundLoop
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Separates the server prefix of a tool renamed because of a name collision
+ALIAS_SEPARATOR = "__"
+
+class FederatedMCPClient:
+    """
+    Routes MCP calls to several servers, each over its own persistent session.
+
+    Catalogs are fetched from every server in parallel and merged in server order: the
+    first server to offer a tool name keeps it, and colliding tools of later servers are
+    renamed ``<server>__<tool>``. A server that does not answer within the catalog timeout
+    is left out of that fetch and merged in when it answers, so one slow or failed server
+    never holds up the others. A server's last known tools are kept while it is down.
+    """
+
+    def __init__(self, clients: Dict[str, Any], background_loop: BackgroundLoop, catalog_timeout: float = 10.0):
+        """
+        Initialize the client.
+
+        Args:
+            clients: MCP clients by server name, in priority order. Each implements
+                ``connect``, ``disconnect``, ``is_connected``, ``get_state``, ``list_tools``
+                and ``call_tool`` like ``MCPClient``, on the shared background loop.
+            background_loop: The loop every server session lives on.
+            catalog_timeout: Seconds to wait for servers when connecting and fetching catalogs.
+        """
+        if not clients:
+            raise ValueError("At least one MCP server is required")
+
+        self.clients = dict(clients)
+        self.primary = next(iter(self.clients))
+        self.background_loop = background_loop
+        self.catalog_timeout = catalog_timeout
+        self.server_url = "|".join(f"{name}={getattr(client, 'server_url', '')}" for name, client in self.clients.items())
+
+        # Called with the merged catalog when a slow server's tools arrive after a fetch returned
+        self.on_catalog_change: Optional[Callable[[List[Any]], None]] = None
+
+        self.server_tools = {}
+        self.server_errors = {}
+        self.routes = {}
+        self.collisions = []
+        self._fetches = {}
+        self._late = set()
+        self._connects = {}
+
+    async def connect(self) -> bool:
+        """
+        Connect to every server in parallel.
+
+        Returns:
+            True if at least one server connected within the catalog timeout. The others
+            keep connecting in the background.
+        """
+        return await self.background_loop.run(self._connect())
+
+    async def disconnect(self) -> bool:
+        """
+        Disconnect from every server.
+
+        Returns:
+            True if every server disconnected cleanly.
+        """
+        results = await self.background_loop.run(asyncio.gather(
+            *(client.disconnect() for client in self.clients.values()), return_exceptions=True
+        ))
+        return all(result is True for result in results)
+
+    def is_connected(self) -> bool:
+        """Check whether any server session is open."""
+        return any(client.is_connected() for client in self.clients.values())
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the state of every server session.
+
+        Returns:
+            A dictionary with the overall state, summed call counters and per-server
+            session state, tool count and last catalog error.
+        """
+        servers = {}
+        for name, client in self.clients.items():
+            servers[name] = dict(client.get_state(), tools=len(self.server_tools.get(name) or []),
+                                 catalog_error=self.server_errors.get(name))
+
+        connected = [state["connected"] for state in servers.values()]
+        state = {
+            "state": "connected" if all(connected) else "degraded" if any(connected) else "disconnected",
+            "connected": any(connected),
+            "collisions": list(self.collisions),
+            "servers": servers
+        }
+        for counter in ("in_flight", "connects", "reconnects", "calls", "call_failures", "ping_failures"):
+            state[counter] = sum(server.get(counter, 0) for server in servers.values())
+        return state
+
+    async def list_tools(self) -> List[Any]:
+        """
+        Fetch every server's catalog in parallel and merge them.
+
+        Returns:
+            The merged tool objects, each with ``server`` and ``server_tool_name`` attributes.
+
+        Raises:
+            ConnectionError: If no server has ever returned a catalog.
+        """
+        return await self.background_loop.run(self._list_tools())
+
+    async def call_tool(self, tool_name: str, params: Dict[str, Any],
+                        progress_handler: Callable[[float, Optional[float], Optional[str]], Awaitable[None]] = None) -> Dict[str, Any]:
+        """
+        Call a tool on the server that owns it.
+
+        Args:
+            tool_name: The tool's name in the merged catalog.
+            params: The parameters to pass to the tool.
+            progress_handler: Optional coroutine function receiving progress notifications.
+
+        Returns:
+            A dictionary containing the result of the operation.
+        """
+        server, server_tool_name = self.route(tool_name)
+        return await self.clients[server].call_tool(server_tool_name, params, progress_handler=progress_handler)
+
+    def route(self, tool_name: str) -> Tuple[str, str]:
+        """
+        Find the server owning a tool.
+
+        Args:
+            tool_name: The tool's name in the merged catalog.
+
+        Returns:
+            A tuple of (server name, the tool's name on that server). Tools missing from the
+            catalog go to the first server, or to the server named by an alias prefix.
+        """
+        if tool_name in self.routes:
+            return self.routes[tool_name]
+
+        prefix, separator, name = tool_name.partition(ALIAS_SEPARATOR)
+        if separator and prefix in self.clients:
+            return prefix, name
+        return self.primary, tool_name
+
+    def restore_routes(self, tools: List[Any]):
+        """
+        Adopt the routing of a merged catalog loaded from a snapshot.
+
+        Servers that have not answered yet are seeded with their snapshot tools, so their
+        tool names stay stable when the first live fetch merges the catalogs again.
+
+        Args:
+            tools: Merged tool objects with ``server`` and ``server_tool_name`` attributes.
+        """
+        seeded = {}
+        for tool in tools:
+            server = getattr(tool, "server", None)
+            if server not in self.clients:
+                continue
+            server_tool_name = getattr(tool, "server_tool_name", None) or tool.name
+            self.routes[tool.name] = (server, server_tool_name)
+            seeded.setdefault(server, []).append(SimpleNamespace(
+                name=server_tool_name, description=tool.description, inputSchema=getattr(tool, "inputSchema", None)
+            ))
+
+        for server, server_tools in seeded.items():
+            self.server_tools.setdefault(server, server_tools)
+
+    async def _connect(self) -> bool:
+        """Start every session and wait up to the catalog timeout for them."""
+        for name, client in self.clients.items():
+            if name not in self._connects or self._connects[name].done():
+                self._connects[name] = asyncio.ensure_future(client.connect())
+
+        await asyncio.wait(list(self._connects.values()), timeout=self.catalog_timeout)
+        for name, task in self._connects.items():
+            if not task.done():
+                logger.warning(f"MCP server {name} is still connecting; continuing without it")
+            elif not task.result():
+                logger.warning(f"Failed to connect to MCP server {name}")
+        return self.is_connected()
+
+    async def _list_tools(self) -> List[Any]:
+        """Fetch catalogs with the catalog timeout, merging late ones when they arrive."""
+        for name, client in self.clients.items():
+            if name not in self._fetches or self._fetches[name].done():
+                # One callback per fetch; it only publishes fetches that outlived a list_tools call
+                self._fetches[name] = asyncio.ensure_future(self._fetch(name, client))
+                self._fetches[name].add_done_callback(lambda _, name=name: self._merge_late(name))
+
+        _, slow = await asyncio.wait(list(self._fetches.values()), timeout=self.catalog_timeout)
+        for name, task in self._fetches.items():
+            if task in slow:
+                logger.warning(f"MCP server {name} did not return its catalog within {self.catalog_timeout}s; "
+                               f"merging it when it does")
+                self._late.add(name)
+
+        if not self.server_tools:
+            raise ConnectionError(f"No MCP server returned a catalog: {self.server_errors}")
+        return self._merge()
+
+    async def _fetch(self, name: str, client: Any):
+        """Fetch one server's catalog, recording rather than raising failures."""
+        try:
+            self.server_tools[name] = list(await client.list_tools())
+            self.server_errors[name] = None
+            logger.info(f"Fetched {len(self.server_tools[name])} tools from MCP server {name}")
+        except Exception as e:
+            self.server_errors[name] = str(e) or type(e).__name__
+            logger.error(f"Error fetching tools from MCP server {name}: {e}")
+
+    def _merge_late(self, name: str):
+        """Publish the merged catalog once a slow server has answered."""
+        if name not in self._late:
+            return
+        self._late.discard(name)
+        if self.server_errors.get(name) is None and self.on_catalog_change is not None:
+            try:
+                self.on_catalog_change(self._merge())
+            except Exception as e:
+                logger.error(f"Error applying the late catalog of MCP server {name}: {e}")
+
+    def _merge(self) -> List[Any]:
+        """Merge the per-server catalogs in server order and rebuild the routes."""
+        merged = []
+        routes = {}
+        collisions = []
+
+        for server in self.clients:
+            for tool in self.server_tools.get(server) or []:
+                name = tool.name
+                if name in routes:
+                    name = f"{server}{ALIAS_SEPARATOR}{tool.name}"
+                    collisions.append({"tool": tool.name, "server": server, "renamed_to": name,
+                                       "owner": routes[tool.name][0]})
+                    if name in routes:
+                        continue
+
+                routes[name] = (server, tool.name)
+                merged.append(SimpleNamespace(
+                    name=name,
+                    description=tool.description,
+                    inputSchema=getattr(tool, "inputSchema", None),
+                    server=server,
+                    server_tool_name=tool.name
+                ))
+
+        if collisions and collisions != self.collisions:
+            logger.warning(f"Renamed {len(collisions)} colliding MCP tools: "
+                           f"{', '.join(collision['renamed_to'] for collision in collisions)}")
+        self.routes = routes
+        self.collisions = collisions
+        return merged
@@ -0,0 +1,224 @@
+"""
+Conversion of the MCP tool catalog into Gemini function declarations.
+"""
+import hashlib
+import json
+import logging
+import re
+from typing import Dict, List, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# JSON Schema types Gemini's OpenAPI subset understands
+SCHEMA_TYPES = {"string", "number", "integer", "boolean", "array", "object"}
+
+# Gemini function names: letters, digits and underscores, at most 64 characters
+FUNCTION_NAME_PATTERN = re.compile(r"[^a-zA-Z0-9_]")
+
+def sanitize_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a JSON Schema to the subset Gemini accepts for function parameters.
+
+    Unsupported keywords ($schema, additionalProperties, default, title, ...) are dropped,
+    union types become a single nullable type, and objects without properties become
+    strings holding JSON, since Gemini rejects empty object schemas.
+
+    Args:
+        schema: The JSON Schema of a tool input or one of its properties.
+
+    Returns:
+        The sanitized schema.
+    """
+    if not isinstance(schema, dict):
+        return {"type": "string"}
+
+    # anyOf/oneOf: take the first concrete alternative
+    for union_key in ("anyOf", "oneOf"):
+        alternatives = [alt for alt in schema.get(union_key, []) if isinstance(alt, dict) and alt.get("type") != "null"]
+        if alternatives:
+            merged = dict(alternatives[0])
+            merged.setdefault("description", schema.get("description"))
+            return sanitize_schema(merged)
+
+    schema_type = schema.get("type", "string")
+    nullable = False
+    if isinstance(schema_type, list):
+        nullable = "null" in schema_type
+        schema_type = next((t for t in schema_type if t != "null"), "string")
+    if schema_type not in SCHEMA_TYPES:
+        schema_type = "string"
+
+    result = {"type": schema_type}
+    if schema.get("description"):
+        result["description"] = str(schema["description"])
+    if nullable or schema.get("nullable"):
+        result["nullable"] = True
+
+    if schema_type == "string":
+        enum = [str(value) for value in schema.get("enum", []) if value is not None]
+        if enum:
+            result["enum"] = enum
+        if schema.get("format") in ("enum", "date-time"):
+            result["format"] = schema["format"]
+    elif schema_type == "array":
+        result["items"] = sanitize_schema(schema.get("items", {"type": "string"}))
+    elif schema_type == "object":
+        properties = {
+            name: sanitize_schema(prop)
+            for name, prop in (schema.get("properties") or {}).items()
+        }
+        if not properties:
+            result["type"] = "string"
+            result["description"] = (result.get("description", "") + " (JSON object)").strip()
+            return result
+
+        result["properties"] = properties
+        required = [name for name in schema.get("required", []) if name in properties]
+        if required:
+            result["required"] = required
+
+    return result
+
+def decode_arguments(schema: Dict[str, Any], value: Any) -> Any:
+    """
+    Undo ``sanitize_schema`` on the arguments of a function call.
+
+    Objects without properties are declared to Gemini as strings holding JSON; their
+    values are decoded back into objects so they match the tool's own schema.
+
+    Args:
+        schema: The original JSON Schema the value was declared from.
+        value: The argument the model sent.
+
+    Returns:
+        The value with JSON strings decoded where the original schema expects an object.
+        Strings that are not valid JSON are returned unchanged.
+    """
+    if not isinstance(schema, dict):
+        return value
+
+    for union_key in ("anyOf", "oneOf"):
+        alternatives = [alt for alt in schema.get(union_key, []) if isinstance(alt, dict) and alt.get("type") != "null"]
+        if alternatives:
+            return decode_arguments(alternatives[0], value)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), None)
+
+    if schema_type == "object":
+        properties = schema.get("properties") or {}
+        if not properties and isinstance(value, str):
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        if isinstance(value, dict):
+            return {key: decode_arguments(properties.get(key), item) for key, item in value.items()}
+    elif schema_type == "array" and isinstance(value, list):
+        return [decode_arguments(schema.get("items"), item) for item in value]
+
+    return value
+
+class FunctionCatalog:
+    """Gemini function declarations built once per MCP tool catalog."""
+
+    def __init__(self, tools: List[Any], max_functions: int = 128, excluded_parameters: List[str] = None):
+        """
+        Build declarations for a tool catalog.
+
+        Args:
+            tools: MCP tool objects with name, description and inputSchema.
+            max_functions: Maximum number of declarations sent to the model.
+            excluded_parameters: Parameters filled in by the server rather than the model.
+        """
+        self.excluded_parameters = set(excluded_parameters or ["instructions"])
+        self.version = self.fingerprint(tools)
+        self.declarations = []
+        self.tool_names = {}
+        self.schemas = {}
+
+        for tool in tools[:max_functions]:
+            name = FUNCTION_NAME_PATTERN.sub("_", tool.name)[:64]
+            self.tool_names[name] = tool.name
+            self.schemas[name] = getattr(tool, "inputSchema", None) or {}
+            self.declarations.append(self._declare(name, tool))
+
+        if len(tools) > max_functions:
+            logger.warning(f"Declared {max_functions} of {len(tools)} MCP tools as functions")
+
+        logger.info(f"Built {len(self.declarations)} function declarations (catalog {self.version[:12]})")
+
+    @staticmethod
+    def fingerprint(tools: List[Any]) -> str:
+        """
+        Compute a version hash of a tool catalog.
+
+        Args:
+            tools: MCP tool objects.
+
+        Returns:
+            A hex digest that changes whenever a name, description or schema changes.
+        """
+        digest = hashlib.sha256()
+        for tool in tools:
+            digest.update(json.dumps(
+                [tool.name, tool.description, getattr(tool, "inputSchema", None)],
+                sort_keys=True, default=str
+            ).encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        """The ``tools`` argument for Gemini requests."""
+        return [{"function_declarations": self.declarations}] if self.declarations else []
+
+    def resolve(self, function_name: str) -> Optional[str]:
+        """
+        Map a declared function name back to its MCP tool name.
+
+        Args:
+            function_name: The name the model called.
+
+        Returns:
+            The MCP tool name, or None if the function is unknown.
+        """
+        return self.tool_names.get(function_name)
+
+    def decode(self, function_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn the arguments of a function call back into the tool's parameters.
+
+        Args:
+            function_name: The name the model called.
+            args: The arguments the model sent.
+
+        Returns:
+            The arguments, with JSON-string stand-ins for free-form objects decoded.
+        """
+        schema = dict(self.schemas.get(function_name) or {}, type="object")
+        return decode_arguments(schema, args)
+
+    def _declare(self, name: str, tool: Any) -> Dict[str, Any]:
+        """Build the declaration of one tool."""
+        schema = dict(getattr(tool, "inputSchema", None) or {})
+        properties = {
+            key: value for key, value in (schema.get("properties") or {}).items()
+            if key not in self.excluded_parameters
+        }
+
+        declaration = {
+            "name": name,
+            "description": (tool.description or tool.name)[:1024]
+        }
+
+        if properties:
+            declaration["parameters"] = sanitize_schema({
+                "type": "object",
+                "properties": properties,
+                "required": schema.get("required", [])
+            })
+
+        return declaration
@@ -0,0 +1,387 @@
+"""
+Queue of MCP tool calls run in the background and journaled to disk.
+"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+
+from ..background_loop import BackgroundLoop
+from .tool_policy import is_read_only_tool
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Job states; the last two are final
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINAL_STATES = {SUCCEEDED, FAILED}
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue holds its maximum number of jobs."""
+
+class JobJournalError(Exception):
+    """Raised when a submitted job cannot be written to the journal and is not accepted."""
+
+class MCPJobQueue:
+    """
+    Bounded pool of workers running MCP tool calls submitted as jobs.
+
+    Submitting returns at once with a job id; workers on the MCP session's loop run the
+    calls. Every state change is appended to a journal, which is replayed at startup:
+    queued jobs run again, and jobs interrupted while running are re-queued if the tool
+    is read-only, or failed otherwise, since the server may already have carried out the
+    action. The journal is rewritten with one record per retained job at startup, when
+    finished jobs expire, and after every ``compact_after`` appends.
+    """
+
+    def __init__(self, mcp_service: Any, journal_path: str = None, workers: int = 4, max_queued: int = 100,
+                 job_timeout_seconds: float = 600.0, retention_seconds: float = 3600.0,
+                 compact_after: int = 1000):
+        """
+        Initialize the queue. Nothing runs until ``start``.
+
+        Args:
+            mcp_service: The MCP service whose ``call_tool`` runs the jobs and whose
+                background loop hosts the workers.
+            journal_path: Optional JSON-lines file jobs are journaled to.
+            workers: Number of jobs run at once.
+            max_queued: Maximum jobs waiting to run.
+            job_timeout_seconds: Deadline of each job, counted from when it starts running.
+            retention_seconds: How long finished jobs stay available.
+            compact_after: Journal appends after which the journal is compacted.
+        """
+        self.mcp_service = mcp_service
+        self.background_loop: BackgroundLoop = mcp_service.background_loop
+        self.journal_path = journal_path
+        self.workers = workers
+        self.max_queued = max_queued
+        self.job_timeout_seconds = job_timeout_seconds
+        self.retention_seconds = retention_seconds
+        self.compact_after = compact_after
+
+        self.jobs = {}
+        self.stats = {"submitted": 0, "succeeded": 0, "failed": 0, "recovered": 0, "rejected": 0}
+        self._changed = threading.Condition()
+        self._journal_lock = threading.Lock()
+        self._appends = 0
+        self._queue = None
+        self._worker_tasks = []
+
+    def start(self):
+        """Replay the journal and start the workers on the background loop."""
+        recovered = self._recover()
+        self.background_loop.submit(self._start(recovered)).result()
+        logger.info(f"Started {self.workers} MCP job workers ({len(recovered)} jobs recovered)")
+
+    def stop(self):
+        """Stop the workers. Unfinished jobs stay in the journal and resume at the next start."""
+        self.background_loop.submit(self._stop()).result()
+
+    def submit(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enqueue a tool call.
+
+        Args:
+            tool_name: The name of the tool to call.
+            params: The parameters to pass to the tool.
+
+        Returns:
+            The new job.
+
+        Raises:
+            JobQueueFull: If ``max_queued`` jobs are already waiting.
+            JobJournalError: If the job could not be flushed to the journal.
+            RuntimeError: If the queue has not been started.
+        """
+        if self._queue is None:
+            raise RuntimeError("The MCP job queue has not been started")
+
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "tool_name": tool_name,
+            "params": params,
+            "status": QUEUED,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "progress": None,
+            "result": None,
+            "error": None,
+            "version": 0
+        }
+
+        with self._changed:
+            pruned = self._prune(now)
+            full = sum(1 for queued in self.jobs.values() if queued["status"] == QUEUED) >= self.max_queued
+            if full:
+                self.stats["rejected"] += 1
+            else:
+                self.jobs[job["id"]] = job
+                self.stats["submitted"] += 1
+                submitted = self._public(job)
+
+        # Drop the expired jobs' records
+        if pruned:
+            self._compact()
+        if full:
+            raise JobQueueFull(f"{self.max_queued} MCP jobs are already queued")
+
+        # Journaled before it can run, so an accepted job is never lost
+        try:
+            self._journal(job, sync=True)
+        except OSError as e:
+            with self._changed:
+                del self.jobs[job["id"]]
+                self.stats["submitted"] -= 1
+                self.stats["rejected"] += 1
+            # A record that did reach the disk must not run at the next start
+            self._update(job, status=FAILED, finished_at=time.time(),
+                         error={"error": f"Could not journal the job: {e}", "error_type": "journal"})
+            self._journal(job)
+            raise JobJournalError(f"Could not journal the MCP job for {tool_name}: {e}") from e
+        self.background_loop.loop.call_soon_threadsafe(self._queue.put_nowait, job["id"])
+        logger.info(f"Queued MCP job {job['id']} for {tool_name}")
+        return submitted
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+
+        Args:
+            job_id: The job id.
+
+        Returns:
+            A copy of the job, or None if it is unknown or expired.
+        """
+        with self._changed:
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def wait(self, job_id: str, after_version: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a job to change.
+
+        Args:
+            job_id: The job id.
+            after_version: The last version the caller has seen.
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            A copy of the job once its version exceeds ``after_version``, the unchanged job
+            after the timeout, or None if the job is unknown.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self.jobs or self.jobs[job_id]["version"] > after_version, timeout
+            )
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+
+        Returns:
+            A dictionary with the number of jobs in each state and the lifetime counters.
+        """
+        with self._changed:
+            states = {}
+            for job in self.jobs.values():
+                states[job["status"]] = states.get(job["status"], 0) + 1
+            return dict(self.stats, workers=self.workers, max_queued=self.max_queued, jobs=states)
+
+    async def _start(self, recovered: List[str]):
+        """Create the queue and workers on the background loop."""
+        self._queue = asyncio.Queue()
+        for job_id in recovered:
+            self._queue.put_nowait(job_id)
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def _stop(self):
+        """Cancel the workers."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def _work(self):
+        """Run queued jobs one at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id = await self._queue.get()
+            with self._changed:
+                job = self.jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+
+            self._update(job, status=RUNNING, started_at=time.time())
+            await loop.run_in_executor(None, self._journal, job)
+
+            async def on_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+                self._update(job, progress={"progress": progress, "total": total, "message": message})
+
+            try:
+                # The job's own timeout replaces the tool's adaptive one, which is sized for interactive calls
+                result = await self.mcp_service.call_tool(
+                    job["tool_name"], dict(job["params"]), progress_handler=on_progress,
+                    deadline=time.monotonic() + self.job_timeout_seconds, timeout=self.job_timeout_seconds
+                )
+            except asyncio.CancelledError:
+                # Shutting down; the journal still says running, so recovery decides what to do
+                raise
+            except Exception as e:
+                result = {"error": str(e)}
+
+            if isinstance(result, dict) and "error" in result:
+                self._update(job, status=FAILED, error=result, finished_at=time.time())
+            else:
+                self._update(job, status=SUCCEEDED, result=result, finished_at=time.time())
+            with self._changed:
+                self.stats[job["status"]] += 1
+            await loop.run_in_executor(None, self._journal, job)
+            logger.info(f"MCP job {job['id']} {job['status']}")
+
+    def _update(self, job: Dict[str, Any], **changes):
+        """Apply changes to a job and wake its watchers."""
+        with self._changed:
+            job.update(changes, updated_at=time.time(), version=job["version"] + 1)
+            self._changed.notify_all()
+
+    def _prune(self, now: float) -> bool:
+        """
+        Forget finished jobs past their retention. Must hold the condition's lock.
+
+        Returns:
+            True if any job was forgotten.
+        """
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["status"] in FINAL_STATES and now - job["finished_at"] > self.retention_seconds]
+        for job_id in expired:
+            del self.jobs[job_id]
+        if expired:
+            self._changed.notify_all()
+        return bool(expired)
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a job for callers outside the queue."""
+        return copy.deepcopy(job)
+
+    @staticmethod
+    def _record(job: Dict[str, Any]) -> str:
+        """Serialize a job for the journal; progress is transient and not journaled."""
+        return json.dumps({key: value for key, value in job.items() if key not in ("progress", "version")},
+                          default=str)
+
+    def _journal(self, job: Dict[str, Any], sync: bool = False):
+        """
+        Append a job's current state to the journal.
+
+        Args:
+            job: The job.
+            sync: Whether to flush the record to disk before returning.
+
+        Raises:
+            OSError: If a synced record could not be written; other failures are only logged.
+        """
+        if not self.journal_path:
+            return
+
+        with self._journal_lock:
+            # Taken under the journal lock so a compaction never loses a newer state
+            with self._changed:
+                record = self._record(job)
+            try:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(record + "\n")
+                    if sync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError as e:
+                logger.error(f"Error journaling MCP job {job['id']}: {e}")
+                if sync:
+                    raise
+            self._appends += 1
+            if self._appends >= self.compact_after:
+                self._rewrite_journal()
+
+    def _recover(self) -> List[str]:
+        """
+        Replay and compact the journal.
+
+        Returns:
+            The ids of jobs to run again, oldest first.
+        """
+        if not self.journal_path:
+            return []
+
+        jobs = {}
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A record cut off by a crash mid-write
+                        continue
+                    jobs[record["id"]] = record
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error reading MCP job journal {self.journal_path}: {e}")
+
+        now = time.time()
+        requeue = []
+        for job in sorted(jobs.values(), key=lambda job: job["created_at"]):
+            job.update(progress=None, version=0)
+            if job["status"] == RUNNING:
+                if is_read_only_tool(job["tool_name"]):
+                    job["status"] = QUEUED
+                else:
+                    job.update(status=FAILED, finished_at=now, error={
+                        "error": "Interrupted by a restart; the action may or may not have completed",
+                        "error_type": "interrupted",
+                        "may_have_completed": True
+                    })
+            if job["status"] == QUEUED:
+                requeue.append(job["id"])
+            if job["status"] in FINAL_STATES and now - job["finished_at"] > self.retention_seconds:
+                continue
+            self.jobs[job["id"]] = job
+
+        self.stats["recovered"] = len(requeue)
+        self._compact()
+        return requeue
+
+    def _compact(self):
+        """Rewrite the journal with one record per retained job."""
+        if not self.journal_path:
+            return
+
+        with self._journal_lock:
+            self._rewrite_journal()
+
+    def _rewrite_journal(self):
+        """Write one record per retained job and swap it in. Must hold the journal lock."""
+        temp_path = f"{self.journal_path}.tmp"
+        with self._changed:
+            records = [self._record(job) for job in self.jobs.values()]
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(record + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.journal_path)
+            self._appends = 0
+        except OSError as e:
+            logger.error(f"Error compacting MCP job journal: {e}")
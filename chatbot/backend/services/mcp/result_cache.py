@@ -0,0 +1,209 @@
+"""
+TTL cache of read-only MCP tool results.
+"""
+import copy
+import fnmatch
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable
+
+from .tool_policy import is_read_only_tool, tool_service
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Parameters that do not change what a tool returns
+IGNORED_PARAMETERS = {"instructions"}
+
+class ToolResultCache:
+    """
+    Caches results of read-only tools per tool and canonical parameters.
+
+    Any other tool call invalidates the cached results of its service, so a search run
+    after sending an email never returns the pre-send result.
+    """
+
+    def __init__(self, default_ttl_seconds: float = 120, tool_ttls: Dict[str, float] = None,
+                 read_only_tools: List[str] = None, max_entries: int = 1024,
+                 service_of: Callable[[str], str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            default_ttl_seconds: TTL of read-only tools without their own setting.
+            tool_ttls: Maps tool names or glob patterns to a TTL; 0 disables caching of a tool.
+            read_only_tools: Tool names or glob patterns treated as read-only in addition to
+                those recognised by name.
+            max_entries: Maximum number of cached results; the least recently used is evicted.
+            service_of: Maps a tool name to the service whose results a write invalidates.
+                Defaults to ``tool_service``; MCPService passes its catalog's lookup.
+        """
+        self.default_ttl_seconds = default_ttl_seconds
+        self.tool_ttls = dict(tool_ttls or {})
+        self.read_only_tools = list(read_only_tools or [])
+        self.max_entries = max_entries
+        self.service_of = service_of or tool_service
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, tool_name: str) -> float:
+        """
+        Get the TTL of a tool's results.
+
+        Args:
+            tool_name: The tool name.
+
+        Returns:
+            The TTL in seconds, or 0 if the tool's results must not be cached.
+        """
+        if tool_name in self.tool_ttls:
+            return self.tool_ttls[tool_name]
+
+        if not self.is_read_only(tool_name):
+            return 0
+
+        for pattern, ttl in self.tool_ttls.items():
+            if fnmatch.fnmatchcase(tool_name, pattern):
+                return ttl
+        return self.default_ttl_seconds
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """
+        Check whether a tool is read-only, by name or configuration.
+
+        Args:
+            tool_name: The tool name.
+
+        Returns:
+            True if the tool has no side effects.
+        """
+        return is_read_only_tool(tool_name) or any(
+            fnmatch.fnmatchcase(tool_name, pattern) for pattern in self.read_only_tools
+        )
+
+    @staticmethod
+    def make_key(tool_name: str, params: Dict[str, Any]) -> str:
+        """
+        Build a cache key from a tool and its canonicalized parameters.
+
+        Args:
+            tool_name: The tool name.
+            params: The call parameters. Key order, surrounding whitespace and generated
+                instructions do not change the key.
+
+        Returns:
+            A hex digest.
+        """
+        canonical = {
+            key: value.strip() if isinstance(value, str) else value
+            for key, value in (params or {}).items()
+            if key not in IGNORED_PARAMETERS and value is not None
+        }
+        payload = json.dumps([tool_name, canonical], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generation(self, tool_name: str) -> int:
+        """
+        Get the invalidation generation of a tool's service.
+
+        Read before calling a tool and passed to ``put``, so a result fetched while a
+        write to the same service ran is not stored.
+
+        Args:
+            tool_name: The tool name.
+
+        Returns:
+            A counter that increases with every invalidation of the service.
+        """
+        with self._lock:
+            return self.generations.get(self.service_of(tool_name), 0)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached result.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            A copy of the result, or None on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires_at"] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.stats["misses"] += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return copy.deepcopy(entry["result"])
+
+    def put(self, key: str, tool_name: str, result: Any, ttl_seconds: float, generation: int):
+        """
+        Store a result.
+
+        Args:
+            key: The cache key.
+            tool_name: The tool that produced the result.
+            result: The result.
+            ttl_seconds: Seconds the result stays fresh.
+            generation: The service generation read before the call started.
+        """
+        service = self.service_of(tool_name)
+        with self._lock:
+            if self.generations.get(service, 0) != generation:
+                return
+
+            self.entries[key] = {
+                "service": service,
+                "result": copy.deepcopy(result),
+                "expires_at": time.monotonic() + ttl_seconds
+            }
+            self.entries.move_to_end(key)
+            self.stats["stores"] += 1
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, tool_name: str):
+        """
+        Drop every cached result of a tool's service.
+
+        Args:
+            tool_name: The side-effecting tool being called.
+        """
+        service = self.service_of(tool_name)
+        with self._lock:
+            self.generations[service] = self.generations.get(service, 0) + 1
+            stale = [key for key, entry in self.entries.items() if entry["service"] == service]
+            for key in stale:
+                del self.entries[key]
+            self.stats["invalidations"] += 1
+
+        if stale:
+            logger.info(f"{tool_name} invalidated {len(stale)} cached {service} results")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            A dictionary with hit, miss, store, invalidation and eviction counts and the size.
+        """
+        with self._lock:
+            stats = dict(self.stats, entries=len(self.entries))
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+        return stats
@@ -0,0 +1,317 @@
+"""
+Long-lived MCP client session shared by all requests.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable, Awaitable
+
+from ..background_loop import BackgroundLoop
+from .tool_policy import is_read_only_tool
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class MCPSession:
+    """
+    One MCP session kept open on a background loop, with keep-alive pings and reconnects.
+
+    Opening a streamable-HTTP MCP session costs a full initialize handshake, so the session
+    is opened once and every tool call is multiplexed over it. A supervisor task pings the
+    server and reopens the session with exponential backoff whenever it drops.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any], background_loop: BackgroundLoop = None,
+                 ping_interval: float = 30.0, ping_timeout: float = 10.0, connect_timeout: float = 15.0,
+                 max_concurrent_calls: int = 16, reconnect_base_delay: float = 0.5,
+                 reconnect_max_delay: float = 30.0):
+        """
+        Initialize the session. Nothing is opened until ``start`` or the first call.
+
+        Args:
+            client_factory: Creates a fresh, unopened MCP client (an async context manager
+                with ``list_tools``, ``call_tool`` and ``ping``).
+            background_loop: Event loop the session lives on.
+            ping_interval: Seconds between keep-alive pings.
+            ping_timeout: Seconds a ping may take before the session is considered dead.
+            connect_timeout: Seconds allowed to open the session, and that calls wait for a reconnect.
+            max_concurrent_calls: Maximum calls in flight over the session.
+            reconnect_base_delay: First reconnect delay in seconds; doubled after each failure.
+            reconnect_max_delay: Upper bound of the reconnect delay.
+        """
+        self.client_factory = client_factory
+        self.background_loop = background_loop or BackgroundLoop(name="mcp-session")
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+        self.max_concurrent_calls = max_concurrent_calls
+        self.reconnect_base_delay = reconnect_base_delay
+        self.reconnect_max_delay = reconnect_max_delay
+
+        self.state = "disconnected"
+        self.stats = {"connects": 0, "reconnects": 0, "calls": 0, "call_failures": 0, "ping_failures": 0}
+        self.last_error = None
+        self.connected_since = None
+        self.last_ping_ms = None
+        self.in_flight = 0
+        self._state_lock = threading.Lock()
+
+        # Loop-bound primitives, created on the background loop
+        self._client = None
+        self._connected = None
+        self._broken = None
+        self._semaphore = None
+        self._supervisor = None
+        self._closing = False
+
+    @property
+    def connected(self) -> bool:
+        """Whether the session is currently open."""
+        return self.state == "connected"
+
+    async def start(self, timeout: float = None) -> bool:
+        """
+        Open the session if necessary and wait for it to connect.
+
+        Args:
+            timeout: Maximum seconds to wait. Defaults to the connect timeout.
+
+        Returns:
+            True if the session is connected.
+        """
+        return await self.background_loop.run(self._start(timeout or self.connect_timeout))
+
+    async def close(self):
+        """Close the session and stop reconnecting."""
+        await self.background_loop.run(self._close())
+
+    async def list_tools(self) -> List[Any]:
+        """
+        List the server's tools over the shared session.
+
+        Returns:
+            The MCP tool objects.
+        """
+        return await self.background_loop.run(self._call(lambda client: client.list_tools(), retry=True))
+
+    async def call_tool(self, tool_name: str, params: Dict[str, Any],
+                        progress_handler: Callable[[float, Optional[float], Optional[str]], Awaitable[None]] = None) -> Any:
+        """
+        Call a tool over the shared session.
+
+        Read-only tools are retried once if the session drops mid-call; other tools are not,
+        since the server may already have carried out the side effect.
+
+        Args:
+            tool_name: The name of the tool to call.
+            params: The parameters to pass to the tool.
+            progress_handler: Optional coroutine function receiving the progress, total and
+                message of each progress notification the server sends for this call. It
+                runs on the session's loop.
+
+        Returns:
+            The raw MCP call result.
+        """
+        def operation(client):
+            if progress_handler is None:
+                return client.call_tool(tool_name, params)
+            return client.call_tool(tool_name, params, progress_handler=progress_handler)
+
+        return await self.background_loop.run(self._call(operation, retry=is_read_only_tool(tool_name)))
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the connection state.
+
+        Returns:
+            A dictionary with the state, connection time, last ping, in-flight calls and counters.
+        """
+        with self._state_lock:
+            return {
+                "state": self.state,
+                "connected": self.state == "connected",
+                "connected_since": self.connected_since,
+                "last_error": self.last_error,
+                "last_ping_ms": self.last_ping_ms,
+                "in_flight": self.in_flight,
+                "max_concurrent_calls": self.max_concurrent_calls,
+                **self.stats
+            }
+
+    def _set_state(self, state: str, error: str = None):
+        """Record a state transition."""
+        with self._state_lock:
+            self.state = state
+            if error is not None:
+                self.last_error = error
+            self.connected_since = time.time() if state == "connected" else None
+        logger.info(f"MCP session {state}" + (f": {error}" if error else ""))
+
+    def _count(self, key: str, amount: int = 1):
+        """Increment a counter."""
+        with self._state_lock:
+            self.stats[key] += amount
+
+    def _ensure_primitives(self):
+        """Create the loop-bound primitives. Must run on the background loop."""
+        if self._connected is None:
+            self._connected = asyncio.Event()
+            self._broken = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+
+    async def _start(self, timeout: float) -> bool:
+        """Start the supervisor and wait for the first connection."""
+        self._ensure_primitives()
+        self._closing = False
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.create_task(self._supervise())
+
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _close(self):
+        """Signal the supervisor to close the client and stop, cancelling it if it does not."""
+        self._closing = True
+        if self._supervisor is not None:
+            # Woken like a broken session; the supervisor exits the client in its own task
+            self._broken.set()
+            done, _ = await asyncio.wait({self._supervisor}, timeout=self.connect_timeout)
+            if not done:
+                self._supervisor.cancel()
+                try:
+                    await self._supervisor
+                except (asyncio.CancelledError, Exception):
+                    pass
+            self._supervisor = None
+        self._set_state("closed")
+
+    async def _supervise(self):
+        """Keep the session open, reconnecting with exponential backoff and jitter."""
+        delay = self.reconnect_base_delay
+
+        while not self._closing:
+            self._set_state("connecting")
+            client = self.client_factory()
+            try:
+                # The client is entered and exited in this task: the transports' anyio cancel
+                # scopes fail when exited from another task
+                async with asyncio.timeout(self.connect_timeout) as connect_deadline:
+                    async with client:
+                        connect_deadline.reschedule(None)
+                        self._attach(client)
+                        delay = self.reconnect_base_delay
+                        try:
+                            await self._keep_alive()
+                        finally:
+                            self._detach()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._set_state("reconnecting", error=str(e) or type(e).__name__)
+
+            if self._closing:
+                break
+
+            # Sleep out the backoff unless close() wakes us
+            self._broken.clear()
+            try:
+                await asyncio.wait_for(self._broken.wait(), delay * random.uniform(0.5, 1.0))
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.reconnect_max_delay)
+
+    def _attach(self, client: Any):
+        """Make a freshly opened client the shared one."""
+        self._client = client
+        self._broken.clear()
+        self._connected.set()
+        self._count("connects")
+        if self.stats["connects"] > 1:
+            self._count("reconnects")
+        self._set_state("connected")
+
+    def _detach(self):
+        """Stop handing out the current client before it is closed."""
+        self._connected.clear()
+        self._client = None
+
+    async def _keep_alive(self):
+        """Ping the server until a ping fails, a call reports the session broken, or it is closed."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._broken.wait(), self.ping_interval)
+                if self._closing:
+                    return
+                raise ConnectionError(self.last_error or "MCP session broken")
+            except asyncio.TimeoutError:
+                pass
+
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._client.ping(), self.ping_timeout)
+            except Exception as e:
+                self._count("ping_failures")
+                raise ConnectionError(f"Keep-alive ping failed: {e or type(e).__name__}") from e
+
+            with self._state_lock:
+                self.last_ping_ms = round((time.monotonic() - started) * 1000, 1)
+
+    async def _call(self, operation: Callable[[Any], Awaitable[Any]], retry: bool = False) -> Any:
+        """
+        Run an operation on the shared client, waiting for a connection if necessary.
+
+        Args:
+            operation: Receives the open client and returns the awaitable to run.
+            retry: Whether to run the operation again after a reconnect if the session dropped.
+
+        Returns:
+            The operation's result.
+        """
+        if self._supervisor is None or self._supervisor.done():
+            await self._start(self.connect_timeout)
+
+        attempts = 2 if retry else 1
+        for attempt in range(attempts):
+            try:
+                await asyncio.wait_for(self._connected.wait(), self.connect_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"MCP session is not connected: {self.last_error}")
+
+            async with self._semaphore:
+                client = self._client
+                self._count("calls")
+                with self._state_lock:
+                    self.in_flight += 1
+                try:
+                    return await operation(client)
+                except Exception as e:
+                    self._count("call_failures")
+                    # Tool errors leave the session usable; a dead transport does not
+                    if client is self._client:
+                        if self._is_alive(client):
+                            raise
+                        self._mark_broken(e)
+                    if attempt == attempts - 1:
+                        raise
+                    logger.warning(f"MCP session dropped during a call; retrying after reconnect: {e}")
+                finally:
+                    with self._state_lock:
+                        self.in_flight -= 1
+
+    @staticmethod
+    def _is_alive(client: Any) -> bool:
+        """Check whether a client still reports an open session."""
+        is_connected = getattr(client, "is_connected", None)
+        return bool(is_connected()) if callable(is_connected) else True
+
+    def _mark_broken(self, error: Exception):
+        """Tell the supervisor to reconnect."""
+        self._connected.clear()
+        self._broken.set()
+        self._set_state("reconnecting", error=str(error) or type(error).__name__)
@@ -0,0 +1,174 @@
+"""
+Per-tool MCP call timeouts derived from observed latency, and request deadlines.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+from .tool_policy import is_read_only_tool
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def request_deadline(timeout_header: Optional[str], default_seconds: float, max_seconds: float) -> float:
+    """
+    Turn a request's timeout into an absolute deadline.
+
+    Args:
+        timeout_header: The client's X-Request-Timeout value in seconds, if any.
+        default_seconds: The budget of requests that do not send one.
+        max_seconds: Upper bound of client-requested budgets.
+
+    Returns:
+        The deadline as a ``time.monotonic()`` value.
+    """
+    budget = default_seconds
+    if timeout_header:
+        try:
+            budget = float(timeout_header)
+        except ValueError:
+            logger.warning(f"Ignoring invalid X-Request-Timeout: {timeout_header}")
+        else:
+            if not math.isfinite(budget) or budget <= 0:
+                budget = default_seconds
+    return time.monotonic() + min(budget, max_seconds)
+
+def timeout_error(tool_name: str, timeout_seconds: float, deadline_exceeded: bool) -> Dict[str, Any]:
+    """
+    Build the structured result of a timed-out call.
+
+    Args:
+        tool_name: The tool that timed out.
+        timeout_seconds: The time the call was given.
+        deadline_exceeded: Whether the request's deadline, rather than the tool's own timeout, ran out.
+
+    Returns:
+        An error dictionary. Side-effecting tools are flagged as possibly completed, since
+        the server may have carried out the action before the call was cancelled.
+    """
+    reason = "the request deadline" if deadline_exceeded else "its timeout"
+    return {
+        "error": f"MCP tool {tool_name} timed out after {timeout_seconds:.2f}s ({reason})",
+        "error_type": "timeout",
+        "tool_name": tool_name,
+        "timeout_seconds": round(timeout_seconds, 3),
+        "deadline_exceeded": deadline_exceeded,
+        "may_have_completed": not is_read_only_tool(tool_name)
+    }
+
+class AdaptiveTimeouts:
+    """
+    Per-tool timeouts set from a high percentile of each tool's recent latency.
+
+    A tool's timeout is its latency percentile times a multiplier, clamped between a floor
+    and a ceiling. Until a tool has enough samples the default applies. Timed-out calls
+    are counted but not sampled, so a stuck server cannot ratchet the timeout upwards.
+    """
+
+    def __init__(self, default_seconds: float = 60.0, floor_seconds: float = 5.0, ceiling_seconds: float = 120.0,
+                 percentile: float = 0.99, multiplier: float = 3.0, window: int = 200, min_samples: int = 20):
+        """
+        Initialize the timeouts.
+
+        Args:
+            default_seconds: Timeout of tools with too few samples.
+            floor_seconds: Lower bound of derived timeouts.
+            ceiling_seconds: Upper bound of all timeouts.
+            percentile: The latency percentile timeouts are derived from, e.g. 0.99.
+            multiplier: Headroom applied to the percentile.
+            window: Number of recent latencies kept per tool.
+            min_samples: Samples needed before a tool's timeout is derived.
+        """
+        self.default_seconds = default_seconds
+        self.floor_seconds = floor_seconds
+        self.ceiling_seconds = ceiling_seconds
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self.samples = {}
+        self.timeouts = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool_name: str, seconds: float):
+        """
+        Record the latency of a completed call.
+
+        Args:
+            tool_name: The tool called.
+            seconds: How long the call took.
+        """
+        with self._lock:
+            self.samples.setdefault(tool_name, deque(maxlen=self.window)).append(seconds)
+
+    def record_timeout(self, tool_name: str):
+        """
+        Count a timed-out call.
+
+        Args:
+            tool_name: The tool that timed out.
+        """
+        with self._lock:
+            self.timeouts[tool_name] = self.timeouts.get(tool_name, 0) + 1
+
+    def timeout_for(self, tool_name: str) -> float:
+        """
+        Get the timeout of a tool.
+
+        Args:
+            tool_name: The tool to call.
+
+        Returns:
+            The timeout in seconds.
+        """
+        with self._lock:
+            samples = list(self.samples.get(tool_name, ()))
+        return self._derive(samples)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get per-tool latency and timeout statistics.
+
+        Returns:
+            A dictionary with the settings and, per tool, the sample count, p50 and
+            percentile latency, current timeout and number of timeouts.
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self.samples.items()}
+            timeouts = dict(self.timeouts)
+
+        tools = {}
+        for name in set(samples) | set(timeouts):
+            values = samples.get(name, [])
+            tools[name] = {
+                "samples": len(values),
+                "p50_ms": round(self._percentile(values, 0.5) * 1000, 1) if values else None,
+                "percentile_ms": round(self._percentile(values, self.percentile) * 1000, 1) if values else None,
+                "timeout_seconds": round(self._derive(values), 3),
+                "timeouts": timeouts.get(name, 0)
+            }
+
+        return {
+            "default_seconds": self.default_seconds,
+            "floor_seconds": self.floor_seconds,
+            "ceiling_seconds": self.ceiling_seconds,
+            "percentile": self.percentile,
+            "tools": tools
+        }
+
+    def _derive(self, samples: list) -> float:
+        """Derive a timeout from latency samples."""
+        if len(samples) < self.min_samples:
+            return min(self.default_seconds, self.ceiling_seconds)
+        timeout = self._percentile(samples, self.percentile) * self.multiplier
+        return min(max(timeout, self.floor_seconds), self.ceiling_seconds)
+
+    @staticmethod
+    def _percentile(samples: list, fraction: float) -> float:
+        """Get a percentile by the nearest-rank method."""
+        ordered = sorted(samples)
+        return ordered[max(math.ceil(fraction * len(ordered)), 1) - 1]
@@ -0,0 +1,73 @@
+"""
+Classification of MCP tools by whether they have side effects.
+"""
+from typing import Iterable, Set
+
+# Name tokens of tools that only read data
+READ_ONLY_VERBS = {"find", "search", "get", "list", "lookup", "read", "retrieve", "fetch"}
+
+# Name tokens that mark a side effect wherever they appear (e.g. find_or_create_contact)
+WRITE_VERBS = {
+    "send", "create", "update", "delete", "remove", "add", "upload", "reply", "move", "copy", "archive",
+    "post", "set", "schedule", "cancel", "invite", "share", "write", "draft", "label", "mark", "append",
+    "edit", "rename", "approve", "trigger", "run"
+}
+
+def is_read_only_tool(tool_name: str) -> bool:
+    """
+    Decide from its name whether a tool only reads data.
+
+    Read-only tools are safe to call speculatively. Anything with a write verb in
+    its name, or without a read verb, is treated as side-effecting.
+
+    Args:
+        tool_name: The MCP tool name, e.g. gmail_find_email.
+
+    Returns:
+        True if the tool is read-only.
+    """
+    tokens = set(tool_name.lower().split("_"))
+    return bool(tokens & READ_ONLY_VERBS) and not tokens & WRITE_VERBS
+
+def tool_service(tool_name: str, services: Iterable[str] = None) -> str:
+    """
+    Get the service prefix of a tool name.
+
+    Args:
+        tool_name: The MCP tool name, e.g. google_drive_find_a_file.
+        services: Optional known services of the catalog (see ``catalog_services``). The
+            longest one prefixing the name wins.
+
+    Returns:
+        The service, e.g. google_drive. Without a matching known service it is the tokens
+        before the first verb, or the first token if the name has no known verb.
+    """
+    name = tool_name.lower()
+    if services:
+        matches = [service for service in services if name == service or name.startswith(f"{service}_")]
+        if matches:
+            return max(matches, key=len)
+
+    tokens = name.split("_")
+    for index, token in enumerate(tokens):
+        if index and (token in READ_ONLY_VERBS or token in WRITE_VERBS):
+            return "_".join(tokens[:index])
+    return tokens[0]
+
+def catalog_services(tool_names: Iterable[str]) -> Set[str]:
+    """
+    Find the services of a catalog.
+
+    The tokens before a tool's first verb can include a modifier, as in
+    google_calendar_quick_add_event. A prefix that extends another tool's prefix is
+    therefore folded into the shorter one.
+
+    Args:
+        tool_names: The catalog's tool names.
+
+    Returns:
+        The service prefixes, none of which extends another.
+    """
+    candidates = {tool_service(name) for name in tool_names}
+    return {candidate for candidate in candidates
+            if not any(candidate.startswith(f"{other}_") for other in candidates)}
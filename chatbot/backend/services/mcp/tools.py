@@ -1,10 +1,16 @@
 """
 MCP tools service for the chatbot API.
 """
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import Dict, List, Any, Optional, Callable
 
 from .client import MCPClient, run_async
+from .catalog import CatalogSnapshot, diff_catalogs
+from .catalog_index import CatalogIndex
+from .functions import FunctionCatalog
+from ..background_loop import BackgroundLoop
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -13,39 +19,94 @@ logger = logging.getLogger(__name__)
 class MCPToolsService:
     """Service for managing MCP tools."""
 
-    def __init__(self, client: MCPClient):
+    def __init__(self, client: MCPClient, snapshot: CatalogSnapshot = None):
         """
         Initialize the MCP tools service.
 
         Args:
             client: The MCP client to use.
+            snapshot: Optional on-disk copy of the catalog, loaded at startup and updated on every fetch.
         """
         self.client = client
+        self.snapshot = snapshot
         self.available_tools = []
-        self.tool_categories = {}
+        self.index = CatalogIndex([])
+        self.version = None
+        self.source = None
+        self.fetched_at = None
+        self.retry_at = None
+        self.listeners = []
+        self.refresh_task = None
+
+    def on_change(self, callback: Callable[["MCPToolsService", Dict[str, List[str]]], None]):
+        """
+        Register a callback run whenever the catalog changes.
+
+        Args:
+            callback: Receives this service and the diff of added, removed and changed tool names.
+        """
+        self.listeners.append(callback)
+
+    def load_snapshot(self) -> bool:
+        """
+        Load the catalog from the on-disk snapshot.
+
+        Returns:
+            True if a snapshot was loaded.
+        """
+        loaded = self.snapshot.load() if self.snapshot else None
+        if not loaded:
+            return False
+
+        tools, meta = loaded
+        self.fetched_at = meta["fetched_at"]
+        self._apply(tools, "snapshot")
+        logger.info(f"Loaded {len(tools)} MCP tools from snapshot {str(meta['version'])[:12]}")
+        return True
+
+    def start_refresh(self, background_loop: BackgroundLoop, ttl_seconds: float):
+        """
+        Refetch the catalog in the background whenever it is older than the TTL.
+
+        Args:
+            background_loop: The loop the MCP session lives on.
+            ttl_seconds: Maximum age of the catalog in seconds.
+        """
+        if self.refresh_task is None or self.refresh_task.done():
+            self.refresh_task = background_loop.submit(self._refresh_forever(ttl_seconds))
+
+    async def _refresh_forever(self, ttl_seconds: float):
+        """Fetch the catalog each time it reaches the TTL."""
+        while True:
+            due = self.fetched_at + ttl_seconds if self.fetched_at else time.time()
+            if self.retry_at:
+                due = max(due, self.retry_at)
+            await asyncio.sleep(max(due - time.time(), 0))
+
+            if await self.fetch_tools():
+                self.retry_at = None
+            else:
+                # Keep serving the current catalog and try again after a full TTL;
+                # fetched_at stays the time of the last successful fetch
+                self.retry_at = time.time() + ttl_seconds
 
     async def fetch_tools(self):
         """Fetch available tools from the MCP server."""
         try:
-            # We'll use a context manager to ensure proper connection handling
-            async with self.client.client as client:
-                logger.info(f"Connected to MCP server: {client.is_connected()}")
-
-                # Fetch available tools
-                logger.debug("Fetching available tools...")
-                self.available_tools = await client.list_tools()
-                logger.debug(f"Fetched {len(self.available_tools)} tools")
+            # Fetch available tools over the persistent session
+            logger.debug("Fetching available tools...")
+            tools = await self.client.list_tools()
+            logger.debug(f"Fetched {len(tools)} tools")
 
-                # Categorize tools by service
-                logger.debug("Categorizing tools by service...")
-                self._categorize_tools()
+            self.fetched_at = time.time()
+            self._apply(tools, "server")
 
-                logger.info(f"Available MCP tools: {len(self.available_tools)}")
-                logger.info(f"Available services: {list(self.tool_categories.keys())}")
+            logger.info(f"Available MCP tools: {len(self.available_tools)}")
+            logger.info(f"Available services: {list(self.tool_categories.keys())}")
 
-                # Log some example tools for debugging
-                if self.available_tools:
-                    logger.debug(f"Example tool: {self.available_tools[0].name} - {self.available_tools[0].description}")
+            # Log some example tools for debugging
+            if self.available_tools:
+                logger.debug(f"Example tool: {self.available_tools[0].name} - {self.available_tools[0].description}")
 
             return True
         except Exception as e:
@@ -53,27 +114,102 @@ class MCPToolsService:
             logger.exception("Detailed exception information:")
             return False
 
-    def _categorize_tools(self):
-        """Categorize tools by service."""
-        self.tool_categories = {}
+    def update_catalog(self, tools: List[Any]):
+        """
+        Apply a catalog pushed by the client outside a fetch, e.g. a slow server's late tools.
+
+        Args:
+            tools: MCP tool objects.
+        """
+        self.fetched_at = time.time()
+        self._apply(tools, "server")
+
+    def _apply(self, tools: List[Any], source: str):
+        """
+        Swap in a catalog, saving server catalogs to the snapshot and notifying listeners of changes.
+
+        Args:
+            tools: MCP tool objects.
+            source: "server" or "snapshot".
+        """
+        version = FunctionCatalog.fingerprint(tools)
+        if source == "server" and self.snapshot:
+            self.snapshot.save(tools, version)
+
+        if version == self.version:
+            self.source = source
+            return
+
+        diff = diff_catalogs(self.available_tools, tools)
+        # Built aside and swapped in, since requests may read the catalog during a refresh
+        self.index = CatalogIndex(tools, version)
+        self.available_tools = list(tools)
+        self.version = version
+        self.source = source
+        logger.info(f"MCP tool catalog {version[:12]} from {source}: {len(diff['added'])} added, "
+                    f"{len(diff['removed'])} removed, {len(diff['changed'])} changed")
+
+        for callback in self.listeners:
+            try:
+                callback(self, diff)
+            except Exception as e:
+                logger.error(f"Error applying MCP tool catalog change: {e}")
+                logger.exception("Detailed exception information:")
+
+    def get_catalog_state(self) -> Dict[str, Any]:
+        """
+        Get the state of the tool catalog.
 
-        for tool in self.available_tools:
-            # Extract service name from tool name (e.g., gmail_send_email -> gmail)
-            service_name = tool.name.split('_')[0] if '_' in tool.name else 'other'
+        Returns:
+            A dictionary with the catalog version, size, source, age since the last
+            successful fetch, and when a failed refresh is retried.
+        """
+        return {
+            "version": self.version,
+            "tools": len(self.available_tools),
+            "source": self.source,
+            "age_seconds": round(time.time() - self.fetched_at, 1) if self.fetched_at else None,
+            "retry_in_seconds": round(max(self.retry_at - time.time(), 0), 1) if self.retry_at else None
+        }
+
+    @property
+    def tool_categories(self) -> Dict[str, List[Dict[str, Any]]]:
+        """The current catalog's tools by service (e.g. google_drive_find_a_file -> google_drive)."""
+        return self.index.services
+
+    def service_of(self, tool_name: str) -> str:
+        """
+        Get the service a tool belongs to in the current catalog.
 
-            if service_name not in self.tool_categories:
-                self.tool_categories[service_name] = []
+        Args:
+            tool_name: The tool name.
 
-            # Get parameters from inputSchema if available
-            parameters = []
-            if hasattr(tool, 'inputSchema') and tool.inputSchema and 'properties' in tool.inputSchema:
-                parameters = list(tool.inputSchema['properties'].keys())
+        Returns:
+            The service name, e.g. google_calendar for google_calendar_quick_add_event.
+        """
+        return self.index.service_of(tool_name)
 
-            self.tool_categories[service_name].append({
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": parameters
-            })
+    def describe_tools(self) -> List[Dict[str, Any]]:
+        """
+        Describe the current catalog.
+
+        Returns:
+            A list of dictionaries with each tool's name, description and parameter names.
+        """
+        return list(self.index.descriptions)
+
+    def validate_call(self, tool_name: str, params: Dict[str, Any]) -> List[str]:
+        """
+        Validate call parameters against the current catalog.
+
+        Args:
+            tool_name: The name of the tool to call.
+            params: The parameters to pass to the tool.
+
+        Returns:
+            A list of problems; empty if the call may be dispatched.
+        """
+        return self.index.validate(tool_name, params)
 
     async def list_available_tools(self) -> List[Dict[str, Any]]:
         """
@@ -86,20 +222,7 @@ class MCPToolsService:
         if not self.available_tools:
             await self.fetch_tools()
 
-        tools_info = []
-        for tool in self.available_tools:
-            # Get parameters from inputSchema if available
-            parameters = []
-            if hasattr(tool, 'inputSchema') and tool.inputSchema and 'properties' in tool.inputSchema:
-                parameters = list(tool.inputSchema['properties'].keys())
-
-            tools_info.append({
-                "name": tool.name,
-                "description": tool.description,
-                "parameters": parameters
-            })
-
-        return tools_info
+        return self.describe_tools()
 
     async def list_services(self) -> Dict[str, List[Dict[str, Any]]]:
         """
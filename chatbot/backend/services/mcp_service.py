@@ -1,12 +1,21 @@
 """
 MCP service for the chatbot API.
 """
+import asyncio
+import copy
 import logging
+import time
 import traceback
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncGenerator, Callable, Awaitable
 
 from .mcp.client import MCPClient
+from .mcp.federation import FederatedMCPClient
 from .mcp.tools import MCPToolsService
+from .mcp.catalog import CatalogSnapshot
+from .mcp.result_cache import ToolResultCache
+from .mcp.timeouts import AdaptiveTimeouts, timeout_error
+from .background_loop import BackgroundLoop
+from .single_flight import StreamCoalescer
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -15,18 +24,58 @@ logger = logging.getLogger(__name__)
 class MCPService:
     """Service for interacting with various services through MCP."""
 
-    def __init__(self, server_url: str = None):
+    def __init__(self, server_url: str = None, background_loop: BackgroundLoop = None,
+                 ping_interval: float = 30.0, max_concurrent_calls: int = 16, snapshot_path: str = None,
+                 result_cache: ToolResultCache = None, timeouts: AdaptiveTimeouts = None,
+                 servers: Dict[str, str] = None, catalog_timeout: float = 10.0):
         """
         Initialize the MCP service.
 
         Args:
             server_url: The MCP server URL. If None, uses the default URL.
+            background_loop: Event loop the persistent MCP session lives on.
+            ping_interval: Seconds between keep-alive pings of the session.
+            max_concurrent_calls: Maximum tool calls in flight over the session.
+            snapshot_path: Optional file the tool catalog is persisted to and loaded from at startup.
+            result_cache: Optional cache of read-only tool results.
+            timeouts: Per-tool call timeouts. Defaults to adaptive timeouts with default settings.
+            servers: Optional MCP server URLs by name, in priority order. With more than one,
+                their catalogs are merged and each call is routed to the server owning the tool,
+                over that server's own session; ``server_url`` is then ignored.
+            catalog_timeout: Seconds to wait for each of several servers when connecting and
+                fetching catalogs before continuing without it.
         """
-        self.client = MCPClient(server_url)
-        self.tools_service = MCPToolsService(self.client)
+        if servers and len(servers) > 1:
+            background_loop = background_loop or BackgroundLoop(name="mcp-session")
+            self.client = FederatedMCPClient({
+                name: MCPClient(url, background_loop=background_loop, ping_interval=ping_interval,
+                                max_concurrent_calls=max_concurrent_calls)
+                for name, url in servers.items()
+            }, background_loop, catalog_timeout=catalog_timeout)
+        else:
+            server_url = next(iter(servers.values())) if servers else server_url
+            self.client = MCPClient(server_url, background_loop=background_loop, ping_interval=ping_interval,
+                                    max_concurrent_calls=max_concurrent_calls)
+        snapshot = CatalogSnapshot(snapshot_path, self.client.server_url) if snapshot_path else None
+        self.tools_service = MCPToolsService(self.client, snapshot=snapshot)
+        self.background_loop = self.client.background_loop
+        if isinstance(self.client, FederatedMCPClient):
+            self.client.on_catalog_change = self.tools_service.update_catalog
+            self.tools_service.on_change(self._restore_routes)
+        self.result_cache = result_cache
+        if result_cache is not None:
+            # Writes invalidate reads of the same service as the catalog groups them
+            result_cache.service_of = self.tools_service.service_of
+        self.result_flights = StreamCoalescer()
+        self.timeouts = timeouts or AdaptiveTimeouts()
         self.is_connected = False
         self.available_tools = []
 
+    def _restore_routes(self, tools_service: MCPToolsService, diff: Dict[str, List[str]]):
+        """Route calls by a snapshot catalog until the servers answer."""
+        if tools_service.source == "snapshot":
+            self.client.restore_routes(tools_service.available_tools)
+
     async def connect(self):
         """
         Connect to the MCP server and fetch available tools.
@@ -92,18 +141,88 @@ class MCPService:
         """
         return await self.tools_service.list_services()
 
-    async def call_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, tool_name: str, params: Dict[str, Any],
+                        progress_handler: Callable[[float, Optional[float], Optional[str]], Awaitable[None]] = None,
+                        deadline: float = None, timeout: float = None) -> Dict[str, Any]:
         """
         Call a specific MCP tool with parameters.
 
+        Parameters are validated against the tool's schema first. Results of read-only
+        tools are served from the result cache while fresh, and identical concurrent calls
+        share one upstream call. Any other tool invalidates the cached results of its service.
+
         Args:
             tool_name: The name of the tool to call.
             params: The parameters to pass to the tool.
+            progress_handler: Optional coroutine function receiving the server's progress
+                notifications (progress, total, message). Cache hits and calls joining an
+                identical call in flight report no progress.
+            deadline: Optional ``time.monotonic()`` time by which the caller needs the result.
+                The call is cancelled at the earlier of the deadline and the tool's own timeout.
+                Calls joining an identical call in flight share its deadline.
+            timeout: Optional seconds replacing the tool's adaptive timeout, for callers such
+                as background jobs that expect long-running tools.
 
         Returns:
-            A dictionary containing the result of the operation.
+            A dictionary containing the result of the operation. Timed-out calls return an
+            error with "error_type": "timeout".
+        """
+        # Reject calls the catalog schema already rules out without a server round trip
+        errors = self.tools_service.validate_call(tool_name, params)
+        if errors:
+            error_msg = f"Invalid parameters for MCP tool {tool_name}: {'; '.join(errors)}"
+            logger.warning(error_msg)
+            return {"error": error_msg}
+
+        if self.result_cache is None:
+            return await self._call_tool(tool_name, params, progress_handler, deadline, timeout)
+
+        if not self.result_cache.is_read_only(tool_name):
+            # Invalidate before and after, so reads racing the write are not cached either
+            self.result_cache.invalidate(tool_name)
+            try:
+                return await self._call_tool(tool_name, params, progress_handler, deadline, timeout)
+            finally:
+                self.result_cache.invalidate(tool_name)
+
+        ttl = self.result_cache.ttl_for(tool_name)
+        if not ttl:
+            return await self._call_tool(tool_name, params, progress_handler, deadline, timeout)
+
+        key = self.result_cache.make_key(tool_name, params)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached result of MCP tool {tool_name}")
+            return cached
+
+        generation = self.result_cache.generation(tool_name)
+        result = await self.result_flights.call(key, lambda: self._call_tool(tool_name, dict(params), progress_handler, deadline, timeout))
+        if not (isinstance(result, dict) and 'error' in result):
+            self.result_cache.put(key, tool_name, result, ttl, generation)
+        # Concurrent callers share the leader's result object
+        return copy.deepcopy(result)
+
+    def get_result_cache_stats(self) -> Optional[Dict[str, Any]]:
         """
+        Get result cache statistics.
+
+        Returns:
+            The cache counters with the number of coalesced calls, or None if caching is off.
+        """
+        if self.result_cache is None:
+            return None
+        flights = self.result_flights.get_stats()
+        return dict(self.result_cache.get_stats(), coalesced=flights["followers"], in_flight=flights["in_flight"])
+
+    async def _call_tool(self, tool_name: str, params: Dict[str, Any],
+                         progress_handler: Callable[[float, Optional[float], Optional[str]], Awaitable[None]] = None,
+                         deadline: float = None, timeout: float = None) -> Dict[str, Any]:
+        """Call a tool on the server within its timeout and the deadline, bypassing the result cache."""
         try:
+            if deadline is not None and deadline <= time.monotonic():
+                self.timeouts.record_timeout(tool_name)
+                return timeout_error(tool_name, 0.0, deadline_exceeded=True)
+
             if not self.is_connected:
                 logger.warning("MCP service is not connected. Attempting to reconnect...")
                 connected = await self.connect()
@@ -119,8 +238,24 @@ class MCPService:
                 params['instructions'] = instructions.rstrip(', ')
                 logger.debug(f"Added instructions parameter: {params['instructions']}")
 
-            logger.info(f"Calling MCP tool: {tool_name} with params: {params}")
-            result = await self.client.call_tool(tool_name, params)
+            if timeout is None:
+                timeout = self.timeouts.timeout_for(tool_name)
+            deadline_exceeded = deadline is not None and deadline - time.monotonic() < timeout
+            if deadline_exceeded:
+                timeout = max(deadline - time.monotonic(), 0.0)
+
+            logger.info(f"Calling MCP tool: {tool_name} with params: {params} (timeout {timeout:.1f}s)")
+            started = time.monotonic()
+            try:
+                # Cancelling the wait cancels the call on the session's loop and frees its slot
+                result = await asyncio.wait_for(
+                    self.client.call_tool(tool_name, params, progress_handler=progress_handler), timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts.record_timeout(tool_name)
+                logger.error(f"MCP tool {tool_name} timed out after {timeout:.2f}s")
+                return timeout_error(tool_name, timeout, deadline_exceeded)
+            self.timeouts.record(tool_name, time.monotonic() - started)
 
             # Check if result contains an error
             if isinstance(result, dict) and 'error' in result:
@@ -135,6 +270,154 @@ class MCPService:
             logger.error(traceback.format_exc())
             return {"error": error_msg}
 
+    async def stream_tool(self, tool_name: str, params: Dict[str, Any], heartbeat_interval: float = 5.0,
+                          deadline: float = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Call an MCP tool, yielding its progress notifications as they arrive.
+
+        Must be driven on the MCP session's loop (``background_loop.iterate``), where the
+        progress handler runs.
+
+        Args:
+            tool_name: The name of the tool to call.
+            params: The parameters to pass to the tool.
+            heartbeat_interval: Seconds without progress after which a status chunk reports
+                that the call is still running.
+            deadline: Optional ``time.monotonic()`` time by which the caller needs the result.
+
+        Yields:
+            "progress" chunks with the progress, total and message the server reported,
+            "status" heartbeats, and one final "result" chunk with the outcome.
+        """
+        started = time.monotonic()
+        updates = asyncio.Queue()
+
+        def elapsed_ms() -> float:
+            return round((time.monotonic() - started) * 1000, 1)
+
+        async def on_progress(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+            updates.put_nowait({
+                "type": "progress",
+                "progress": progress,
+                "total": total,
+                "message": message,
+                "elapsed_ms": elapsed_ms()
+            })
+
+        call = asyncio.ensure_future(self.call_tool(tool_name, params, progress_handler=on_progress, deadline=deadline))
+        next_update = None
+        try:
+            while not call.done() or not updates.empty():
+                next_update = asyncio.ensure_future(updates.get())
+                done, _ = await asyncio.wait({next_update, call}, timeout=heartbeat_interval,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if next_update in done:
+                    yield next_update.result()
+                    continue
+
+                next_update.cancel()
+                if not done:
+                    yield {
+                        "type": "status",
+                        "text": f"Still running {tool_name}...",
+                        "elapsed_ms": elapsed_ms()
+                    }
+
+            result = call.result()
+        finally:
+            # Stop the call if the client went away
+            if next_update is not None:
+                next_update.cancel()
+            call.cancel()
+
+        success = not (isinstance(result, dict) and "error" in result)
+        outcome = {"type": "result", "success": success, "duration_ms": elapsed_ms()}
+        if success:
+            outcome["result"] = result
+        else:
+            outcome["error"] = result["error"]
+            if result.get("error_type"):
+                outcome["error_type"] = result["error_type"]
+        yield outcome
+
+    async def call_batch(self, calls: List[Dict[str, Any]], concurrency: int = 8,
+                         deadline: float = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Call several MCP tools concurrently.
+
+        The session is connected once before the calls fan out; if it cannot be, every call
+        fails without being sent.
+
+        Args:
+            calls: Dictionaries with "tool_name", "params" and an optional client "id".
+            concurrency: Maximum calls in flight at once.
+            deadline: Optional ``time.monotonic()`` time by which every call must finish;
+                calls still queued when it passes fail without being sent.
+
+        Yields:
+            One "result" dictionary per call, in completion order, with its index, id, result
+            or error, and the milliseconds it queued and ran; then one "complete" summary with
+            the numbers of calls, successes, failures and timeouts.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        batch_started = time.monotonic()
+
+        connect_error = None
+        if not self.is_connected and not await self.connect():
+            connect_error = "Failed to connect to MCP server"
+
+        async def run(index: int, call: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                started = time.monotonic()
+                if connect_error:
+                    result = {"error": connect_error}
+                else:
+                    try:
+                        result = await self.call_tool(call["tool_name"], dict(call.get("params") or {}), deadline=deadline)
+                    except Exception as e:
+                        result = {"error": str(e)}
+                finished = time.monotonic()
+
+            outcome = {
+                "type": "result",
+                "index": index,
+                "id": call.get("id"),
+                "tool_name": call["tool_name"],
+                "success": not (isinstance(result, dict) and "error" in result),
+                "queued_ms": round((started - batch_started) * 1000, 1),
+                "duration_ms": round((finished - started) * 1000, 1)
+            }
+            if outcome["success"]:
+                outcome["result"] = result
+            else:
+                outcome["error"] = result["error"]
+                if result.get("error_type"):
+                    outcome["error_type"] = result["error_type"]
+            return outcome
+
+        succeeded = 0
+        timed_out = 0
+        tasks = [asyncio.ensure_future(run(index, call)) for index, call in enumerate(calls)]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                outcome = await next_result
+                succeeded += outcome["success"]
+                timed_out += outcome.get("error_type") == "timeout"
+                yield outcome
+        finally:
+            # Stop outstanding calls if the client went away
+            for task in tasks:
+                task.cancel()
+
+        yield {
+            "type": "complete",
+            "calls": len(calls),
+            "succeeded": succeeded,
+            "failed": len(calls) - succeeded,
+            "timed_out": timed_out,
+            "duration_ms": round((time.monotonic() - batch_started) * 1000, 1)
+        }
+
     # Gmail specific methods
     async def gmail_search_emails(self, query: str) -> Dict[str, Any]:
         """
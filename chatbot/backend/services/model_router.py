@@ -0,0 +1,220 @@
+"""
+Adaptive model router for the chatbot API.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Any, Optional, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ModelRouter:
+    """Route ``model=auto`` requests to the cheapest model likely to meet a latency target."""
+
+    # Candidate models ordered from cheapest to most expensive. ``capability`` is the
+    # highest message complexity (0-1) the model is expected to handle well and
+    # ``prior_latency_ms`` seeds the latency estimate until real samples arrive.
+    DEFAULT_PROFILES = [
+        {"name": "gemini-1.5-flash", "capability": 0.35, "prior_latency_ms": 1500},
+        {"name": "gemini-2.0-flash", "capability": 0.55, "prior_latency_ms": 1800},
+        {"name": "gemini-2.5-flash", "capability": 0.75, "prior_latency_ms": 3500},
+        {"name": "gemini-1.5-pro", "capability": 0.85, "prior_latency_ms": 6000},
+        {"name": "gemini-2.0-pro", "capability": 0.9, "prior_latency_ms": 7000},
+        {"name": "gemini-2.5-pro", "capability": 1.0, "prior_latency_ms": 15000},
+    ]
+
+    # Phrases that usually call for multi-step reasoning
+    REASONING_KEYWORDS = [
+        "explain why", "step by step", "prove", "derive", "analyze", "analyse",
+        "compare", "design", "architecture", "debug", "optimize", "refactor",
+        "trade-off", "tradeoff", "pros and cons", "implement", "algorithm"
+    ]
+
+    # Phrases that usually indicate a short factual question
+    FACTUAL_KEYWORDS = [
+        "what is", "who is", "who was", "when did", "when is", "where is",
+        "define", "translate", "how many", "capital of"
+    ]
+
+    def __init__(self, models: Iterable[str], latency_target_ms: int = 4000,
+                 decision_log_path: str = None, smoothing: float = 0.2,
+                 profiles: List[Dict[str, Any]] = None):
+        """
+        Initialize the model router.
+
+        Args:
+            models: The model names that may be routed to (e.g. ``GeminiService.MODELS``).
+            latency_target_ms: The latency target a routed model should meet.
+            decision_log_path: Optional JSONL file that routing decisions and outcomes are appended to.
+            smoothing: Weight given to each new latency sample in the moving average.
+            profiles: Optional candidate profiles overriding ``DEFAULT_PROFILES``.
+        """
+        available = set(models)
+        self.profiles = [dict(p) for p in (profiles or self.DEFAULT_PROFILES) if p["name"] in available]
+        self.latency_target_ms = latency_target_ms
+        self.decision_log_path = decision_log_path
+        self.smoothing = smoothing
+        self.latency_estimates = {p["name"]: float(p["prior_latency_ms"]) for p in self.profiles}
+        self.sample_counts = {p["name"]: 0 for p in self.profiles}
+        self._lock = threading.Lock()
+
+        if not self.profiles:
+            logger.warning("Model router has no candidate models; 'auto' will use the default model")
+
+        if self.decision_log_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.decision_log_path)), exist_ok=True)
+
+    def extract_features(self, message: str, history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Extract routing features from a message.
+
+        Args:
+            message: The user's message.
+            history: The chat history, excluding the current message.
+
+        Returns:
+            A dictionary of features.
+        """
+        lowered = message.lower()
+        return {
+            "length": len(message),
+            "code_blocks": message.count("```") // 2,
+            "inline_code": len(re.findall(r'`[^`\n]+`', message)),
+            "reasoning_intent": any(keyword in lowered for keyword in self.REASONING_KEYWORDS),
+            "factual_intent": any(lowered.startswith(keyword) or f" {keyword} " in lowered
+                                  for keyword in self.FACTUAL_KEYWORDS),
+            "history_depth": len(history) if history else 0
+        }
+
+    def score(self, features: Dict[str, Any]) -> float:
+        """
+        Score the complexity of a message from its features.
+
+        Args:
+            features: Features returned by ``extract_features``.
+
+        Returns:
+            A complexity score between 0 and 1.
+        """
+        score = 0.2
+        score += min(features["length"] / 2000.0, 1.0) * 0.3
+        score += min(features["code_blocks"], 2) * 0.15
+        score += min(features["inline_code"], 3) * 0.03
+        score += min(features["history_depth"] / 20.0, 1.0) * 0.15
+
+        if features["reasoning_intent"]:
+            score += 0.3
+        if features["factual_intent"] and not features["reasoning_intent"]:
+            score -= 0.15
+
+        return max(0.0, min(score, 1.0))
+
+    def route(self, message: str, history: List[Dict[str, str]] = None, default: str = "gemini-2.5-flash") -> str:
+        """
+        Pick the cheapest model expected to handle the message within the latency target.
+
+        Args:
+            message: The user's message.
+            history: The chat history, excluding the current message.
+            default: The model to use if the router has no candidates.
+
+        Returns:
+            The chosen model name.
+        """
+        if not self.profiles:
+            return default
+
+        features = self.extract_features(message, history)
+        complexity = self.score(features)
+
+        with self._lock:
+            estimates = dict(self.latency_estimates)
+
+        capable = [p for p in self.profiles if p["capability"] >= complexity] or [self.profiles[-1]]
+        within_target = [p for p in capable if estimates[p["name"]] <= self.latency_target_ms]
+
+        if within_target:
+            chosen = within_target[0]["name"]
+            reason = "cheapest_within_target"
+        else:
+            chosen = min(capable, key=lambda p: estimates[p["name"]])["name"]
+            reason = "fastest_capable"
+
+        logger.info(f"Model router picked {chosen} (complexity={complexity:.2f}, reason={reason})")
+        self._log_event({
+            "event": "decision",
+            "timestamp": time.time(),
+            "features": features,
+            "complexity": round(complexity, 4),
+            "chosen": chosen,
+            "reason": reason,
+            "latency_target_ms": self.latency_target_ms,
+            "latency_estimates_ms": {name: round(value, 1) for name, value in estimates.items()}
+        })
+
+        return chosen
+
+    def record_latency(self, model_name: str, latency_ms: float, success: bool = True):
+        """
+        Record an observed latency for a model.
+
+        Args:
+            model_name: The model that served the request.
+            latency_ms: The observed end-to-end latency in milliseconds.
+            success: Whether the request succeeded. Failed requests are logged but not learned from.
+        """
+        if model_name not in self.latency_estimates:
+            return
+
+        if success:
+            with self._lock:
+                if self.sample_counts[model_name] == 0:
+                    self.latency_estimates[model_name] = float(latency_ms)
+                else:
+                    previous = self.latency_estimates[model_name]
+                    self.latency_estimates[model_name] = previous + self.smoothing * (latency_ms - previous)
+                self.sample_counts[model_name] += 1
+
+        self._log_event({
+            "event": "outcome",
+            "timestamp": time.time(),
+            "model": model_name,
+            "latency_ms": round(latency_ms, 1),
+            "success": success
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the router's current latency estimates.
+
+        Returns:
+            A dictionary with the latency target and per-model estimates.
+        """
+        with self._lock:
+            return {
+                "latency_target_ms": self.latency_target_ms,
+                "models": {
+                    name: {
+                        "latency_estimate_ms": round(self.latency_estimates[name], 1),
+                        "samples": self.sample_counts[name]
+                    }
+                    for name in self.latency_estimates
+                }
+            }
+
+    def _log_event(self, event: Dict[str, Any]):
+        """Append a routing event to the decision log."""
+        if not self.decision_log_path:
+            return
+
+        try:
+            with self._lock:
+                with open(self.decision_log_path, 'a') as f:
+                    f.write(json.dumps(event) + "\n")
+        except Exception as e:
+            logger.error(f"Error writing model router log: {e}")
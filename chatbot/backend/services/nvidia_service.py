@@ -3,90 +3,50 @@ NVIDIA service for the chatbot API.
 """
 import logging
 import os
-import json
-import requests
-from typing import Dict, List, Any, Optional
+
+from .rate_limiter import ProviderRateLimiter, RetryPolicy
+from .background_loop import BackgroundLoop
+from .openai_service import OpenAICompatibleService
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class NvidiaService:
+class NvidiaService(OpenAICompatibleService):
     """Service for interacting with the NVIDIA API."""
 
-    def __init__(self, api_key: str = None, model_name: str = "mistralai/mistral-medium-3-instruct"):
+    API_BASE_URL = "https://api.nvidia.com/v1"
+
+    def __init__(self, api_key: str = None, model_name: str = "mistralai/mistral-medium-3-instruct",
+                 rate_limiter: ProviderRateLimiter = None, retry_policy: RetryPolicy = None,
+                 background_loop: BackgroundLoop = None, pool_limit: int = 16, pool_limit_per_host: int = 8,
+                 connect_timeout: float = 10.0, read_timeout: float = 60.0, keepalive_timeout: float = 60.0):
         """
         Initialize the NVIDIA service.
 
         Args:
             api_key: The NVIDIA API key. If None, uses the NVIDIA_API_KEY environment variable.
             model_name: The NVIDIA model name to use.
+            rate_limiter: Optional client-side rate limiter shared with other providers.
+            retry_policy: Retry policy for throttled and transient failures.
+            background_loop: Event loop the pooled HTTP session lives on.
+            pool_limit: Maximum open connections.
+            pool_limit_per_host: Maximum open connections to the API host.
+            connect_timeout: Seconds allowed to establish a connection.
+            read_timeout: Seconds allowed between reads of the response body.
+            keepalive_timeout: Seconds an idle connection is kept in the pool.
         """
-        self.api_key = api_key or os.environ.get("NVIDIA_API_KEY")
-        self.model_name = model_name
-        self.api_url = "https://api.nvidia.com/v1/chat/completions"
-        
-        if not self.api_key:
-            logger.warning("No NVIDIA API key provided. The service will not work properly.")
-        else:
-            logger.info(f"Using NVIDIA model: {self.model_name} as default")
-            
-    async def generate_response(self, message: str, history: List[Dict[str, str]] = None) -> str:
-        """
-        Generate a response from the NVIDIA API.
-
-        Args:
-            message: The user's message.
-            history: The chat history.
-
-        Returns:
-            The generated response.
-        """
-        if not self.api_key:
-            return "I'm sorry, the NVIDIA API is not properly configured."
-            
-        try:
-            # Convert history to NVIDIA format
-            messages = []
-            
-            if history:
-                for msg in history:
-                    if msg["role"] == "user":
-                        messages.append({"role": "user", "content": msg["content"]})
-                    elif msg["role"] == "assistant":
-                        messages.append({"role": "assistant", "content": msg["content"]})
-            
-            # Add the current message
-            messages.append({"role": "user", "content": message})
-            
-            # Prepare the request
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": self.model_name,
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 1024
-            }
-            
-            # Make the request
-            response = requests.post(self.api_url, headers=headers, json=data)
-            
-            if response.status_code != 200:
-                logger.error(f"Error from NVIDIA API: {response.status_code} - {response.text}")
-                return f"I'm sorry, I encountered an error: {response.status_code}"
-                
-            # Parse the response
-            result = response.json()
-            
-            if "choices" in result and len(result["choices"]) > 0:
-                return result["choices"][0]["message"]["content"]
-            else:
-                logger.error(f"Unexpected response format from NVIDIA API: {result}")
-                return "I'm sorry, I received an unexpected response format."
-        except Exception as e:
-            logger.error(f"Error generating response from NVIDIA: {e}")
-            return f"I'm sorry, I encountered an error: {str(e)}"
+        super().__init__(
+            "nvidia",
+            self.API_BASE_URL,
+            model_name,
+            api_key=api_key or os.environ.get("NVIDIA_API_KEY"),
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            background_loop=background_loop or BackgroundLoop(name="nvidia-http"),
+            pool_limit=pool_limit,
+            pool_limit_per_host=pool_limit_per_host,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            keepalive_timeout=keepalive_timeout
+        )
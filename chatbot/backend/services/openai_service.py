@@ -0,0 +1,396 @@
+"""
+Client for OpenAI-compatible chat completion APIs (NVIDIA, local inference servers).
+"""
+import logging
+import os
+import asyncio
+import time
+import aiohttp
+from typing import Dict, List, Any, Optional, AsyncGenerator
+
+from .rate_limiter import (
+    ProviderRateLimiter, RetryPolicy, RetryableError, RETRYABLE_STATUS_CODES, estimate_tokens, parse_retry_after
+)
+from .sse import SSEParser, parse_completion_delta
+from .background_loop import BackgroundLoop
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class OpenAICompatibleService:
+    """Service for any API that implements the OpenAI ``/chat/completions`` endpoint."""
+
+    def __init__(self, name: str, base_url: str, model_name: str, api_key: str = None,
+                 require_api_key: bool = True, rate_limiter: ProviderRateLimiter = None,
+                 retry_policy: RetryPolicy = None, background_loop: BackgroundLoop = None,
+                 pool_limit: int = 16, pool_limit_per_host: int = 8, connect_timeout: float = 10.0,
+                 read_timeout: float = 60.0, keepalive_timeout: float = 60.0,
+                 temperature: float = 0.7, max_tokens: int = 1024):
+        """
+        Initialize the service.
+
+        Args:
+            name: The provider name, used for rate limits, logs and ``model_used``.
+            base_url: The API base URL; ``/chat/completions`` is appended.
+            model_name: The default model.
+            api_key: The API key sent as a bearer token, if any.
+            require_api_key: Whether requests are refused without an API key. Local servers usually need none.
+            rate_limiter: Optional client-side rate limiter shared with other providers.
+            retry_policy: Retry policy for throttled and transient failures.
+            background_loop: Event loop the pooled HTTP session lives on.
+            pool_limit: Maximum open connections.
+            pool_limit_per_host: Maximum open connections to the API host.
+            connect_timeout: Seconds allowed to establish a connection.
+            read_timeout: Seconds allowed between reads of the response body.
+            keepalive_timeout: Seconds an idle connection is kept in the pool.
+            temperature: Sampling temperature.
+            max_tokens: Maximum tokens generated per response.
+        """
+        self.name = name
+        self.api_url = f"{base_url.rstrip('/')}/chat/completions"
+        self.model_name = model_name
+        self.api_key = api_key
+        self.require_api_key = require_api_key
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy(rate_limiter=rate_limiter)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+        # The keep-alive session is bound to an event loop, so it lives on a long-lived
+        # background loop rather than the per-request loops
+        self.background_loop = background_loop or BackgroundLoop(name=f"{name}-http")
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        self.keepalive_timeout = keepalive_timeout
+        self.session = None
+
+        if self.require_api_key and not self.api_key:
+            logger.warning(f"No {self.name} API key provided. The service will not work properly.")
+        else:
+            logger.info(f"Using {self.name} model: {self.model_name} as default ({self.api_url})")
+
+    @classmethod
+    def from_config(cls, name: str, spec: Dict[str, Any], **kwargs) -> "OpenAICompatibleService":
+        """
+        Create a provider from its ``OPENAI_COMPATIBLE_PROVIDERS`` entry.
+
+        Args:
+            name: The provider name.
+            spec: The entry: "base_url" and "model", plus optional "api_key_env", "pool_limit",
+                "pool_limit_per_host", "connect_timeout", "read_timeout", "keepalive_timeout",
+                "temperature" and "max_tokens".
+            **kwargs: Shared dependencies (rate_limiter, retry_policy, background_loop).
+
+        Returns:
+            The provider service.
+        """
+        options = {key: spec[key] for key in (
+            "pool_limit", "pool_limit_per_host", "connect_timeout", "read_timeout",
+            "keepalive_timeout", "temperature", "max_tokens"
+        ) if key in spec}
+        api_key_env = spec.get("api_key_env")
+
+        return cls(
+            name,
+            spec["base_url"],
+            spec["model"],
+            api_key=os.environ.get(api_key_env) if api_key_env else None,
+            require_api_key=bool(api_key_env),
+            **options,
+            **kwargs
+        )
+
+    @property
+    def configured(self) -> bool:
+        """Whether the service can send requests."""
+        return bool(self.api_key) or not self.require_api_key
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled HTTP session, creating it on first use.
+
+        Must be called on the background loop.
+
+        Returns:
+            The shared client session.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def close(self):
+        """Close the pooled HTTP session."""
+        async def close_session():
+            if self.session is not None and not self.session.closed:
+                await self.session.close()
+
+        await self.background_loop.run(close_session())
+
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Open a pooled connection to the API so the first request skips DNS/TLS setup.
+
+        Returns:
+            A dictionary describing the warm-up result.
+        """
+        if not self.configured:
+            return {"status": "skipped", "error": f"{self.name} API key not configured"}
+
+        async def open_connection():
+            # Any response means the connection is established and kept in the pool
+            async with self._get_session().head(self.api_url):
+                pass
+
+        started = time.monotonic()
+        try:
+            self.background_loop.submit(open_connection()).result(timeout=self.timeout.connect + 5)
+            return {"status": "ready", "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+        except Exception as e:
+            logger.error(f"Error warming up {self.name} connection: {e}")
+            return {"status": "failed", "error": str(e), "duration_ms": round((time.monotonic() - started) * 1000, 1)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Describe the provider's endpoint and pool.
+
+        Returns:
+            A dictionary with the URL, default model and pool limits.
+        """
+        return {
+            "api_url": self.api_url,
+            "model": self.model_name,
+            "configured": self.configured,
+            "pool_limit": self.pool_limit,
+            "pool_limit_per_host": self.pool_limit_per_host,
+            "pool_open": self.session is not None and not self.session.closed
+        }
+
+    def _build_request(self, message: str, history: List[Dict[str, str]] = None, stream: bool = False,
+                       model_name: str = None):
+        """
+        Build the headers and payload of a chat completion request.
+
+        Args:
+            message: The user's message.
+            history: The chat history.
+            stream: Whether to request a streamed (SSE) response.
+            model_name: The model to use instead of the default.
+
+        Returns:
+            A tuple of (headers, payload).
+        """
+        # Convert history to the OpenAI message format
+        messages = []
+
+        if history:
+            for msg in history:
+                if msg["role"] == "user":
+                    messages.append({"role": "user", "content": msg["content"]})
+                elif msg["role"] == "assistant":
+                    messages.append({"role": "assistant", "content": msg["content"]})
+
+        # Add the current message
+        messages.append({"role": "user", "content": message})
+
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if stream else "application/json"
+        }
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        data = {
+            "model": model_name or self.model_name,
+            "messages": messages,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": stream
+        }
+
+        return headers, data
+
+    async def generate_response(self, message: str, history: List[Dict[str, str]] = None,
+                                model_name: str = None) -> str:
+        """
+        Generate a response.
+
+        Args:
+            message: The user's message.
+            history: The chat history.
+            model_name: The model to use instead of the default.
+
+        Returns:
+            The generated response.
+        """
+        if not self.configured:
+            return f"I'm sorry, the {self.name} API is not properly configured."
+
+        try:
+            headers, data = self._build_request(message, history, model_name=model_name)
+
+            # Wait for rate limit capacity, then make the request with retries
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(self.name, data["model"], estimate_tokens(message, history, data["max_tokens"]))
+
+            try:
+                status, result = await self.background_loop.run(
+                    self.retry_policy.call(lambda: self._post(headers, data), self.name, data["model"])
+                )
+            except RetryableError as e:
+                logger.error(f"Error from {self.name} API after retries: {e}")
+                return f"I'm sorry, I encountered an error: {e.status_code}"
+
+            if status != 200:
+                logger.error(f"Error from {self.name} API: {status} - {result}")
+                return f"I'm sorry, I encountered an error: {status}"
+
+            if "choices" in result and len(result["choices"]) > 0:
+                return result["choices"][0]["message"]["content"]
+            else:
+                logger.error(f"Unexpected response format from {self.name} API: {result}")
+                return "I'm sorry, I received an unexpected response format."
+        except Exception as e:
+            logger.error(f"Error generating response from {self.name}: {e}")
+            return f"I'm sorry, I encountered an error: {str(e)}"
+
+    async def stream_response(self, message: str, history: List[Dict[str, str]] = None,
+                              model_name: str = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a response.
+
+        Args:
+            message: The user's message.
+            history: The chat history.
+            model_name: The model to use instead of the default.
+
+        Yields:
+            Dictionaries containing response chunks and metadata, in the same format as
+            ``GeminiService.stream_response``.
+        """
+        if not self.configured:
+            await asyncio.sleep(0)  # Ensure this is truly asynchronous
+            yield {
+                "type": "error",
+                "text": f"I'm sorry, the {self.name} API is not properly configured."
+            }
+            return
+
+        try:
+            headers, data = self._build_request(message, history, stream=True, model_name=model_name)
+
+            # Wait for rate limit capacity, then stream from the pooled session
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(self.name, data["model"], estimate_tokens(message, history, data["max_tokens"]))
+
+            async for chunk in self.background_loop.stream(self._stream_chunks(headers, data)):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming response from {self.name}: {e}")
+            await asyncio.sleep(0)  # Ensure this is truly asynchronous
+            yield {
+                "type": "error",
+                "text": f"I'm sorry, I encountered an error: {str(e)}"
+            }
+
+    async def _open(self, headers: Dict[str, str], data: Dict[str, Any]) -> aiohttp.ClientResponse:
+        """
+        Send a request on the pooled session, raising ``RetryableError`` for retryable failures.
+
+        Must be called on the background loop.
+
+        Args:
+            headers: The request headers.
+            data: The JSON payload.
+
+        Returns:
+            The open response. The caller must release it.
+        """
+        try:
+            response = await self._get_session().post(self.api_url, headers=headers, json=data)
+        except aiohttp.ClientConnectionError as e:
+            raise RetryableError(f"{self.name} API connection failed: {e}") from e
+
+        if response.status in RETRYABLE_STATUS_CODES:
+            response.release()
+            raise RetryableError(
+                f"{self.name} API returned {response.status}",
+                status_code=response.status,
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
+            )
+        return response
+
+    async def _post(self, headers: Dict[str, str], data: Dict[str, Any]):
+        """
+        Send a non-streaming request. Must be called on the background loop.
+
+        Args:
+            headers: The request headers.
+            data: The JSON payload.
+
+        Returns:
+            A tuple of (status code, parsed JSON body or error text).
+        """
+        async with await self._open(headers, data) as response:
+            if response.status != 200:
+                return response.status, await response.text()
+            return response.status, await response.json(content_type=None)
+
+    async def _stream_chunks(self, headers: Dict[str, str], data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream a completion from the pooled session. Must be iterated on the background loop.
+
+        Args:
+            headers: The request headers.
+            data: The JSON payload.
+
+        Yields:
+            Content chunks, then a complete or error chunk.
+        """
+        response = await self.retry_policy.call(lambda: self._open(headers, data), self.name, data["model"])
+
+        async with response:
+            if response.status != 200:
+                logger.error(f"Error from {self.name} API: {response.status} - {await response.text()}")
+                yield {
+                    "type": "error",
+                    "text": f"I'm sorry, I encountered an error: {response.status}"
+                }
+                return
+
+            parser = SSEParser()
+            full_response = ""
+
+            async def events():
+                async for raw in response.content.iter_any():
+                    for event in parser.feed(raw):
+                        yield event
+                for event in parser.close():
+                    yield event
+
+            async for event in events():
+                if event["data"] == "[DONE]":
+                    break
+
+                text = parse_completion_delta(event["data"])
+                if text:
+                    full_response += text
+                    yield {
+                        "type": "content",
+                        "text": text,
+                        "model_used": self.name
+                    }
+
+        # Final message with complete response
+        yield {
+            "type": "complete",
+            "text": full_response,
+            "model_used": self.name
+        }
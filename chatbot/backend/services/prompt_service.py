@@ -2,17 +2,43 @@
 Service for generating dynamic system prompts.
 """
 import logging
-from typing import Dict, List, Any
+import re
+from typing import Dict, List, Any, Optional, Set
+
+from .tool_index import ToolIndex
+from .mcp.tool_policy import catalog_services, tool_service
+from .rate_limiter import estimate_tokens
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Ways of rendering the tool catalog
+RENDER_MODES = ("markdown", "compact")
+
+# Filler that opens many tool descriptions without adding meaning
+DESCRIPTION_FILLER = re.compile(r'^(this tool (will )?|tool (to|that) |use this (tool )?to |allows you to |used to )', re.IGNORECASE)
+
 class PromptService:
     """Service for generating dynamic system prompts."""
 
-    def __init__(self):
-        """Initialize the prompt service."""
+    def __init__(self, top_k: int = 8, render_mode: str = "markdown", max_description_chars: int = 80):
+        """
+        Initialize the prompt service.
+
+        Args:
+            top_k: Number of relevant tools listed per request. 0 lists the whole catalog.
+            render_mode: "markdown" for the verbose catalog or "compact" for one short line per tool.
+            max_description_chars: Description length limit in compact mode.
+        """
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode {render_mode!r}; expected one of {RENDER_MODES}")
+
+        self.top_k = top_k
+        self.render_mode = render_mode
+        self.max_description_chars = max_description_chars
+        self.tool_index = None
+        self.prompt_report = None
         self.base_system_prompt = """You are a helpful AI assistant with access to various external tools through the MCP (Multi-Cloud Protocol) server.
 You can use these tools to perform actions like sending emails, creating meetings, finding files, and more.
 
@@ -32,43 +58,8 @@ When you use these tools, the system will show a 'Connecting to tool...' message
 If you need more information from the user to use a tool (like an email address or meeting time), ask for that specific information.
 """
 
-    def generate_system_prompt(self, available_tools: List[Dict[str, Any]]) -> str:
-        """
-        Generate a system prompt that includes information about available tools.
-
-        Args:
-            available_tools: A list of dictionaries containing tool information.
-
-        Returns:
-            A system prompt string.
-        """
-        # Start with the base system prompt
-        prompt = self.base_system_prompt + "\n\n"
-
-        # Add information about available tools
-        prompt += "Here are the tools you have access to:\n\n"
-
-        # Group tools by service
-        service_tools = {}
-        for tool in available_tools:
-            service_name = tool["name"].split("_")[0] if "_" in tool["name"] else "other"
-            if service_name not in service_tools:
-                service_tools[service_name] = []
-            service_tools[service_name].append(tool)
-
-        # Add tools by service
-        for service, tools in service_tools.items():
-            prompt += f"## {service.capitalize()} Tools\n"
-            for tool in tools:
-                prompt += f"- **{tool['name']}**: {tool['description']}\n"
-
-                # Add parameter information if available
-                if "parameters" in tool and tool["parameters"]:
-                    prompt += f"  Parameters: {', '.join(tool['parameters'])}\n"
-            prompt += "\n"
-
-        # Add instructions on how to use the tools
-        prompt += """
+        # Closing instructions of the markdown catalog
+        self.tool_instructions = """
 When a user asks you to perform a task that requires one of these tools:
 1. Identify which tool would be most appropriate
 2. Tell the user you can help them with that task using your tools
@@ -93,16 +84,202 @@ User: "Find my recent emails from Sarah"
 You: "I'll help you find recent emails from Sarah. Let me search your inbox for you."
 """
 
+        # The compact catalog keeps only the steps; the rules are already in the base prompt
+        self.compact_tool_instructions = """
+To use a tool: pick the most appropriate one, ask for any missing information, then use it.
+"""
+
+    def build_index(self, available_tools: List[Dict[str, Any]]):
+        """
+        Index the tool catalog for relevance filtering and measure its prompt size.
+        Called whenever the catalog loads.
+
+        Args:
+            available_tools: A list of dictionaries containing tool information.
+        """
+        self.tool_index = ToolIndex(available_tools) if available_tools and self.top_k else None
+
+        if available_tools:
+            self.prompt_report = self.token_report(available_tools)
+            logger.info(f"Full tool catalog prompt: {self.prompt_report['markdown']['tokens']} tokens as markdown, "
+                        f"{self.prompt_report['compact']['tokens']} compact ({self.prompt_report['savings_percent']}% saved)")
+
+    def select_tools(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Select the tools relevant to a request.
+
+        Args:
+            query: The message and recent conversation text.
+
+        Returns:
+            The top-k relevant tools, or None if the whole catalog should be listed.
+        """
+        if not self.tool_index or not query:
+            return None
+        return [tool for tool, _ in self.tool_index.search(query, self.top_k)]
+
+    def record_tool_use(self, tool_name: str, selected_tools: Optional[List[Dict[str, Any]]]):
+        """
+        Record whether a tool the model called was listed in its prompt.
+
+        Args:
+            tool_name: The tool the model called.
+            selected_tools: The tools listed in that request's prompt, or None if all were listed.
+        """
+        if self.tool_index and selected_tools is not None:
+            self.tool_index.record_usage(tool_name, [tool["name"] for tool in selected_tools])
+
+    def get_tool_index_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the relevance filter statistics.
+
+        Returns:
+            The tool index statistics, or None if filtering is off.
+        """
+        return self.tool_index.get_stats() if self.tool_index else None
+
+    def generate_system_prompt(self, available_tools: List[Dict[str, Any]],
+                               selected_tools: Optional[List[Dict[str, Any]]] = None, render_mode: str = None) -> str:
+        """
+        Generate a system prompt that includes information about available tools.
+
+        Args:
+            available_tools: A list of dictionaries containing tool information.
+            selected_tools: If given, only these tools are described, after a compact list of all services.
+            render_mode: Overrides the configured render mode.
+
+        Returns:
+            A system prompt string.
+        """
+        mode = render_mode or self.render_mode
+
+        # Start with the base system prompt
+        prompt = self.base_system_prompt + "\n\n"
+
+        # Services as the catalog groups them, so a selection is grouped like the full catalog
+        known_services = catalog_services(tool["name"] for tool in available_tools)
+
+        if selected_tools is None:
+            # Add information about all available tools
+            prompt += "Here are the tools you have access to:\n\n"
+            prompt += self._render_tools(available_tools, mode, known_services)
+        else:
+            # Only describe the tools relevant to this request, after a compact list of all services
+            service_tools = self._group_by_service(available_tools, known_services)
+            services = ", ".join(f"{service} ({len(tools)})" for service, tools in service_tools.items())
+            prompt += f"You have tools for these services (number of tools in parentheses): {services}\n\n"
+            if selected_tools:
+                prompt += "Here are the tools most relevant to this request:\n\n"
+                prompt += self._render_tools(selected_tools, mode, known_services)
+
+        # Add instructions on how to use the tools
+        prompt += self.compact_tool_instructions if mode == "compact" else self.tool_instructions
+
         return prompt
 
-    def generate_user_system_message(self, available_tools: List[Dict[str, Any]]) -> str:
+    def generate_user_system_message(self, available_tools: List[Dict[str, Any]],
+                                     selected_tools: Optional[List[Dict[str, Any]]] = None) -> str:
         """
         Generate a system message to be sent as the first user message.
 
         Args:
             available_tools: A list of dictionaries containing tool information.
+            selected_tools: If given, only these tools are described.
 
         Returns:
             A system message string.
         """
-        return f"System: {self.generate_system_prompt(available_tools)}"
+        return f"System: {self.generate_system_prompt(available_tools, selected_tools)}"
+
+    @staticmethod
+    def _group_by_service(tools: List[Dict[str, Any]], services: Set[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Group tools by service, as ``CatalogIndex`` does (e.g. google_drive_find_a_file -> google_drive)."""
+        if services is None:
+            services = catalog_services(tool["name"] for tool in tools)
+
+        service_tools = {}
+        for tool in tools:
+            service_name = tool_service(tool["name"], services) if "_" in tool["name"] else "other"
+            if service_name not in service_tools:
+                service_tools[service_name] = []
+            service_tools[service_name].append(tool)
+        return service_tools
+
+    def token_report(self, available_tools: List[Dict[str, Any]],
+                     selected_tools: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Compare the size of the system prompt in each render mode.
+
+        Args:
+            available_tools: A list of dictionaries containing tool information.
+            selected_tools: If given, the report is for a relevance-filtered prompt.
+
+        Returns:
+            A dictionary with characters and estimated tokens per mode and the compact saving.
+        """
+        report = {}
+        for mode in RENDER_MODES:
+            prompt = self.generate_system_prompt(available_tools, selected_tools, render_mode=mode)
+            report[mode] = {"chars": len(prompt), "tokens": estimate_tokens(prompt, max_output_tokens=0)}
+
+        markdown_tokens = report["markdown"]["tokens"]
+        report["savings_percent"] = round(100 * (1 - report["compact"]["tokens"] / markdown_tokens), 1) if markdown_tokens else 0.0
+        return report
+
+    def get_prompt_report(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the token report of the full catalog computed when it was loaded.
+
+        Returns:
+            The report, or None if no catalog has been loaded.
+        """
+        return self.prompt_report
+
+    def _render_tools(self, tools: List[Dict[str, Any]], mode: str = "markdown", services: Set[str] = None) -> str:
+        """Render tools in the given mode, grouped by the given services."""
+        if mode == "compact":
+            return self._render_tools_compact(tools, services)
+
+        text = ""
+        for service, service_tools in self._group_by_service(tools, services).items():
+            text += f"## {service.replace('_', ' ').title()} Tools\n"
+            for tool in service_tools:
+                text += f"- **{tool['name']}**: {tool['description']}\n"
+
+                # Add parameter information if available
+                if "parameters" in tool and tool["parameters"]:
+                    text += f"  Parameters: {', '.join(tool['parameters'])}\n"
+            text += "\n"
+        return text
+
+    def _render_tools_compact(self, tools: List[Dict[str, Any]], services: Set[str] = None) -> str:
+        """
+        Render tools with one short line each.
+
+        The service prefix is written once per group, parameters shared by every tool
+        of a service are hoisted into the group header, and descriptions are normalized.
+        """
+        text = "Listed as name(parameters): description, under their shared name prefix.\n"
+        for service, service_tools in self._group_by_service(tools, services).items():
+            parameter_lists = [list(tool.get("parameters") or []) for tool in service_tools]
+            shared = [name for name in parameter_lists[0] if all(name in params for params in parameter_lists[1:])] \
+                if len(service_tools) > 1 else []
+
+            prefix = f"{service}_" if service != "other" else ""
+            text += f"[{prefix}*]" + (f" all take: {', '.join(shared)}" if shared else "") + "\n"
+
+            for tool, params in zip(service_tools, parameter_lists):
+                name = tool["name"][len(prefix):] if prefix and tool["name"].startswith(prefix) else tool["name"]
+                own = [param for param in params if param not in shared]
+                text += f"{name}({', '.join(own)}): {self._normalize_description(tool.get('description'))}\n"
+        return text
+
+    def _normalize_description(self, description: Optional[str]) -> str:
+        """Collapse whitespace, drop markdown and filler openings, and truncate at a word boundary."""
+        text = re.sub(r'\s+', ' ', re.sub(r'[*_`#]+', '', description or '')).strip()
+        text = DESCRIPTION_FILLER.sub('', text).rstrip('.')
+        text = text[:1].upper() + text[1:]
+
+        if len(text) > self.max_description_chars:
+            text = text[:self.max_description_chars].rsplit(' ', 1)[0].rstrip(',;:') + "..."
+        return text
@@ -0,0 +1,113 @@
+"""
+Registry mapping requested models to the provider services that serve them.
+"""
+import fnmatch
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class ProviderRegistry:
+    """
+    Named provider services and the mapping from model names to them.
+
+    Every provider implements ``stream_response(message, history, model_name)``, yielding
+    the chunk dictionaries of ``GeminiService.stream_response``. The model map takes exact
+    names or glob patterns to a provider name, optionally with the upstream model after a
+    colon, e.g. ``{"gemini-*": "gemini", "fast": "local:llama-3.1-8b-instruct"}``.
+    """
+
+    def __init__(self, default_provider: str, model_map: Dict[str, str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            default_provider: The provider used for models matching no mapping.
+            model_map: Maps model names or glob patterns to "provider" or "provider:model".
+        """
+        self.default_provider = default_provider
+        self.model_map = dict(model_map or {})
+        self.providers = {}
+
+    def register(self, name: str, service: Any):
+        """
+        Register a provider service.
+
+        Args:
+            name: The provider name.
+            service: The service; must implement ``stream_response``.
+        """
+        self.providers[name] = service
+        logger.info(f"Registered model provider {name}")
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Get a provider service by name.
+
+        Args:
+            name: The provider name.
+
+        Returns:
+            The service, or None if no such provider is registered.
+        """
+        return self.providers.get(name)
+
+    def resolve(self, model: str) -> Tuple[str, Any, Optional[str]]:
+        """
+        Find the provider serving a model.
+
+        Args:
+            model: The requested model (e.g. "gemini-2.5-pro", "nvidia", "local").
+
+        Returns:
+            A tuple of (provider name, service, upstream model). The upstream model is None
+            when the provider's default model should be used.
+
+        Raises:
+            KeyError: If the mapped provider is not registered.
+        """
+        # Model and provider names match case-insensitively: "NVIDIA" is the nvidia provider
+        lowered = model.lower()
+        target = self.model_map.get(model)
+        if target is None:
+            target = next((value for pattern, value in self.model_map.items()
+                           if fnmatch.fnmatchcase(lowered, pattern.lower())), None)
+        if target is None:
+            target = lowered if lowered in self.providers else self.default_provider
+
+        name, _, upstream_model = target.partition(":")
+        if name not in self.providers:
+            raise KeyError(f"Model {model} is mapped to unregistered provider {name}")
+
+        # A bare provider name asks for that provider's default model
+        if not upstream_model and lowered != name:
+            upstream_model = model
+
+        return name, self.providers[name], upstream_model or None
+
+    async def close(self):
+        """Close every provider that holds pooled connections."""
+        for name, service in self.providers.items():
+            if hasattr(service, "close"):
+                try:
+                    await service.close()
+                except Exception as e:
+                    logger.error(f"Error closing provider {name}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            A dictionary with the model map and each provider's endpoint and pool settings.
+        """
+        return {
+            "default_provider": self.default_provider,
+            "model_map": dict(self.model_map),
+            "providers": {
+                name: service.get_stats() if hasattr(service, "get_stats") else {}
+                for name, service in self.providers.items()
+            }
+        }
@@ -0,0 +1,204 @@
+"""
+Near-duplicate question cache using SimHash fingerprints.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+# Words that carry little meaning and make fingerprints of paraphrases drift apart
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "and", "or",
+    "in", "on", "for", "with", "me", "i", "you", "please", "can", "could", "would",
+    "do", "does", "it", "this", "that", "my", "your", "tell", "about"
+}
+
+def simhash(text: str) -> int:
+    """
+    Compute the 64-bit SimHash fingerprint of a text.
+
+    Args:
+        text: The text to fingerprint.
+
+    Returns:
+        The fingerprint as an integer.
+    """
+    tokens = [token for token in re.findall(r'[a-z0-9]+', text.lower()) if token not in STOPWORDS]
+
+    # Unigrams plus bigrams so word order contributes a little
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Count the differing bits between two fingerprints.
+
+    Args:
+        a: The first fingerprint.
+        b: The second fingerprint.
+
+    Returns:
+        The Hamming distance.
+    """
+    return bin(a ^ b).count('1')
+
+class QuestionCache:
+    """Bounded index of recent first-turn questions and their answers, matched by SimHash."""
+
+    def __init__(self, max_distance: int = 3, max_entries: int = 2048, ttl_seconds: int = 3600, min_tokens: int = 3):
+        """
+        Initialize the question cache.
+
+        Args:
+            max_distance: Maximum Hamming distance for two questions to count as duplicates.
+            max_entries: Maximum number of questions kept in the index.
+            ttl_seconds: Time-to-live of an entry.
+            min_tokens: Questions with fewer meaningful words are neither cached nor matched.
+        """
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+
+        # Pigeonhole banding: if two fingerprints differ in at most max_distance bits,
+        # at least one of max_distance + 1 bands is identical, so only entries sharing
+        # a band value need a full distance check.
+        self.band_count = max_distance + 1
+        self.band_width = FINGERPRINT_BITS // self.band_count
+        self.entries = OrderedDict()
+        self.bands = [dict() for _ in range(self.band_count)]
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def lookup(self, question: str, model: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a near-duplicate question.
+
+        Args:
+            question: The user's question.
+            model: The model the answer should come from.
+
+        Returns:
+            The cached entry with "text", "model_used" and "distance", or None on a miss.
+        """
+        if not self._is_indexable(question):
+            return None
+
+        fingerprint = simhash(question)
+        now = time.time()
+
+        with self._lock:
+            best = None
+            for entry_id in self._candidates(fingerprint):
+                entry = self.entries[entry_id]
+                if entry["model"] != model or entry["expires_at"] <= now:
+                    continue
+                distance = hamming_distance(fingerprint, entry["fingerprint"])
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, entry_id)
+
+            if best is None:
+                self.stats["misses"] += 1
+                return None
+
+            distance, entry_id = best
+            self.entries.move_to_end(entry_id)
+            self.stats["hits"] += 1
+            entry = self.entries[entry_id]
+
+        logger.info(f"Near-duplicate question cache hit (distance={distance})")
+        return {"text": entry["text"], "model_used": entry["model_used"], "distance": distance}
+
+    def add(self, question: str, model: str, answer: str, model_used: str):
+        """
+        Index a first-turn question and its answer.
+
+        Args:
+            question: The user's question.
+            model: The model that was requested.
+            answer: The answer text.
+            model_used: The model that actually produced the answer.
+        """
+        if not self._is_indexable(question):
+            return
+
+        fingerprint = simhash(question)
+        entry_id = (model, fingerprint)
+
+        with self._lock:
+            if entry_id in self.entries:
+                self._remove(entry_id)
+
+            self.entries[entry_id] = {
+                "model": model,
+                "fingerprint": fingerprint,
+                "text": answer,
+                "model_used": model_used,
+                "expires_at": time.time() + self.ttl_seconds
+            }
+            for band, value in enumerate(self._band_values(fingerprint)):
+                self.bands[band].setdefault(value, set()).add(entry_id)
+            self.stats["writes"] += 1
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                self.stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters.
+
+        Returns:
+            A dictionary of counters and the number of indexed questions.
+        """
+        with self._lock:
+            return dict(self.stats, entries=len(self.entries))
+
+    def _is_indexable(self, question: str) -> bool:
+        """Check whether a question has enough meaningful words to fingerprint reliably."""
+        tokens = [token for token in re.findall(r'[a-z0-9]+', question.lower()) if token not in STOPWORDS]
+        return len(tokens) >= self.min_tokens
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        """Split a fingerprint into its band values."""
+        mask = (1 << self.band_width) - 1
+        return [(fingerprint >> (band * self.band_width)) & mask for band in range(self.band_count)]
+
+    def _candidates(self, fingerprint: int) -> set:
+        """Collect entries sharing at least one band with the fingerprint. Caller holds the lock."""
+        candidates = set()
+        for band, value in enumerate(self._band_values(fingerprint)):
+            candidates.update(self.bands[band].get(value, ()))
+        return candidates
+
+    def _remove(self, entry_id):
+        """Remove an entry and its band postings. Caller holds the lock."""
+        entry = self.entries.pop(entry_id)
+        for band, value in enumerate(self._band_values(entry["fingerprint"])):
+            bucket = self.bands[band].get(value)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.bands[band][value]
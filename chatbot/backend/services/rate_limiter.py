@@ -0,0 +1,322 @@
+"""
+Client-side rate limiting and retry policy for model providers.
+"""
+import asyncio
+import email.utils
+import inspect
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional, Callable
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class RateLimitTimeout(Exception):
+    """Raised when a request would have to wait longer than the limiter allows."""
+
+class RetryableError(Exception):
+    """An error from a provider that may succeed if retried."""
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        """
+        Initialize the error.
+
+        Args:
+            message: The error message.
+            status_code: The HTTP status code, if any.
+            retry_after: Seconds the provider asked us to wait, if any.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def estimate_tokens(message: str, history: List[Dict[str, str]] = None, max_output_tokens: int = 1024) -> int:
+    """
+    Roughly estimate the tokens a request will consume.
+
+    Args:
+        message: The user's message.
+        history: The chat history sent with the message.
+        max_output_tokens: The output budget of the request.
+
+    Returns:
+        The estimated token count (about four characters per token).
+    """
+    characters = len(message) + sum(len(msg.get("content", "")) for msg in (history or []))
+    return characters // 4 + max_output_tokens
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Either a number of seconds or an HTTP date.
+
+    Returns:
+        The number of seconds to wait, or None if the value cannot be parsed.
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(str(value))
+        return max(retry_at.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations in arrival order."""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute: Tokens added per minute.
+            capacity: Maximum burst size. Defaults to one minute of tokens.
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Reserve tokens, going into debt if necessary.
+
+        Args:
+            amount: The number of tokens to take.
+
+        Returns:
+            Seconds the caller must wait before using the reservation.
+        """
+        amount = min(amount, self.capacity)
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def refund(self, amount: float = 1):
+        """
+        Return tokens from a reservation that will not be used.
+
+        Args:
+            amount: The number of tokens to return.
+        """
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+class ProviderRateLimiter:
+    """Request and token rate limits per provider and per model."""
+
+    def __init__(self, limits: Dict[str, Dict[str, float]] = None, max_wait_seconds: float = 60.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            limits: Maps a provider ("gemini") or provider:model ("gemini:gemini-2.5-pro") to
+                {"requests_per_minute": ..., "tokens_per_minute": ...}. Missing keys are unlimited.
+            max_wait_seconds: Longest a request may queue before ``RateLimitTimeout`` is raised.
+        """
+        self.limits = limits or {}
+        self.max_wait_seconds = max_wait_seconds
+        self.buckets = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    async def acquire(self, provider: str, model: str = None, tokens: int = 0):
+        """
+        Wait until a request may be sent.
+
+        Args:
+            provider: The provider name.
+            model: The model name.
+            tokens: The estimated tokens the request consumes.
+        """
+        reservations = []
+        for scope in self._scopes(provider, model):
+            requests_bucket, tokens_bucket = self._buckets(scope)
+            if requests_bucket:
+                reservations.append((requests_bucket, 1))
+            if tokens_bucket and tokens:
+                reservations.append((tokens_bucket, tokens))
+
+        if not reservations:
+            return
+
+        wait = max(bucket.reserve(amount) for bucket, amount in reservations)
+
+        if wait > self.max_wait_seconds:
+            for bucket, amount in reservations:
+                bucket.refund(amount)
+            self._record(provider, model, "rejected", 1)
+            raise RateLimitTimeout(f"Rate limit for {provider} would require waiting {wait:.1f}s")
+
+        if wait > 0:
+            logger.info(f"Rate limiter queued {provider}/{model} request for {wait:.2f}s")
+            self._record(provider, model, "waits", 1)
+            self._record(provider, model, "wait_seconds", wait)
+            await asyncio.sleep(wait)
+
+        self._record(provider, model, "requests", 1)
+
+    def record_retry(self, provider: str, model: str = None, status_code: int = None):
+        """
+        Record a retry.
+
+        Args:
+            provider: The provider name.
+            model: The model name.
+            status_code: The status code that caused the retry.
+        """
+        self._record(provider, model, "retries", 1)
+        if status_code == 429:
+            self._record(provider, model, "throttled", 1)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get limiter counters.
+
+        Returns:
+            A dictionary mapping "provider:model" to request, wait and retry counters.
+        """
+        with self._lock:
+            return {scope: {key: round(value, 3) for key, value in counters.items()}
+                    for scope, counters in self.stats.items()}
+
+    def _scopes(self, provider: str, model: str = None) -> List[str]:
+        """Get the limit scopes that apply to a request."""
+        scopes = [provider]
+        if model:
+            scopes.append(f"{provider}:{model}")
+        return [scope for scope in scopes if scope in self.limits]
+
+    def _buckets(self, scope: str):
+        """Get or create the request and token buckets for a scope."""
+        with self._lock:
+            if scope not in self.buckets:
+                config = self.limits[scope]
+                rpm = config.get("requests_per_minute")
+                tpm = config.get("tokens_per_minute")
+                self.buckets[scope] = (TokenBucket(rpm) if rpm else None, TokenBucket(tpm) if tpm else None)
+            return self.buckets[scope]
+
+    def _record(self, provider: str, model: Optional[str], key: str, value: float):
+        """Add to a counter."""
+        scope = f"{provider}:{model}" if model else provider
+        with self._lock:
+            counters = self.stats.setdefault(scope, {
+                "requests": 0, "waits": 0, "wait_seconds": 0.0, "rejected": 0, "retries": 0, "throttled": 0
+            })
+            counters[key] += value
+
+class RetryPolicy:
+    """Exponential backoff with full jitter that honours Retry-After."""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 20.0,
+                 rate_limiter: ProviderRateLimiter = None):
+        """
+        Initialize the retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt.
+            base_delay: Backoff before the first retry, in seconds.
+            max_delay: Upper bound of a single backoff, in seconds.
+            rate_limiter: Optional limiter that retry counts are recorded on.
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limiter = rate_limiter
+
+    @staticmethod
+    def classify(error: Exception):
+        """
+        Decide whether an error is retryable.
+
+        Args:
+            error: The raised exception.
+
+        Returns:
+            A tuple of (retryable, status_code, retry_after_seconds).
+        """
+        if isinstance(error, RetryableError):
+            return True, error.status_code, error.retry_after
+
+        # google.api_core exceptions expose the HTTP status as ``code``
+        status_code = getattr(error, "code", None)
+        if isinstance(status_code, int) and status_code in RETRYABLE_STATUS_CODES:
+            response = getattr(error, "response", None)
+            headers = getattr(response, "headers", None) or {}
+            return True, status_code, parse_retry_after(headers.get("Retry-After"))
+
+        if isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+            return True, None, None
+
+        return False, None, None
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """
+        Compute the delay before a retry.
+
+        Args:
+            attempt: The retry number, starting at 1.
+            retry_after: Seconds requested by the provider, if any.
+
+        Returns:
+            The delay in seconds.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    async def call(self, operation: Callable[[], Any], provider: str, model: str = None) -> Any:
+        """
+        Run an operation, retrying retryable failures.
+
+        Args:
+            operation: A callable returning a result or an awaitable.
+            provider: The provider name, for logging and stats.
+            model: The model name, for logging and stats.
+
+        Returns:
+            The operation's result.
+        """
+        attempt = 0
+        while True:
+            try:
+                result = operation()
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            except Exception as e:
+                retryable, status_code, retry_after = self.classify(e)
+                attempt += 1
+                if not retryable or attempt > self.max_retries:
+                    raise
+
+                delay = self.backoff(attempt, retry_after)
+                logger.warning(f"{provider}/{model} request failed ({status_code or e}); "
+                               f"retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                if self.rate_limiter:
+                    self.rate_limiter.record_retry(provider, model, status_code)
+                await asyncio.sleep(delay)
@@ -0,0 +1,302 @@
+"""
+Exact-match response cache for model completions.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, AsyncGenerator
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+async def replay_response(text: str, model_used: str, chunk_size: int = 64) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Replay a stored answer in the same chunk format as a live stream.
+
+    Args:
+        text: The answer text.
+        model_used: The model that produced the answer.
+        chunk_size: Number of characters per content chunk.
+
+    Yields:
+        "content" chunks followed by a "complete" chunk.
+    """
+    for start in range(0, len(text), chunk_size):
+        await asyncio.sleep(0)  # Ensure this is truly asynchronous
+        yield {
+            "type": "content",
+            "text": text[start:start + chunk_size],
+            "model_used": model_used,
+            "cached": True
+        }
+
+    await asyncio.sleep(0)  # Ensure this is truly asynchronous
+    yield {
+        "type": "complete",
+        "text": text,
+        "model_used": model_used,
+        "cached": True
+    }
+
+class ResponseCache:
+    """Two-tier (in-memory LRU plus on-disk) cache of model responses."""
+
+    def __init__(self, cache_dir: str = None, max_entries: int = 512, ttl_seconds: int = 3600,
+                 history_tail: int = 6, replay_chunk_size: int = 64, max_disk_entries: int = 4096,
+                 sweep_interval: int = 256):
+        """
+        Initialize the response cache.
+
+        Args:
+            cache_dir: Directory for the on-disk tier. If None, only the memory tier is used.
+            max_entries: Maximum number of entries kept in the memory tier.
+            ttl_seconds: Default time-to-live of an entry.
+            history_tail: Number of trailing history messages that are part of the key.
+            replay_chunk_size: Number of characters per chunk when replaying a cached answer.
+            max_disk_entries: Maximum number of entries kept in the disk tier.
+            sweep_interval: Number of writes between sweeps of the disk tier, which may
+                exceed ``max_disk_entries`` by up to this many entries in between.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_tail = history_tail
+        self.replay_chunk_size = replay_chunk_size
+        self.max_disk_entries = max_disk_entries
+        self.sweep_interval = sweep_interval
+        self.memory = OrderedDict()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "disk_evictions": 0}
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._writes_since_sweep = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Entries left behind by earlier runs are only deleted when read otherwise
+            self.sweep()
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """
+        Normalize a prompt so trivial whitespace and case differences share an entry.
+
+        Args:
+            prompt: The prompt to normalize.
+
+        Returns:
+            The normalized prompt.
+        """
+        return re.sub(r'\s+', ' ', prompt).strip().casefold()
+
+    def make_key(self, model: str, prompt: str, history: List[Dict[str, str]] = None) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            model: The model name.
+            prompt: The prompt being sent.
+            history: The chat history preceding the prompt.
+
+        Returns:
+            A hex digest identifying the request.
+        """
+        tail = (history or [])[-self.history_tail:] if self.history_tail else []
+        tail_hash = hashlib.sha256(json.dumps(
+            [[msg.get("role"), msg.get("content")] for msg in tail]
+        ).encode('utf-8')).hexdigest()
+
+        key_material = json.dumps([model, self.normalize_prompt(prompt), tail_hash])
+        return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached entry with "text" and "model_used", or None on a miss.
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if entry["expires_at"] > now:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry
+                del self.memory[key]
+
+        entry = self._read_disk(key)
+        if entry is not None and entry["expires_at"] > now:
+            with self._lock:
+                self._remember(key, entry)
+                self.stats["disk_hits"] += 1
+            return entry
+
+        if entry is not None:
+            self._delete_disk(key)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, text: str, model_used: str, ttl_seconds: int = None):
+        """
+        Store a response.
+
+        Args:
+            key: The cache key.
+            text: The response text.
+            model_used: The model that produced the response.
+            ttl_seconds: Optional time-to-live overriding the default.
+        """
+        entry = {
+            "text": text,
+            "model_used": model_used,
+            "created_at": time.time(),
+            "expires_at": time.time() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        }
+
+        with self._lock:
+            self._remember(key, entry)
+            self.stats["writes"] += 1
+            self._writes_since_sweep += 1
+            sweep_due = self._writes_since_sweep >= self.sweep_interval
+
+        self._write_disk(key, entry)
+        if sweep_due:
+            self.sweep()
+
+    def sweep(self) -> int:
+        """
+        Delete expired entries from the disk tier and trim it to ``max_disk_entries``,
+        oldest first. Skipped if another thread is already sweeping.
+
+        Returns:
+            The number of entries deleted.
+        """
+        if not self.cache_dir or not self._sweep_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            with self._lock:
+                self._writes_since_sweep = 0
+
+            now = time.time()
+            live = []
+            removed = 0
+            for filename in os.listdir(self.cache_dir):
+                if not filename.endswith('.json'):
+                    continue
+                key = filename[:-len('.json')]
+                entry = self._read_disk(key)
+                if entry is None or entry.get("expires_at", 0) <= now:
+                    self._delete_disk(key)
+                    removed += 1
+                else:
+                    live.append((entry.get("created_at", 0), key))
+
+            # Evict the oldest live entries beyond the cap
+            live.sort()
+            for _, key in live[:max(len(live) - self.max_disk_entries, 0)]:
+                self._delete_disk(key)
+                removed += 1
+
+            with self._lock:
+                self.stats["disk_evictions"] += removed
+            if removed:
+                logger.info(f"Swept {removed} entries from the response cache directory")
+            return removed
+        finally:
+            self._sweep_lock.release()
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self.memory.clear()
+
+        if self.cache_dir:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith('.json'):
+                    self._delete_disk(filename[:-len('.json')])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit/miss counters.
+
+        Returns:
+            A dictionary of counters and the memory tier size.
+        """
+        with self._lock:
+            return dict(self.stats, memory_entries=len(self.memory))
+
+    async def replay(self, entry: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Replay a cached response in the same chunk format as a live stream.
+
+        Args:
+            entry: A cache entry returned by ``get``.
+
+        Yields:
+            "content" chunks followed by a "complete" chunk.
+        """
+        async for chunk in replay_response(entry["text"], entry["model_used"], self.replay_chunk_size):
+            yield chunk
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        """Insert an entry into the memory tier, evicting the least recently used. Caller holds the lock."""
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        """Get the on-disk path for a key."""
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read an entry from the disk tier."""
+        if not self.cache_dir:
+            return None
+
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading response cache entry: {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: Dict[str, Any]):
+        """Write an entry to the disk tier atomically."""
+        if not self.cache_dir:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing response cache entry: {e}")
+
+    def _delete_disk(self, key: str):
+        """Delete an entry from the disk tier."""
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
@@ -0,0 +1,179 @@
+"""
+Single-flight coalescing of identical in-flight model requests.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, List, Any, Callable, Awaitable, AsyncGenerator, AsyncIterator
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Marks the end of a flight in subscriber queues
+_DONE = object()
+
+class _Flight:
+    """One upstream stream shared by every subscriber with the same key."""
+
+    def __init__(self):
+        self.buffer = []
+        self.subscribers = []
+        self.done = False
+        self.lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Register a subscriber on the calling thread's event loop.
+
+        The subscriber first receives every chunk already produced, so late joiners
+        still see the full stream.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        with self.lock:
+            for item in self.buffer:
+                queue.put_nowait(item)
+            if self.done:
+                queue.put_nowait(_DONE)
+            else:
+                self.subscribers.append((loop, queue))
+
+        return queue
+
+    def publish(self, item: Any):
+        """Buffer an item and deliver it to every subscriber on its own event loop."""
+        with self.lock:
+            if item is _DONE:
+                self.done = True
+            else:
+                self.buffer.append(item)
+
+            live = []
+            for loop, queue in self.subscribers:
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                    live.append((loop, queue))
+                except RuntimeError:
+                    # The subscriber's event loop has been closed
+                    pass
+            self.subscribers = live
+
+class StreamCoalescer:
+    """Coalesce concurrent identical requests so they share one upstream call."""
+
+    def __init__(self):
+        """Initialize the coalescer."""
+        self.flights = {}
+        self.stats = {"leaders": 0, "followers": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, prompt: str, history: List[Dict[str, str]] = None) -> str:
+        """
+        Build a flight key.
+
+        Args:
+            model: The model name.
+            prompt: The prompt being sent.
+            history: The chat history sent with the prompt.
+
+        Returns:
+            A hex digest identifying the upstream request.
+        """
+        context_hash = hashlib.sha256(json.dumps(history or []).encode('utf-8')).hexdigest()
+        return hashlib.sha256(json.dumps([model, prompt, context_hash]).encode('utf-8')).hexdigest()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream chunks for a key, starting the upstream stream only if none is in flight.
+
+        Args:
+            key: The flight key.
+            factory: Creates the upstream async iterator. Only called by the leader.
+
+        Yields:
+            The upstream chunks, identical for every subscriber.
+        """
+        with self._lock:
+            flight = self.flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self.flights[key] = flight
+                self.stats["leaders"] += 1
+            else:
+                self.stats["followers"] += 1
+
+        if is_leader:
+            async for chunk in self._lead(key, flight, factory):
+                yield chunk
+            return
+
+        logger.info("Joining an identical in-flight model request")
+        queue = flight.subscribe()
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            yield item
+
+    async def call(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await a single result for a key, sharing one upstream call between concurrent callers.
+
+        Args:
+            key: The flight key.
+            factory: Creates the upstream awaitable. Only called by the leader.
+
+        Returns:
+            The upstream result.
+        """
+        async def single():
+            yield {"type": "result", "result": await factory()}
+
+        # Drain the stream fully so the leader's flight is closed before returning
+        last_chunk = None
+        async for chunk in self.stream(key, single):
+            last_chunk = chunk
+
+        if last_chunk and last_chunk.get("type") == "result":
+            return last_chunk["result"]
+        raise RuntimeError(last_chunk.get("text") if last_chunk else "Coalesced request produced no result")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            A dictionary with leader/follower counts and the number of flights in progress.
+        """
+        with self._lock:
+            return dict(self.stats, in_flight=len(self.flights))
+
+    async def _lead(self, key: str, flight: _Flight, factory) -> AsyncGenerator[Dict[str, Any], None]:
+        """Run the upstream stream, publishing every chunk to followers."""
+        finished = False
+        try:
+            async for chunk in factory():
+                flight.publish(chunk)
+                yield chunk
+            finished = True
+        except Exception as e:
+            finished = True
+            logger.error(f"Error in coalesced upstream request: {e}")
+            flight.publish({"type": "error", "text": f"I'm sorry, I encountered an error: {str(e)}"})
+            raise
+        finally:
+            if not finished:
+                # The leader's consumer went away before the upstream stream ended
+                flight.publish({"type": "error", "text": "The shared upstream request was cancelled."})
+
+            # Later identical requests start a new flight
+            with self._lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.publish(_DONE)
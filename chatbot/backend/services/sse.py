@@ -0,0 +1,117 @@
+"""
+Incremental Server-Sent Events parser for streaming provider APIs.
+"""
+import codecs
+import json
+import logging
+from typing import Dict, List, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class SSEParser:
+    """Parse an SSE byte stream that may be split at arbitrary points."""
+
+    def __init__(self):
+        """Initialize the parser."""
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ""
+        self._data_lines = []
+        self._event = None
+        self._id = None
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        Feed raw bytes into the parser.
+
+        Args:
+            chunk: The next bytes from the stream.
+
+        Returns:
+            The events completed by this chunk, each with "event", "data" and "id".
+        """
+        self._buffer += self._decoder.decode(chunk)
+        return self._drain()
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Flush the parser at the end of the stream.
+
+        Returns:
+            Any event that was terminated by the end of the stream rather than a blank line.
+        """
+        self._buffer += self._decoder.decode(b"", final=True)
+        if self._buffer and not self._buffer.endswith(("\n", "\r")):
+            self._buffer += "\n"
+        events = self._drain()
+        if self._data_lines:
+            events.append(self._dispatch())
+        return events
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        """Process every complete line in the buffer."""
+        events = []
+
+        while True:
+            # Lines end with \n, \r\n or \r; a trailing \r may be the first half of \r\n
+            index = min((i for i in (self._buffer.find("\n"), self._buffer.find("\r")) if i != -1), default=-1)
+            if index == -1 or (self._buffer[index] == "\r" and index == len(self._buffer) - 1):
+                break
+
+            line = self._buffer[:index]
+            skip = 2 if self._buffer.startswith("\r\n", index) else 1
+            self._buffer = self._buffer[index + skip:]
+
+            if line == "":
+                if self._data_lines:
+                    events.append(self._dispatch())
+                else:
+                    self._event = None
+                continue
+
+            if line.startswith(":"):
+                continue
+
+            field, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+
+            if field == "data":
+                self._data_lines.append(value)
+            elif field == "event":
+                self._event = value
+            elif field == "id":
+                self._id = value
+
+        return events
+
+    def _dispatch(self) -> Dict[str, Any]:
+        """Build the pending event and reset per-event state."""
+        event = {"event": self._event or "message", "data": "\n".join(self._data_lines), "id": self._id}
+        self._data_lines = []
+        self._event = None
+        return event
+
+def parse_completion_delta(data: str) -> Optional[str]:
+    """
+    Extract the text delta from an OpenAI-compatible streaming chunk.
+
+    Args:
+        data: The event's data field.
+
+    Returns:
+        The content delta, or None if the chunk carries no text.
+    """
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        logger.warning(f"Ignoring malformed stream chunk: {data[:200]}")
+        return None
+
+    choices = payload.get("choices") or []
+    if not choices:
+        return None
+
+    delta = choices[0].get("delta") or {}
+    return delta.get("content") or None
@@ -0,0 +1,137 @@
+"""
+BM25 relevance index over the MCP tool catalog.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+from .question_cache import STOPWORDS
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms.
+
+    Underscores separate words, stopwords are dropped and a trailing plural "s"
+    is removed so "emails" matches "email".
+
+    Args:
+        text: The text to tokenize.
+
+    Returns:
+        The terms, in order.
+    """
+    terms = []
+    for token in re.findall(r'[a-z0-9]+', (text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+class ToolIndex:
+    """Okapi BM25 index of tools by name, description and parameter names."""
+
+    def __init__(self, tools: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75,
+                 name_weight: int = 3, parameter_weight: int = 1):
+        """
+        Build the index.
+
+        Args:
+            tools: Tool dictionaries with "name", "description" and "parameters".
+            k1: BM25 term-frequency saturation.
+            b: BM25 document-length normalization.
+            name_weight: How many times name terms are counted; names are the strongest signal.
+            parameter_weight: How many times parameter-name terms are counted.
+        """
+        self.tools = list(tools)
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.doc_lengths = []
+        self.stats = {"queries": 0, "empty_queries": 0, "selected": 0, "hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+        for doc_id, tool in enumerate(self.tools):
+            terms = (tokenize(tool.get("name", "")) * name_weight
+                     + tokenize(tool.get("description", ""))
+                     + tokenize(" ".join(tool.get("parameters") or [])) * parameter_weight)
+            self.doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings.setdefault(term, []).append((doc_id, frequency))
+
+        self.average_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        self.idf = {
+            term: math.log(1 + (len(self.tools) - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+        logger.info(f"Built tool index with {len(self.tools)} tools and {len(self.postings)} terms")
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Find the tools most relevant to a query.
+
+        Args:
+            query: The message, optionally with recent conversation text.
+            k: Maximum number of tools to return.
+
+        Returns:
+            (tool, score) pairs, best first. Only tools sharing a term with the query are returned.
+        """
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.average_length or 1)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+        with self._lock:
+            self.stats["queries"] += 1
+            self.stats["selected"] += len(ranked)
+            if not ranked:
+                self.stats["empty_queries"] += 1
+
+        return [(self.tools[doc_id], score) for doc_id, score in ranked]
+
+    def record_usage(self, tool_name: str, selected: List[str]):
+        """
+        Record whether a tool the model used had been offered in the prompt.
+
+        Args:
+            tool_name: The tool the model called.
+            selected: The tool names included in that request's prompt.
+        """
+        with self._lock:
+            if tool_name in selected:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                logger.info(f"Tool index miss: {tool_name} was called but not in the top {len(selected)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            A dictionary with the catalog size, query counts and the hit rate of used tools.
+        """
+        with self._lock:
+            stats = dict(self.stats)
+
+        used = stats["hits"] + stats["misses"]
+        stats["tools"] = len(self.tools)
+        stats["hit_rate"] = round(stats["hits"] / used, 3) if used else None
+        stats["average_selected"] = round(stats["selected"] / stats["queries"], 2) if stats["queries"] else None
+        return stats
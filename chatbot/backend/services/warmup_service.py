@@ -0,0 +1,111 @@
+"""
+Background warm-up of model providers at startup.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class WarmupService:
+    """Pre-creates models and opens provider connections in a background thread."""
+
+    def __init__(self, gemini_service, nvidia_service, probe: bool = False, providers: Dict[str, Any] = None):
+        """
+        Initialize the warm-up service.
+
+        Args:
+            gemini_service: The Gemini service whose models are pre-created.
+            nvidia_service: The NVIDIA service whose connection pool is opened.
+            probe: Whether to send a tiny probe request to each Gemini model. Without it, the
+                Gemini connection is opened with an unbilled token count instead.
+            providers: Further provider services, by name, whose connection pools are opened.
+        """
+        self.gemini_service = gemini_service
+        self.nvidia_service = nvidia_service
+        self.providers = providers or {}
+        self.probe = probe
+        self.state = {
+            "status": "pending",
+            "started_at": None,
+            "finished_at": None,
+            "steps": {}
+        }
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start warming up in a daemon thread. Calling it again is a no-op."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="provider-warmup", daemon=True)
+
+        self._thread.start()
+
+    def run(self):
+        """Run every warm-up step, recording the outcome of each."""
+        steps = [(f"gemini:{name}", lambda name=name: self.gemini_service.warm_up_model(name, self.probe))
+                 for name in self.gemini_service.MODELS]
+        if not self.probe:
+            # Probes open the connection themselves
+            steps.append(("gemini:connection", self.gemini_service.warm_up))
+        steps.append(("nvidia:connection", self.nvidia_service.warm_up))
+        steps.extend((f"{name}:connection", service.warm_up) for name, service in self.providers.items())
+
+        with self._lock:
+            self.state["status"] = "running"
+            self.state["started_at"] = time.time()
+            self.state["steps"] = {name: {"status": "pending"} for name, _ in steps}
+
+        logger.info(f"Warming up {len(steps)} provider targets")
+
+        for name, step in steps:
+            try:
+                result = step()
+            except Exception as e:
+                logger.error(f"Error during warm-up step {name}: {e}")
+                result = {"status": "failed", "error": str(e)}
+
+            with self._lock:
+                self.state["steps"][name] = result
+
+        with self._lock:
+            failed = [name for name, result in self.state["steps"].items() if result.get("status") == "failed"]
+            self.state["status"] = "degraded" if failed else "complete"
+            self.state["finished_at"] = time.time()
+
+        logger.info(f"Warm-up finished: {self.state['status']}")
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the warm-up to finish.
+
+        Args:
+            timeout: Maximum seconds to wait.
+
+        Returns:
+            True if the warm-up has finished.
+        """
+        if self._thread is None:
+            return False
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get the warm-up state.
+
+        Returns:
+            A dictionary with the overall status, timings and per-step results.
+        """
+        with self._lock:
+            return {
+                "status": self.state["status"],
+                "started_at": self.state["started_at"],
+                "finished_at": self.state["finished_at"],
+                "steps": {name: dict(result) for name, result in self.state["steps"].items()}
+            }
@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+
+class TestBackgroundLoop(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.background = BackgroundLoop(name="test-loop")
+
+    def tearDown(self):
+        self.background.stop()
+
+    async def test_run_on_background_loop(self):
+        """Coroutines run on the background loop and their results are returned to the caller."""
+        async def where():
+            return asyncio.get_running_loop()
+
+        self.assertIs(await self.background.run(where()), self.background.loop)
+
+        async def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.background.run(fail())
+
+    async def test_state_survives_caller_loops(self):
+        """Objects created on the background loop stay usable from successive per-request loops."""
+        lock = await self.background.run(self._make_lock())
+
+        def request():
+            loop = asyncio.new_event_loop()
+            try:
+                return loop.run_until_complete(self.background.run(self._use_lock(lock)))
+            finally:
+                loop.close()
+
+        results = [await asyncio.get_running_loop().run_in_executor(None, request) for _ in range(2)]
+        self.assertEqual(results, ["ok", "ok"])
+
+    async def test_stream_bridges_items_and_errors(self):
+        """Async generators are iterated on the background loop; errors reach the consumer."""
+        async def numbers(fail):
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield i
+            if fail:
+                raise RuntimeError("stream broke")
+
+        self.assertEqual([i async for i in self.background.stream(numbers(False))], [0, 1, 2])
+
+        received = []
+        with self.assertRaises(RuntimeError):
+            async for i in self.background.stream(numbers(True)):
+                received.append(i)
+        self.assertEqual(received, [0, 1, 2])
+
+    def test_iterate_from_sync_code(self):
+        """Synchronous callers can drive an async generator on the background loop."""
+        async def letters():
+            for letter in "abc":
+                yield letter
+
+        self.assertEqual(list(self.background.iterate(letters())), ["a", "b", "c"])
+
+    @staticmethod
+    async def _make_lock():
+        return asyncio.Lock()
+
+    @staticmethod
+    async def _use_lock(lock):
+        async with lock:
+            return "ok"
+
+if __name__ == '__main__':
+    unittest.main()
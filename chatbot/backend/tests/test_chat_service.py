@@ -0,0 +1,179 @@
+import asyncio
+import tempfile
+import time
+import unittest
+
+from chatbot.backend.services.chat_service import ChatService
+from chatbot.backend.services.provider_registry import ProviderRegistry
+
+class FakeMCPService:
+    """Stands in for MCPService; records the deadline of each call and whether it was cancelled."""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.calls = []
+        self.cancelled = []
+
+    async def call_tool(self, tool_name, params, progress_handler=None, deadline=None):
+        self.calls.append((tool_name, params, deadline))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_name)
+            raise
+        return {"tool": tool_name}
+
+class FakeGeminiService:
+    """Stands in for GeminiService; makes one native function call per response."""
+
+    async def stream_response(self, message, history=None, model_name=None, tool_executor=None):
+        result = await tool_executor("gmail_find_email", {"query": message})
+        yield {"type": "content", "text": str(result), "model_used": model_name}
+        yield {"type": "complete", "text": str(result), "model_used": model_name, "tool_calls": [result]}
+
+class FakeStreamingGeminiService:
+    """Stands in for GeminiService without function calling; streams a scripted answer."""
+
+    function_calling_enabled = False
+
+    def __init__(self, chunks, delay=0):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def stream_response(self, message, history=None, model_name=None, tool_executor=None):
+        for text in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield {"type": "content", "text": text, "model_used": model_name}
+        yield {"type": "complete", "text": "".join(self.chunks), "model_used": model_name}
+
+class FakeProviderService:
+    """Stands in for a non-Gemini provider; answers with its name and records the upstream model."""
+
+    def __init__(self, name):
+        self.name = name
+        self.models = []
+
+    async def generate_response(self, message, history=None, model_name=None):
+        self.models.append(model_name)
+        return f"{self.name} answer"
+
+class FakeAnsweringGeminiService:
+    """Stands in for GeminiService; answers every non-streaming request."""
+
+    async def generate_response(self, message, history=None, model_name=None, tool_calls=None):
+        return "gemini answer", model_name
+
+class TestChatServiceDeadlines(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.mcp = FakeMCPService()
+        self.chat = ChatService(FakeGeminiService(), None, self.mcp)
+
+    async def test_native_function_calls_get_the_request_deadline(self):
+        """Tool calls Gemini makes itself are bound to the request's deadline."""
+        deadline = time.monotonic() + 30
+        chunks = [chunk async for chunk in self.chat._stream_gemini("invoices", [], "gemini-2.5-flash",
+                                                                    deadline=deadline)]
+
+        self.assertEqual(chunks[-1]["type"], "complete")
+        self.assertEqual(self.mcp.calls, [("gmail_find_email", {"query": "invoices"}, deadline)])
+
+class TestProviderResponses(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.history_dir = tempfile.TemporaryDirectory()
+        self.nvidia = FakeProviderService("nvidia")
+        self.local = FakeProviderService("local")
+
+    def tearDown(self):
+        self.history_dir.cleanup()
+
+    def make_chat(self, provider_registry=None):
+        chat = ChatService(FakeAnsweringGeminiService(), self.nvidia, None, provider_registry=provider_registry)
+        chat.chat_history_dir = self.history_dir.name
+        return chat
+
+    async def test_nvidia_answers_non_streaming_requests(self):
+        """A non-streaming request for nvidia is answered by nvidia, not the Gemini fallback."""
+        response = await self.make_chat().get_chat_response("hello", "provider-test", "nvidia")
+        self.assertEqual(response, ("nvidia answer", "nvidia"))
+
+    async def test_registry_providers_get_their_upstream_model(self):
+        """Mapped models reach their provider with the upstream model of the mapping."""
+        registry = ProviderRegistry("gemini", model_map={"fast": "local:llama-3.1-8b-instruct"})
+        registry.register("gemini", object())
+        registry.register("local", self.local)
+
+        response = await self.make_chat(registry).get_chat_response("hello", "provider-test", "fast")
+        self.assertEqual(response, ("local answer", "local"))
+        self.assertEqual(self.local.models, ["llama-3.1-8b-instruct"])
+
+class TestSpeculativeToolCalls(unittest.IsolatedAsyncioTestCase):
+
+    message = "search for emails about invoices"
+
+    def make_chat(self, tool_delay, chunk_delay, chunks=("Here ", "are ", "your emails.")):
+        self.mcp = FakeMCPService(delay=tool_delay)
+        self.chat = ChatService(FakeStreamingGeminiService(list(chunks), delay=chunk_delay), None, self.mcp,
+                                speculative_tool_calls=True)
+        return self.chat
+
+    async def collect(self, deadline=None):
+        return [chunk async for chunk in self.chat.stream_chat_response(self.message, "speculation-test",
+                                                                         "gemini-2.5-flash", deadline=deadline)]
+
+    @staticmethod
+    def index(chunks, chunk_type):
+        return next(i for i, chunk in enumerate(chunks) if chunk["type"] == chunk_type)
+
+    async def test_early_result_is_yielded_between_model_chunks(self):
+        """A result ready before the model finishes is streamed as soon as it lands."""
+        self.make_chat(tool_delay=0, chunk_delay=0.05)
+        chunks = await self.collect()
+
+        result_at = self.index(chunks, "mcp_result")
+        contents = [i for i, chunk in enumerate(chunks) if chunk["type"] == "content" and chunk["model_used"] != "mcp"]
+        self.assertLess(result_at, contents[-1])
+        self.assertEqual(chunks[result_at]["result"], {"tool": "gmail_find_email"})
+        self.assertEqual(self.mcp.calls[0][:2], ("gmail_find_email", {"query": "invoices"}))
+        self.assertIn("gmail find_email tool", chunks[-1]["text"])
+        self.assertEqual(self.chat.speculation_stats["folded_early"], 1)
+
+    async def test_complete_is_held_until_the_tool_finishes(self):
+        """The complete chunk waits for a slow result and carries its text."""
+        self.make_chat(tool_delay=0.2, chunk_delay=0)
+        chunks = await self.collect()
+
+        self.assertEqual(chunks[-1]["type"], "complete")
+        self.assertLess(self.index(chunks, "mcp_result"), len(chunks) - 1)
+        self.assertTrue(chunks[-1]["text"].startswith("Here are your emails."))
+        self.assertIn("gmail find_email tool", chunks[-1]["text"])
+        self.assertEqual(self.chat.speculation_stats["folded_late"], 1)
+
+    async def test_request_deadline_bounds_the_wait(self):
+        """A tool still running at the deadline is cancelled instead of holding the answer."""
+        self.make_chat(tool_delay=30, chunk_delay=0)
+        started = time.monotonic()
+        chunks = await self.collect(deadline=time.monotonic() + 0.1)
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(chunks[-1]["type"], "complete")
+        self.assertIn("did not finish in time", chunks[-1]["text"])
+        self.assertEqual(self.mcp.cancelled, ["gmail_find_email"])
+        self.assertEqual(self.chat.speculation_stats["timed_out"], 1)
+
+    async def test_disconnect_cancels_the_tool_call(self):
+        """Closing the stream mid-answer cancels the speculative call."""
+        self.make_chat(tool_delay=30, chunk_delay=0.05)
+        stream = self.chat.stream_chat_response(self.message, "speculation-test", "gemini-2.5-flash")
+        async for chunk in stream:
+            if chunk["type"] == "content":
+                break
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.mcp.cancelled, ["gmail_find_email"])
+        self.assertEqual(self.chat.speculation_stats["cancelled"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
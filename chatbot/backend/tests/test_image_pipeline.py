@@ -0,0 +1,77 @@
+import base64
+import io
+import os
+import tempfile
+import unittest
+
+from chatbot.backend.utils import image_pipeline
+from chatbot.backend.utils.image_pipeline import ImagePipeline, ImageProcessingError, base64_length, encode_base64
+
+class TestImagePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pipeline = ImagePipeline(os.path.join(self.temp_dir.name, "cache"), max_base64_bytes=20_000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_streamed_encoding_matches_base64(self):
+        """Chunked encoding produces the same text as encoding everything at once."""
+        data = os.urandom(10_000)
+        self.assertEqual(encode_base64(io.BytesIO(data), chunk_size=3 * 7), base64.b64encode(data).decode("ascii"))
+        self.assertEqual(base64_length(len(data)), len(base64.b64encode(data)))
+        with self.assertRaises(ValueError):
+            encode_base64(io.BytesIO(data), chunk_size=4)
+
+    def test_small_images_pass_through(self):
+        """Images already under the limit are sent unchanged with their own MIME type."""
+        path = self.write("small.png", b"\x89PNG fake image data")
+        uri = self.pipeline.to_data_uri(path)
+        self.assertEqual(uri, "data:image/png;base64," + base64.b64encode(b"\x89PNG fake image data").decode("ascii"))
+        self.assertEqual(self.pipeline.get_stats()["passthrough"], 1)
+
+    @unittest.skipIf(image_pipeline.Image is None, "Pillow is not installed")
+    def test_large_images_are_downsampled_and_cached(self):
+        """Large images are re-encoded to fit the limit, then served from the cache."""
+        image = image_pipeline.Image.frombytes("RGB", (1200, 1200), os.urandom(1200 * 1200 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        path = self.write("large.png", buffer.getvalue())
+
+        uri = self.pipeline.to_data_uri(path)
+        self.assertTrue(uri.startswith("data:image/jpeg;base64,"))
+        self.assertLessEqual(len(uri.split(",", 1)[1]), 20_000)
+
+        self.assertEqual(self.pipeline.to_data_uri(path), uri)
+        self.assertEqual(self.pipeline.get_stats()["processed"], 1)
+        self.assertEqual(self.pipeline.get_stats()["cache_hits"], 1)
+
+    @unittest.skipIf(image_pipeline.Image is None, "Pillow is not installed")
+    def test_images_under_the_minimum_dimension_are_reencoded(self):
+        """Images smaller than min_dimension but over the limit are still re-encoded at their own size."""
+        pipeline = ImagePipeline(os.path.join(self.temp_dir.name, "cache"), max_base64_bytes=80_000)
+        image = image_pipeline.Image.frombytes("RGB", (250, 250), os.urandom(250 * 250 * 3))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        path = self.write("noisy.png", buffer.getvalue())
+
+        uri = pipeline.to_data_uri(path)
+        self.assertTrue(uri.startswith("data:image/jpeg;base64,"))
+        self.assertLessEqual(len(uri.split(",", 1)[1]), 80_000)
+
+    @unittest.skipIf(image_pipeline.Image is None, "Pillow is not installed")
+    def test_undecodable_images_are_rejected(self):
+        """Files that are not images raise a processing error instead of being sent."""
+        path = self.write("broken.jpg", b"not an image" * 5_000)
+        with self.assertRaises(ImageProcessingError):
+            self.pipeline.to_data_uri(path)
+
+if __name__ == '__main__':
+    unittest.main()
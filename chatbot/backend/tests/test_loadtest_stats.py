@@ -0,0 +1,30 @@
+import unittest
+
+from chatbot.backend.loadtest.stats import percentile, summarize
+
+class TestLoadTestStats(unittest.TestCase):
+
+    def test_percentiles_use_nearest_rank(self):
+        """p50 and p99 of 1..100 are the 50th and 99th samples."""
+        samples = list(range(100, 0, -1))
+        self.assertEqual(percentile(samples, 0.50), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile(samples, 1.0), 100)
+        self.assertEqual(percentile([], 0.99), 0.0)
+
+    def test_summary_reports_throughput_and_errors(self):
+        """Throughput is calls per second and the error rate counts failed calls."""
+        summary = summarize([10.0, 20.0, 30.0, 40.0], errors=1, duration_seconds=2.0)
+        self.assertEqual(summary["calls"], 4)
+        self.assertEqual(summary["throughput_per_second"], 2.0)
+        self.assertEqual(summary["error_rate"], 0.25)
+        self.assertEqual(summary["mean_ms"], 25.0)
+        self.assertEqual((summary["p50_ms"], summary["p99_ms"], summary["max_ms"]), (20.0, 40.0, 40.0))
+
+    def test_empty_run(self):
+        """A run without calls reports zeros instead of failing."""
+        summary = summarize([], errors=0, duration_seconds=0.0)
+        self.assertEqual((summary["calls"], summary["throughput_per_second"], summary["p99_ms"]), (0, 0.0, 0.0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+from chatbot.backend.services.mcp.catalog import CatalogSnapshot, diff_catalogs
+from chatbot.backend.services.mcp.functions import FunctionCatalog
+from chatbot.backend.services.mcp.tools import MCPToolsService
+
+def make_tool(name, description="", schema=None):
+    return SimpleNamespace(name=name, description=description, inputSchema=schema)
+
+class TestCatalogSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "catalog", "mcp_catalog.json")
+        self.snapshot = CatalogSnapshot(self.path, server_url="https://mcp.example/mcp")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Saved catalogs load back with the same fingerprint."""
+        tools = [make_tool("gmail_find_email", "Find emails", {"properties": {"query": {"type": "string"}}})]
+        version = FunctionCatalog.fingerprint(tools)
+        self.snapshot.save(tools, version)
+
+        loaded, meta = self.snapshot.load()
+        self.assertEqual(meta["version"], version)
+        self.assertEqual(FunctionCatalog.fingerprint(loaded), version)
+        self.assertIsNotNone(meta["fetched_at"])
+
+    def test_federated_tools_keep_their_server(self):
+        """Tools of a merged catalog load back with the server they are routed to."""
+        tool = make_tool("internal__slack_send_message")
+        tool.server, tool.server_tool_name = "internal", "slack_send_message"
+        self.snapshot.save([tool, make_tool("gmail_find_email")], "v1")
+
+        loaded, _ = self.snapshot.load()
+        self.assertEqual((loaded[0].server, loaded[0].server_tool_name), ("internal", "slack_send_message"))
+        self.assertFalse(hasattr(loaded[1], "server"))
+
+    def test_missing_or_foreign_snapshots_are_ignored(self):
+        """No file, a corrupt file or another server's catalog yields None."""
+        self.assertIsNone(self.snapshot.load())
+
+        self.snapshot.save([make_tool("a_get_x")], "v1")
+        self.assertIsNone(CatalogSnapshot(self.path, server_url="https://other/mcp").load())
+
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertIsNone(self.snapshot.load())
+
+    def test_other_formats_are_ignored(self):
+        """Snapshots written in another layout version are not trusted."""
+        self.snapshot.save([make_tool("a_get_x")], "v1")
+        with open(self.path) as f:
+            data = json.load(f)
+        data["format"] = 0
+        with open(self.path, "w") as f:
+            json.dump(data, f)
+        self.assertIsNone(self.snapshot.load())
+
+class TestDiffCatalogs(unittest.TestCase):
+
+    def test_diff(self):
+        """Added, removed and changed tools are reported by name."""
+        old = [make_tool("a_get_x", "x"), make_tool("b_list_y", "y")]
+        new = [make_tool("a_get_x", "x v2"), make_tool("c_find_z", "z")]
+        self.assertEqual(diff_catalogs(old, new), {"added": ["c_find_z"], "removed": ["b_list_y"], "changed": ["a_get_x"]})
+
+class FakeCatalogClient:
+    """Stands in for MCPClient; serves a catalog that can be swapped or made to fail."""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self.failing = False
+
+    async def list_tools(self):
+        if self.failing:
+            raise ConnectionError("server unreachable")
+        return self.tools
+
+class TestCatalogRefresh(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.background = BackgroundLoop(name="test-catalog")
+        self.client = FakeCatalogClient([make_tool("gmail_find_email", "Find emails")])
+        self.snapshot = CatalogSnapshot(os.path.join(self.temp_dir.name, "catalog.json"))
+        self.tools_service = MCPToolsService(self.client, snapshot=self.snapshot)
+        self.diffs = []
+        self.tools_service.on_change(lambda service, diff: self.diffs.append(diff))
+
+    def tearDown(self):
+        if self.tools_service.refresh_task:
+            self.tools_service.refresh_task.cancel()
+            # Let the cancellation reach the task before the loop closes
+            self.background.submit(asyncio.sleep(0.01)).result()
+        self.background.stop()
+        self.temp_dir.cleanup()
+
+    async def _wait_for(self, condition):
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("condition not reached")
+
+    async def test_refresh_hot_swaps_changed_catalogs(self):
+        """Each refresh past the TTL swaps in a changed catalog, notifies listeners and saves it."""
+        self.tools_service.start_refresh(self.background, ttl_seconds=0.05)
+        await self._wait_for(lambda: self.tools_service.version is not None)
+        self.assertEqual(self.diffs[0]["added"], ["gmail_find_email"])
+
+        self.client.tools = self.client.tools + [make_tool("zoom_create_meeting", "Create a meeting")]
+        await self._wait_for(lambda: len(self.diffs) > 1)
+
+        self.assertEqual(self.diffs[1], {"added": ["zoom_create_meeting"], "removed": [], "changed": []})
+        self.assertIsNotNone(self.tools_service.index.get("zoom_create_meeting"))
+        self.assertEqual(self.snapshot.load()[1]["version"], self.tools_service.version)
+
+    async def test_failed_refresh_keeps_the_catalog_and_its_age(self):
+        """A failed refresh keeps serving the old catalog and does not reset its age."""
+        await self.tools_service.fetch_tools()
+        fetched_at = self.tools_service.fetched_at - 60
+        self.tools_service.fetched_at = fetched_at
+        self.client.failing = True
+
+        self.tools_service.start_refresh(self.background, ttl_seconds=30)
+        await self._wait_for(lambda: self.tools_service.retry_at is not None)
+
+        state = self.tools_service.get_catalog_state()
+        self.assertEqual(self.tools_service.fetched_at, fetched_at)
+        self.assertGreaterEqual(state["age_seconds"], 60)
+        self.assertGreater(state["retry_in_seconds"], 25)
+        self.assertEqual(state["tools"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
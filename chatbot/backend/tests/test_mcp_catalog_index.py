@@ -0,0 +1,59 @@
+import unittest
+from types import SimpleNamespace
+
+from chatbot.backend.services.mcp.catalog_index import CatalogIndex
+
+def make_tool(name, properties=None, required=None, **schema):
+    return SimpleNamespace(name=name, description=f"{name} tool",
+                           inputSchema=dict(schema, properties=properties or {}, required=required or []))
+
+class TestCatalogIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CatalogIndex([
+            make_tool("gmail_send_email", {"to": {"type": "string"}, "subject": {"type": "string"},
+                                           "instructions": {"type": "string"}},
+                      required=["to", "instructions"]),
+            make_tool("google_drive_find_a_file", {"title": {"type": "string"},
+                                                   "limit": {"type": "integer"},
+                                                   "order": {"type": "string", "enum": ["asc", "desc"]}},
+                      required=["title"], additionalProperties=False),
+            make_tool("google_calendar_list_events", {"max_results": {"anyOf": [{"type": "integer"}, {"type": "null"}]}})
+        ])
+
+    def test_services_keep_multi_word_prefixes(self):
+        """Tools are grouped by the service before their verb, not by the first underscore."""
+        self.assertEqual(sorted(self.index.services), ["gmail", "google_calendar", "google_drive"])
+        self.assertEqual(self.index.services["google_drive"][0]["parameters"], ["title", "limit", "order"])
+
+    def test_modifier_words_stay_in_their_service(self):
+        """A word between the service and the verb does not split the tool into its own service."""
+        index = CatalogIndex([make_tool("google_calendar_find_event"), make_tool("google_calendar_quick_add_event")])
+        self.assertEqual(list(index.services), ["google_calendar"])
+        self.assertEqual(index.service_of("google_calendar_quick_add_event"), "google_calendar")
+
+    def test_valid_calls_pass(self):
+        """Generated instructions, stringified scalars and nulls of nullable parameters are accepted."""
+        self.assertEqual(self.index.validate("gmail_send_email", {"to": "a@example.com"}), [])
+        self.assertEqual(self.index.validate("google_drive_find_a_file", {"title": "notes", "limit": "5"}), [])
+        self.assertEqual(self.index.validate("google_calendar_list_events", {"max_results": None}), [])
+
+    def test_invalid_calls_are_rejected(self):
+        """Missing required parameters, wrong types, enums and unknown names of closed schemas are reported."""
+        self.assertEqual(self.index.validate("gmail_send_email", {"subject": "hi"}),
+                         ["missing required parameter 'to'"])
+        errors = self.index.validate("google_drive_find_a_file",
+                                     {"title": "notes", "limit": "five", "order": "up", "owner": "me"})
+        self.assertEqual(errors, ["parameter 'limit' must be of type integer",
+                                  "parameter 'order' must be one of asc, desc",
+                                  "unknown parameter 'owner'"])
+        self.assertEqual(self.index.validate("google_calendar_list_events", {"max_results": True}),
+                         ["parameter 'max_results' must be of type integer or null"])
+
+    def test_unknown_tools_are_left_to_the_server(self):
+        """Tools missing from a possibly stale catalog are not rejected locally."""
+        self.assertIsNone(self.index.get("zoom_create_meeting"))
+        self.assertEqual(self.index.validate("zoom_create_meeting", {}), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+from chatbot.backend.services.mcp.federation import FederatedMCPClient
+
+def make_tool(name, description=""):
+    return SimpleNamespace(name=name, description=description, inputSchema={"properties": {}})
+
+class FakeServerClient:
+    """Stands in for an MCPClient of one server."""
+
+    def __init__(self, url, tools, delay=0.0, fail=False):
+        self.server_url = url
+        self.tools = tools
+        self.delay = delay
+        self.fail = fail
+        self.connected = False
+        self.calls = []
+
+    async def connect(self):
+        await asyncio.sleep(self.delay)
+        self.connected = not self.fail
+        return self.connected
+
+    async def disconnect(self):
+        self.connected = False
+        return True
+
+    def is_connected(self):
+        return self.connected
+
+    def get_state(self):
+        return {"state": "connected" if self.connected else "disconnected", "connected": self.connected,
+                "calls": len(self.calls), "call_failures": 0, "reconnects": 0}
+
+    async def list_tools(self):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("server unreachable")
+        return self.tools
+
+    async def call_tool(self, tool_name, params, progress_handler=None):
+        self.calls.append(tool_name)
+        return {"server": self.server_url, "tool": tool_name}
+
+class TestFederatedMCPClient(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.background = BackgroundLoop(name="test-federation")
+        self.zapier = FakeServerClient("https://zapier/mcp", [make_tool("gmail_find_email"), make_tool("slack_send_message")])
+        self.internal = FakeServerClient("http://internal/mcp", [make_tool("slack_send_message"), make_tool("wiki_find_page")])
+
+    def tearDown(self):
+        self.background.stop()
+
+    def _client(self, **clients):
+        return FederatedMCPClient(clients, self.background, catalog_timeout=0.1)
+
+    async def test_catalogs_are_merged_and_collisions_renamed(self):
+        """The first server keeps a colliding name; later servers' tools get a prefix."""
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        tools = await client.list_tools()
+
+        self.assertEqual([tool.name for tool in tools],
+                         ["gmail_find_email", "slack_send_message", "internal__slack_send_message", "wiki_find_page"])
+        self.assertEqual(client.collisions[0]["renamed_to"], "internal__slack_send_message")
+        self.assertEqual(tools[2].server_tool_name, "slack_send_message")
+
+    async def test_calls_are_routed_to_the_owning_server(self):
+        """Each tool is called on its server under the server's own name."""
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        await client.list_tools()
+
+        self.assertEqual((await client.call_tool("wiki_find_page", {}))["server"], "http://internal/mcp")
+        self.assertEqual((await client.call_tool("slack_send_message", {}))["server"], "https://zapier/mcp")
+        await client.call_tool("internal__slack_send_message", {})
+        self.assertEqual(self.internal.calls, ["wiki_find_page", "slack_send_message"])
+
+    async def test_slow_server_does_not_block_the_catalog(self):
+        """A slow server's tools are merged in through the callback once they arrive."""
+        self.internal.delay = 0.3
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        late = []
+        client.on_catalog_change = late.append
+
+        started = asyncio.get_running_loop().time()
+        self.assertTrue(await client.connect())
+        tools = await client.list_tools()
+        self.assertLess(asyncio.get_running_loop().time() - started, 0.3)
+        self.assertEqual([tool.name for tool in tools], ["gmail_find_email", "slack_send_message"])
+        self.assertEqual(client.get_state()["state"], "degraded")
+
+        for _ in range(50):
+            await asyncio.sleep(0.02)
+            if late:
+                break
+        self.assertIn("wiki_find_page", [tool.name for tool in late[0]])
+        self.assertEqual(client.route("wiki_find_page"), ("internal", "wiki_find_page"))
+
+    async def test_late_catalog_is_published_once(self):
+        """Refreshing while a slow fetch is pending does not publish its catalog again."""
+        self.internal.delay = 0.3
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        late = []
+        client.on_catalog_change = late.append
+
+        await client.list_tools()
+        await client.list_tools()
+        await asyncio.sleep(0.4)
+
+        self.assertEqual(len(late), 1)
+        self.assertIn("wiki_find_page", [tool.name for tool in late[0]])
+
+    async def test_failed_server_keeps_the_others(self):
+        """A failing server is reported; only when every server fails does the fetch raise."""
+        self.internal.fail = True
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        tools = await client.list_tools()
+
+        self.assertEqual(len(tools), 2)
+        self.assertEqual(client.get_state()["servers"]["internal"]["catalog_error"], "server unreachable")
+
+        self.zapier.fail = True
+        with self.assertRaises(ConnectionError):
+            await self._client(zapier=self.zapier, internal=self.internal).list_tools()
+
+    async def test_snapshot_routes_are_restored(self):
+        """Routes of a snapshot catalog apply before any server answers."""
+        client = self._client(zapier=self.zapier, internal=self.internal)
+        client.restore_routes([SimpleNamespace(name="internal__slack_send_message", description="",
+                                               server="internal", server_tool_name="slack_send_message")])
+
+        await client.call_tool("internal__slack_send_message", {})
+        self.assertEqual(self.internal.calls, ["slack_send_message"])
+
+if __name__ == "__main__":
+    unittest.main()
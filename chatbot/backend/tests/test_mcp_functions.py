@@ -0,0 +1,89 @@
+import unittest
+from types import SimpleNamespace
+
+from chatbot.backend.services.mcp.functions import FunctionCatalog, sanitize_schema
+
+def make_tool(name, description="", schema=None):
+    return SimpleNamespace(name=name, description=description, inputSchema=schema)
+
+class TestSanitizeSchema(unittest.TestCase):
+
+    def test_drops_unsupported_keywords(self):
+        """Keywords Gemini rejects are removed and required names are filtered."""
+        schema = sanitize_schema({
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "to": {"type": "string", "title": "To", "default": ""},
+                "count": {"type": ["integer", "null"]},
+                "labels": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}}
+            },
+            "required": ["to", "missing"]
+        })
+
+        self.assertEqual(schema, {
+            "type": "object",
+            "properties": {
+                "to": {"type": "string"},
+                "count": {"type": "integer", "nullable": True},
+                "labels": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}}
+            },
+            "required": ["to"]
+        })
+
+    def test_unions_and_empty_objects(self):
+        """anyOf picks a concrete alternative; objects without properties become JSON strings."""
+        self.assertEqual(sanitize_schema({"anyOf": [{"type": "null"}, {"type": "number"}]}), {"type": "number"})
+        self.assertEqual(sanitize_schema({"type": "object", "description": "Extra"}),
+                         {"type": "string", "description": "Extra (JSON object)"})
+
+class TestFunctionCatalog(unittest.TestCase):
+
+    def test_declarations_and_name_mapping(self):
+        """Tools become declarations without server-filled parameters, and names map back."""
+        catalog = FunctionCatalog([
+            make_tool("gmail_send_email", "Send an email", {
+                "type": "object",
+                "properties": {"instructions": {"type": "string"}, "to": {"type": "string"}},
+                "required": ["instructions", "to"]
+            }),
+            make_tool("notion-find.page", "Find a page")
+        ])
+
+        send, find = catalog.declarations
+        self.assertEqual(send["parameters"], {"type": "object", "properties": {"to": {"type": "string"}}, "required": ["to"]})
+        self.assertEqual(find, {"name": "notion_find_page", "description": "Find a page"})
+        self.assertEqual(catalog.resolve("notion_find_page"), "notion-find.page")
+        self.assertIsNone(catalog.resolve("unknown"))
+        self.assertEqual(catalog.tools, [{"function_declarations": catalog.declarations}])
+
+    def test_decode_restores_free_form_objects(self):
+        """JSON strings standing in for property-less objects are decoded, others left alone."""
+        catalog = FunctionCatalog([make_tool("webhooks_post", "Post", {
+            "type": "object",
+            "properties": {
+                "to": {"type": "string"},
+                "payload": {"type": "object"},
+                "headers": {"anyOf": [{"type": "null"}, {"type": "object"}]},
+                "items": {"type": "array", "items": {"type": "object"}}
+            }
+        })])
+
+        decoded = catalog.decode("webhooks_post", {
+            "to": '{"not": "decoded"}', "payload": '{"a": 1}', "headers": "not json", "items": ['{"b": 2}']
+        })
+        self.assertEqual(decoded, {"to": '{"not": "decoded"}', "payload": {"a": 1},
+                                   "headers": "not json", "items": [{"b": 2}]})
+
+    def test_fingerprint_tracks_catalog_changes(self):
+        """The catalog version changes only when a tool changes."""
+        tools = [make_tool("zoom_create_meeting", "Create", {"type": "object"})]
+        same = [make_tool("zoom_create_meeting", "Create", {"type": "object"})]
+        changed = [make_tool("zoom_create_meeting", "Create a meeting", {"type": "object"})]
+
+        self.assertEqual(FunctionCatalog.fingerprint(tools), FunctionCatalog.fingerprint(same))
+        self.assertNotEqual(FunctionCatalog.fingerprint(tools), FunctionCatalog.fingerprint(changed))
+
+if __name__ == '__main__':
+    unittest.main()
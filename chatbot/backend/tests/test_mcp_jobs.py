@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+from chatbot.backend.services.mcp.jobs import MCPJobQueue, JobQueueFull, JobJournalError
+
+class FakeMCPService:
+    """Stands in for MCPService; tools named *_slow block until released."""
+
+    def __init__(self, background_loop):
+        self.background_loop = background_loop
+        self.calls = []
+        self.timeouts = []
+        self.release = None
+
+    async def call_tool(self, tool_name, params, progress_handler=None, deadline=None, timeout=None):
+        self.calls.append(tool_name)
+        self.timeouts.append(timeout)
+        if progress_handler:
+            await progress_handler(1, 2, "halfway")
+        if tool_name.endswith("_slow"):
+            await asyncio.sleep(10)
+        if tool_name == "gmail_send_email_failing":
+            return {"error": "quota exceeded"}
+        return {"tool": tool_name, "params": params}
+
+class TestMCPJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.background = BackgroundLoop(name="test-jobs")
+        self.service = FakeMCPService(self.background)
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.directory.name, "jobs.jsonl")
+        self.queues = []
+
+    def tearDown(self):
+        for queue in self.queues:
+            queue.stop()
+        self.background.stop()
+        self.directory.cleanup()
+
+    def _queue(self, **kwargs):
+        queue = MCPJobQueue(self.service, journal_path=self.journal, **kwargs)
+        queue.start()
+        self.queues.append(queue)
+        return queue
+
+    def _wait_final(self, queue, job_id):
+        job = queue.get(job_id)
+        while job["status"] not in ("succeeded", "failed"):
+            job = queue.wait(job_id, job["version"], timeout=2)
+        return job
+
+    def test_jobs_run_in_the_background(self):
+        """Submitting returns a queued job at once; its result is available when it finishes."""
+        queue = self._queue()
+        job = queue.submit("gmail_find_email", {"query": "invoice"})
+        self.assertEqual(job["status"], "queued")
+
+        finished = self._wait_final(queue, job["id"])
+        self.assertEqual(finished["status"], "succeeded")
+        self.assertEqual(finished["result"]["params"], {"query": "invoice"})
+        self.assertEqual(finished["progress"]["message"], "halfway")
+        # Jobs run under their own timeout rather than the tool's interactive one
+        self.assertEqual(self.service.timeouts, [600.0])
+
+        failed = self._wait_final(queue, queue.submit("gmail_send_email_failing", {})["id"])
+        self.assertEqual(failed["error"], {"error": "quota exceeded"})
+        self.assertEqual(queue.get_stats()["succeeded"], 1)
+
+    def test_queue_is_bounded(self):
+        """Jobs beyond max_queued are rejected while the workers are busy."""
+        queue = self._queue(workers=1, max_queued=1)
+        queue.submit("gmail_find_slow", {})
+        while queue.get_stats()["jobs"].get("running") != 1:
+            time.sleep(0.01)
+
+        queue.submit("gmail_find_slow", {})
+        with self.assertRaises(JobQueueFull):
+            queue.submit("gmail_find_slow", {})
+
+    def test_journal_is_replayed_after_a_restart(self):
+        """Queued and interrupted read-only jobs run again; interrupted writes fail as possibly completed."""
+        now = time.time()
+        records = [
+            {"id": "queued", "tool_name": "gmail_find_email", "params": {}, "status": "queued", "created_at": now},
+            {"id": "read", "tool_name": "google_drive_find_a_file", "params": {}, "status": "running", "created_at": now},
+            {"id": "write", "tool_name": "gmail_send_email", "params": {}, "status": "running", "created_at": now},
+            {"id": "old", "tool_name": "gmail_find_email", "params": {}, "status": "succeeded",
+             "created_at": now - 7200, "finished_at": now - 7200}
+        ]
+        with open(self.journal, "w") as f:
+            for record in records:
+                f.write(json.dumps(dict(record, finished_at=record.get("finished_at"))) + "\n")
+            f.write('{"id": "torn"')
+
+        queue = self._queue(retention_seconds=3600)
+        self.assertEqual(self._wait_final(queue, "queued")["status"], "succeeded")
+        self.assertEqual(self._wait_final(queue, "read")["status"], "succeeded")
+        interrupted = queue.get("write")
+        self.assertEqual(interrupted["status"], "failed")
+        self.assertTrue(interrupted["error"]["may_have_completed"])
+        self.assertIsNone(queue.get("old"))
+        self.assertNotIn("gmail_send_email", self.service.calls)
+
+    def _journal_lines(self):
+        with open(self.journal) as f:
+            return [json.loads(line) for line in f]
+
+    def test_journal_is_compacted_after_appends(self):
+        """Every ``compact_after`` appends the journal is rewritten with one record per job."""
+        queue = self._queue(compact_after=5)
+        job_ids = [queue.submit("gmail_find_email", {"query": str(i)})["id"] for i in range(4)]
+        for job_id in job_ids:
+            self._wait_final(queue, job_id)
+
+        # The final records are appended just after the jobs finish
+        expected = {job_id: "succeeded" for job_id in job_ids}
+        for _ in range(100):
+            records = self._journal_lines()
+            if {record["id"]: record["status"] for record in records} == expected:
+                break
+            time.sleep(0.01)
+
+        # Twelve appends (queued, running, finished) leave at most four past the last compaction
+        self.assertEqual({record["id"]: record["status"] for record in records}, expected)
+        self.assertLessEqual(len(records), len(job_ids) + 4)
+
+    def test_pruning_compacts_the_journal(self):
+        """Records of expired jobs are dropped from the journal when they are pruned."""
+        queue = self._queue(retention_seconds=0)
+        expired = queue.submit("gmail_find_email", {})["id"]
+        self._wait_final(queue, expired)
+        time.sleep(0.01)
+
+        queue.submit("gmail_find_slow", {})
+        self.assertIsNone(queue.get(expired))
+        self.assertNotIn(expired, {record["id"] for record in self._journal_lines()})
+
+    def test_failed_journal_flush_rejects_the_job(self):
+        """A job whose record cannot be flushed is refused and never runs, now or after a restart."""
+        queue = self._queue()
+        with mock.patch("chatbot.backend.services.mcp.jobs.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(JobJournalError):
+                queue.submit("gmail_send_email", {"to": "a"})
+
+        self.assertEqual(queue.get_stats()["submitted"], 0)
+        queue.stop()
+        self.queues.remove(queue)
+
+        restarted = self._queue()
+        time.sleep(0.05)
+        self.assertEqual(restarted.get_stats()["recovered"], 0)
+        self.assertEqual(self.service.calls, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import unittest
+
+from chatbot.backend.services.mcp.result_cache import ToolResultCache
+
+class TestToolResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ToolResultCache(default_ttl_seconds=60, tool_ttls={"gmail_find_*": 5, "notion_get_page": 0},
+                                     read_only_tools=["pdf_convert_document"], max_entries=2)
+
+    def test_ttls_follow_configuration(self):
+        """Exact names and globs override the default; side-effecting tools are never cached."""
+        self.assertEqual(self.cache.ttl_for("google_drive_find_a_file"), 60)
+        self.assertEqual(self.cache.ttl_for("gmail_find_email"), 5)
+        self.assertEqual(self.cache.ttl_for("notion_get_page"), 0)
+        self.assertEqual(self.cache.ttl_for("gmail_send_email"), 0)
+        self.assertEqual(self.cache.ttl_for("pdf_convert_document"), 60)
+
+    def test_key_ignores_order_whitespace_and_instructions(self):
+        """Equivalent parameters map to the same key."""
+        key = self.cache.make_key("gmail_find_email", {"query": "invoice", "max": 5})
+        self.assertEqual(key, self.cache.make_key("gmail_find_email", {"max": 5, "query": " invoice ",
+                                                                       "instructions": "Find emails"}))
+        self.assertNotEqual(key, self.cache.make_key("gmail_find_email", {"query": "receipt", "max": 5}))
+        self.assertNotEqual(key, self.cache.make_key("google_drive_find_a_file", {"query": "invoice", "max": 5}))
+
+    def test_get_returns_copies_until_expiry(self):
+        """Cached results are copies and expire after their TTL."""
+        key = self.cache.make_key("gmail_find_email", {"query": "invoice"})
+        self.cache.put(key, "gmail_find_email", {"emails": ["a"]}, 0.05, self.cache.generation("gmail_find_email"))
+
+        result = self.cache.get(key)
+        result["emails"].append("b")
+        self.assertEqual(self.cache.get(key), {"emails": ["a"]})
+
+        time.sleep(0.06)
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.get_stats()["hits"], 2)
+
+    def test_write_invalidates_its_service_only(self):
+        """A write drops cached reads of its own service and leaves other services alone."""
+        gmail_key = self.cache.make_key("gmail_find_email", {"query": "invoice"})
+        drive_key = self.cache.make_key("google_drive_find_a_file", {"title": "invoice"})
+        self.cache.put(gmail_key, "gmail_find_email", {"emails": []}, 60, 0)
+        self.cache.put(drive_key, "google_drive_find_a_file", {"files": []}, 60, 0)
+
+        self.cache.invalidate("gmail_send_email")
+        self.assertIsNone(self.cache.get(gmail_key))
+        self.assertEqual(self.cache.get(drive_key), {"files": []})
+
+    def test_results_fetched_across_a_write_are_not_stored(self):
+        """A read that started before a write to its service is not cached."""
+        key = self.cache.make_key("gmail_find_email", {"query": "invoice"})
+        generation = self.cache.generation("gmail_find_email")
+        self.cache.invalidate("gmail_send_email")
+        self.cache.put(key, "gmail_find_email", {"emails": []}, 60, generation)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache holds at most max_entries results."""
+        keys = [self.cache.make_key("google_drive_find_a_file", {"title": str(i)}) for i in range(3)]
+        self.cache.put(keys[0], "google_drive_find_a_file", 0, 60, 0)
+        self.cache.put(keys[1], "google_drive_find_a_file", 1, 60, 0)
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], "google_drive_find_a_file", 2, 60, 0)
+
+        self.assertEqual(self.cache.get(keys[0]), 0)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertEqual(self.cache.get_stats()["evictions"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
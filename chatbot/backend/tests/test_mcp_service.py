@@ -0,0 +1,209 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+from chatbot.backend.services.gemini_service import GeminiService
+from chatbot.backend.services.mcp.result_cache import ToolResultCache
+from chatbot.backend.services.mcp.timeouts import AdaptiveTimeouts
+from chatbot.backend.services.mcp_service import MCPService
+
+def make_tool(name, properties=None, required=None):
+    return SimpleNamespace(name=name, description=f"{name} tool",
+                           inputSchema={"type": "object", "properties": properties or {}, "required": required or []})
+
+class FakeMCPClient:
+    """Stands in for MCPClient; records calls, reports progress steps and answers with the parameters."""
+
+    def __init__(self, background_loop, tools):
+        self.background_loop = background_loop
+        self.server_url = "http://fake/mcp"
+        self.tools = tools
+        self.calls = []
+        self.cancelled = []
+        self.connects = 0
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def connect(self):
+        self.connects += 1
+        await asyncio.sleep(0.01)
+        return True
+
+    async def disconnect(self):
+        return True
+
+    def is_connected(self):
+        return True
+
+    async def list_tools(self):
+        return self.tools
+
+    async def call_tool(self, tool_name, params, progress_handler=None):
+        self.calls.append((tool_name, params))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            steps = params.get("steps", 0)
+            for step in range(1, steps + 1):
+                await asyncio.sleep(params.get("step_sleep", 0))
+                await progress_handler(step, steps, f"step {step}")
+            await asyncio.sleep(params.get("sleep", self.delay))
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_name)
+            raise
+        finally:
+            self.in_flight -= 1
+        if params.get("fail"):
+            raise RuntimeError("tool failed")
+        return {"tool": tool_name, "params": params}
+
+class MCPServiceTestCase(unittest.IsolatedAsyncioTestCase):
+    """Runs an MCPService over a fake client."""
+
+    tools = [
+        make_tool("webhooks_post", {"to": {"type": "string"}, "payload": {"type": "object"}}, required=["to"])
+    ]
+    client_class = FakeMCPClient
+
+    def setUp(self):
+        self.background = BackgroundLoop(name="test-mcp-service")
+        self.service = MCPService(background_loop=self.background, result_cache=self.make_result_cache())
+        self.client = self.client_class(self.background, self.tools)
+        self.service.client = self.service.tools_service.client = self.client
+
+    def tearDown(self):
+        self.background.stop()
+
+    def make_result_cache(self):
+        return None
+
+class TestFunctionCallParameters(MCPServiceTestCase):
+
+    async def test_gemini_object_parameters_reach_the_tool_decoded(self):
+        """A free-form object Gemini sends as a JSON string passes validation as an object."""
+        await self.service.connect()
+        gemini = GeminiService(api_key="")
+        gemini.enable_function_calling(self.service.tools_service.available_tools, self.service.call_tool)
+
+        call = SimpleNamespace(name="webhooks_post", args={"to": "a", "payload": '{"a": 1}'})
+        result, = await gemini._execute_function_calls([call])
+
+        self.assertNotIn("error", result["result"])
+        tool_name, params = self.client.calls[0]
+        self.assertEqual(tool_name, "webhooks_post")
+        self.assertEqual(params["payload"], {"a": 1})
+
+class TestResultCacheInvalidation(MCPServiceTestCase):
+
+    tools = [
+        make_tool("google_calendar_find_event", {"query": {"type": "string"}}),
+        make_tool("google_calendar_quick_add_event", {"text": {"type": "string"}})
+    ]
+
+    def make_result_cache(self):
+        return ToolResultCache(default_ttl_seconds=60)
+
+    async def test_write_with_a_modifier_word_invalidates_its_service(self):
+        """quick_add_event invalidates google_calendar reads, not a "google_calendar_quick" service."""
+        await self.service.connect()
+        for _ in range(2):
+            await self.service.call_tool("google_calendar_find_event", {"query": "standup"})
+        self.assertEqual(len(self.client.calls), 1)
+
+        await self.service.call_tool("google_calendar_quick_add_event", {"text": "standup at 10"})
+        await self.service.call_tool("google_calendar_find_event", {"query": "standup"})
+        self.assertEqual([tool for tool, _ in self.client.calls],
+                         ["google_calendar_find_event", "google_calendar_quick_add_event", "google_calendar_find_event"])
+
+class TestCallTimeouts(MCPServiceTestCase):
+
+    async def test_timeout_override_replaces_the_adaptive_timeout(self):
+        """A caller-supplied timeout lets a call outlive the tool's adaptive timeout."""
+        self.service.timeouts = AdaptiveTimeouts(default_seconds=0.05, floor_seconds=0.01)
+        self.client.delay = 0.2
+        await self.service.connect()
+
+        timed_out = await self.service.call_tool("webhooks_post", {"to": "a"})
+        self.assertEqual(timed_out["error_type"], "timeout")
+
+        result = await self.service.call_tool("webhooks_post", {"to": "a"}, timeout=5.0)
+        self.assertEqual(result["tool"], "webhooks_post")
+
+class TestCallBatch(MCPServiceTestCase):
+
+    async def _run(self, calls, concurrency=8):
+        return [chunk async for chunk in self.service.call_batch(calls, concurrency)]
+
+    async def test_results_stream_in_completion_order_with_a_summary(self):
+        """Results arrive as calls finish, failures stay per call, and a summary closes the batch."""
+        chunks = await self._run([
+            {"id": "slow", "tool_name": "webhooks_post", "params": {"to": "a", "sleep": 0.1}},
+            {"id": "fast", "tool_name": "webhooks_post", "params": {"to": "b"}},
+            {"id": "failing", "tool_name": "webhooks_post", "params": {"to": "c", "fail": True}},
+            {"id": "invalid", "tool_name": "webhooks_post", "params": {}}
+        ])
+
+        results, summary = chunks[:-1], chunks[-1]
+        self.assertEqual(results[-1]["id"], "slow")
+        self.assertEqual({result["id"]: result["success"] for result in results},
+                         {"slow": True, "fast": True, "failing": False, "invalid": False})
+        self.assertIn("tool failed", next(result for result in results if result["id"] == "failing")["error"])
+        self.assertEqual([result["index"] for result in results if result["id"] == "fast"], [1])
+        self.assertEqual(summary["type"], "complete")
+        self.assertEqual((summary["calls"], summary["succeeded"], summary["failed"], summary["timed_out"]), (4, 2, 2, 0))
+
+    async def test_concurrency_is_bounded(self):
+        """No more than ``concurrency`` calls are in flight at once."""
+        await self._run([{"tool_name": "webhooks_post", "params": {"to": str(i), "sleep": 0.02}} for i in range(6)],
+                        concurrency=2)
+        self.assertEqual(self.client.max_in_flight, 2)
+        self.assertEqual(len(self.client.calls), 6)
+
+    async def test_connects_once_before_fanning_out(self):
+        """A disconnected service connects once for the whole batch, not once per call."""
+        chunks = await self._run([{"tool_name": "webhooks_post", "params": {"to": str(i)}} for i in range(5)])
+        self.assertEqual(self.client.connects, 1)
+        self.assertEqual(chunks[-1]["succeeded"], 5)
+
+class TestStreamTool(MCPServiceTestCase):
+
+    async def _stream(self, params, heartbeat_interval=5.0):
+        return [chunk async for chunk in self.background.stream(
+            self.service.stream_tool("webhooks_post", params, heartbeat_interval=heartbeat_interval))]
+
+    async def test_progress_precedes_the_result(self):
+        """Progress notifications are relayed in order and the result comes last."""
+        chunks = await self._stream({"to": "a", "steps": 3, "step_sleep": 0.01})
+
+        self.assertEqual([chunk["type"] for chunk in chunks], ["progress"] * 3 + ["result"])
+        self.assertEqual([(chunk["progress"], chunk["total"], chunk["message"]) for chunk in chunks[:-1]],
+                         [(1, 3, "step 1"), (2, 3, "step 2"), (3, 3, "step 3")])
+        self.assertTrue(chunks[-1]["success"])
+        self.assertEqual(chunks[-1]["result"]["tool"], "webhooks_post")
+
+    async def test_heartbeats_while_the_server_is_silent(self):
+        """A call that reports nothing gets "still running" heartbeats until it finishes."""
+        chunks = await self._stream({"to": "a", "sleep": 0.2}, heartbeat_interval=0.05)
+
+        heartbeats = [chunk for chunk in chunks if chunk["type"] == "status"]
+        self.assertGreaterEqual(len(heartbeats), 2)
+        self.assertEqual(heartbeats[0]["text"], "Still running webhooks_post...")
+        self.assertEqual(chunks[-1]["type"], "result")
+
+    async def test_disconnect_cancels_the_call(self):
+        """Closing the stream mid-call cancels the tool call on the session's loop."""
+        stream = self.background.stream(self.service.stream_tool("webhooks_post", {"to": "a", "steps": 1, "sleep": 30}))
+        first = await stream.__anext__()
+        self.assertEqual(first["type"], "progress")
+        await stream.aclose()
+
+        for _ in range(100):
+            if self.client.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.client.cancelled, ["webhooks_post"])
+
+if __name__ == "__main__":
+    unittest.main()
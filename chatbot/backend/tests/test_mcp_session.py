@@ -0,0 +1,156 @@
+import asyncio
+import unittest
+
+from chatbot.backend.services.background_loop import BackgroundLoop
+from chatbot.backend.services.mcp.session import MCPSession
+
+class FakeClient:
+    """Stands in for a fastmcp client; counts handshakes and can drop its transport."""
+
+    opened = 0
+    enter_delay = 0.0
+
+    def __init__(self):
+        self.connected = False
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self.tasks = []
+
+    async def __aenter__(self):
+        self.tasks.append(asyncio.current_task())
+        await asyncio.sleep(FakeClient.enter_delay)
+        FakeClient.opened += 1
+        self.connected = True
+        return self
+
+    async def __aexit__(self, *exc):
+        self.tasks.append(asyncio.current_task())
+        self.connected = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def ping(self):
+        if not self.connected:
+            raise ConnectionError("closed")
+
+    async def list_tools(self):
+        if not self.connected:
+            raise ConnectionError("closed")
+        return ["gmail_find_email"]
+
+    async def call_tool(self, name, params, progress_handler=None):
+        if not self.connected:
+            raise ConnectionError("closed")
+        if name == "failing_tool":
+            raise RuntimeError("tool error")
+        if progress_handler:
+            await progress_handler(1, 2, "halfway")
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(0.02)
+        self.concurrent -= 1
+        return {"tool": name, "params": params}
+
+class TestMCPSession(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        FakeClient.opened = 0
+        FakeClient.enter_delay = 0.0
+        self.clients = []
+        self.background = BackgroundLoop(name="test-mcp")
+        self.session = MCPSession(self._factory, background_loop=self.background, ping_interval=0.05,
+                                  max_concurrent_calls=2, reconnect_base_delay=0.01)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        self.background.stop()
+
+    def _factory(self):
+        client = FakeClient()
+        self.clients.append(client)
+        return client
+
+    async def test_calls_share_one_session(self):
+        """Concurrent calls are multiplexed over a single handshake, bounded by the semaphore."""
+        self.assertTrue(await self.session.start())
+        results = await asyncio.gather(*(self.session.call_tool("gmail_find_email", {"query": str(i)}) for i in range(6)))
+
+        self.assertEqual([r["params"]["query"] for r in results], [str(i) for i in range(6)])
+        self.assertEqual(FakeClient.opened, 1)
+        self.assertEqual(self.clients[0].max_concurrent, 2)
+        state = self.session.get_state()
+        self.assertTrue(state["connected"])
+        self.assertEqual(state["calls"], 6)
+
+    async def test_client_is_entered_and_exited_in_one_task(self):
+        """Closing exits the client in the task that entered it, as anyio transports require."""
+        await self.session.start()
+        await self.session.close()
+
+        client = self.clients[0]
+        self.assertFalse(client.connected)
+        self.assertEqual(len(client.tasks), 2)
+        self.assertIs(client.tasks[0], client.tasks[1])
+        self.assertEqual(self.session.get_state()["state"], "closed")
+
+    async def test_connect_timeout(self):
+        """A handshake that hangs is abandoned after the connect timeout and retried."""
+        FakeClient.enter_delay = 10
+        self.session.connect_timeout = 0.05
+
+        self.assertFalse(await self.session.start())
+        for _ in range(50):
+            await asyncio.sleep(0.01)
+            if len(self.clients) > 1:
+                break
+        self.assertGreater(len(self.clients), 1)
+        self.assertEqual(self.session.get_state()["last_error"], "TimeoutError")
+
+    async def test_progress_is_relayed_from_the_session_loop(self):
+        """Progress notifications reach the caller's handler on the session's loop."""
+        updates = []
+
+        async def on_progress(progress, total, message):
+            updates.append((progress, total, message, asyncio.get_running_loop() is self.background.loop))
+
+        await self.session.call_tool("zoom_create_meeting", {}, progress_handler=on_progress)
+        self.assertEqual(updates, [(1, 2, "halfway", True)])
+
+    async def test_tool_errors_keep_the_session(self):
+        """A failing tool does not tear the session down."""
+        await self.session.start()
+        with self.assertRaises(RuntimeError):
+            await self.session.call_tool("failing_tool", {})
+        self.assertEqual(await self.session.list_tools(), ["gmail_find_email"])
+        self.assertEqual(FakeClient.opened, 1)
+
+    async def test_reconnects_after_drop(self):
+        """A dropped transport is detected by the keep-alive and the session reopens."""
+        await self.session.start()
+        self.clients[0].connected = False
+
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if FakeClient.opened > 1 and self.session.connected:
+                break
+
+        self.assertEqual(FakeClient.opened, 2)
+        self.assertEqual(self.session.get_state()["reconnects"], 1)
+        self.assertEqual((await self.session.call_tool("gmail_find_email", {}))["tool"], "gmail_find_email")
+
+    async def test_read_only_calls_retry_after_drop(self):
+        """Read-only calls are retried on the new session; side-effecting calls are not."""
+        self.session.ping_interval = 60
+        await self.session.start()
+
+        self.clients[0].connected = False
+        result = await self.session.call_tool("gmail_find_email", {"query": "x"})
+        self.assertEqual(result["params"], {"query": "x"})
+
+        self.clients[-1].connected = False
+        with self.assertRaises(ConnectionError):
+            await self.session.call_tool("gmail_send_email", {"to": "a@b.c"})
+
+if __name__ == "__main__":
+    unittest.main()
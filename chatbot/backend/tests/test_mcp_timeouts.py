@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from chatbot.backend.services.mcp.timeouts import AdaptiveTimeouts, request_deadline, timeout_error
+
+class TestAdaptiveTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.timeouts = AdaptiveTimeouts(default_seconds=30, floor_seconds=2, ceiling_seconds=20,
+                                         percentile=0.99, multiplier=2, window=100, min_samples=10)
+
+    def test_default_until_enough_samples(self):
+        """Tools with too few samples get the default, capped by the ceiling."""
+        for _ in range(9):
+            self.timeouts.record("gmail_find_email", 1.0)
+        self.assertEqual(self.timeouts.timeout_for("gmail_find_email"), 20)
+
+    def test_timeout_follows_the_percentile_within_bounds(self):
+        """The timeout is the latency percentile times the multiplier, clamped to floor and ceiling."""
+        for seconds in [0.5] * 98 + [3.0, 4.0]:
+            self.timeouts.record("gmail_find_email", seconds)
+        self.assertEqual(self.timeouts.timeout_for("gmail_find_email"), 6.0)
+
+        for _ in range(20):
+            self.timeouts.record("google_drive_find_a_file", 0.1)
+            self.timeouts.record("zoom_create_meeting", 15.0)
+        self.assertEqual(self.timeouts.timeout_for("google_drive_find_a_file"), 2)
+        self.assertEqual(self.timeouts.timeout_for("zoom_create_meeting"), 20)
+
+    def test_timeouts_are_counted_not_sampled(self):
+        """Timed-out calls do not feed the latency window."""
+        self.timeouts.record_timeout("gmail_find_email")
+        stats = self.timeouts.get_stats()["tools"]["gmail_find_email"]
+        self.assertEqual((stats["samples"], stats["timeouts"]), (0, 1))
+
+class TestDeadlines(unittest.TestCase):
+
+    def test_request_deadline_uses_header_within_limits(self):
+        """Client budgets apply up to the maximum; missing or invalid ones fall back to the default."""
+        now = time.monotonic()
+        self.assertAlmostEqual(request_deadline("5", 90, 300) - now, 5, delta=0.5)
+        self.assertAlmostEqual(request_deadline("1000", 90, 300) - now, 300, delta=0.5)
+        self.assertAlmostEqual(request_deadline(None, 90, 300) - now, 90, delta=0.5)
+        self.assertAlmostEqual(request_deadline("soon", 90, 300) - now, 90, delta=0.5)
+        self.assertAlmostEqual(request_deadline("-1", 90, 300) - now, 90, delta=0.5)
+
+    def test_timeout_errors_are_structured(self):
+        """Timeout results keep the error key and flag side-effecting tools."""
+        error = timeout_error("gmail_send_email", 12.5, deadline_exceeded=True)
+        self.assertEqual(error["error_type"], "timeout")
+        self.assertTrue(error["deadline_exceeded"])
+        self.assertTrue(error["may_have_completed"])
+        self.assertIn("12.50s", error["error"])
+        self.assertFalse(timeout_error("gmail_find_email", 1, False)["may_have_completed"])
+
+if __name__ == "__main__":
+    unittest.main()
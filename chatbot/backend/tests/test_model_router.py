@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+
+from chatbot.backend.services.model_router import ModelRouter
+
+MODELS = ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-flash", "gemini-1.5-flash"]
+
+class TestModelRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.router = ModelRouter(MODELS, latency_target_ms=4000)
+
+    def test_short_factual_question_uses_cheapest_model(self):
+        """A short factual question should go to the cheapest candidate."""
+        self.assertEqual(self.router.route("What is the capital of France?"), "gemini-1.5-flash")
+
+    def test_complex_request_uses_capable_model(self):
+        """Code plus reasoning intent should skip the cheapest models."""
+        message = "Please debug this and explain why it fails step by step:\n```python\nprint(1/0)\n```\n" * 5
+        chosen = self.router.route(message, history=[{"role": "user", "content": "hi"}] * 10)
+        self.assertIn(chosen, ("gemini-2.5-flash", "gemini-2.5-pro"))
+
+    def test_only_known_models_are_candidates(self):
+        """Profiles for models not in the available list are dropped."""
+        router = ModelRouter(["gemini-2.0-flash"])
+        self.assertEqual([p["name"] for p in router.profiles], ["gemini-2.0-flash"])
+        self.assertEqual(ModelRouter([]).route("hello", default="fallback"), "fallback")
+
+    def test_latency_learning_moves_traffic(self):
+        """A cheap model that turns out to be slow is skipped once it misses the target."""
+        self.router.record_latency("gemini-1.5-flash", 9000)
+        self.assertEqual(self.router.route("What is the capital of France?"), "gemini-2.0-flash")
+        self.assertEqual(self.router.get_stats()["models"]["gemini-1.5-flash"]["samples"], 1)
+
+    def test_failed_requests_are_not_learned(self):
+        """Failed requests do not update latency estimates."""
+        before = self.router.get_stats()["models"]["gemini-1.5-flash"]["latency_estimate_ms"]
+        self.router.record_latency("gemini-1.5-flash", 9000, success=False)
+        after = self.router.get_stats()["models"]["gemini-1.5-flash"]["latency_estimate_ms"]
+        self.assertEqual(before, after)
+
+    def test_decisions_are_logged(self):
+        """Decisions and outcomes are appended to the JSONL log."""
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "router.jsonl")
+            router = ModelRouter(MODELS, decision_log_path=log_path)
+            chosen = router.route("hello")
+            router.record_latency(chosen, 1000)
+
+            with open(log_path) as f:
+                events = [json.loads(line) for line in f]
+
+        self.assertEqual([e["event"] for e in events], ["decision", "outcome"])
+        self.assertEqual(events[0]["chosen"], chosen)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from chatbot.backend.services.prompt_service import PromptService
+
+TOOLS = [
+    {"name": "gmail_send_email", "description": "This tool will send an **email**   message.", "parameters": ["instructions", "to", "subject"]},
+    {"name": "gmail_find_email", "description": "Find an email by query.", "parameters": ["instructions", "query"]},
+    {"name": "zoom_create_meeting", "description": "Create a meeting. " * 20, "parameters": ["topic"]},
+]
+
+class TestPromptService(unittest.TestCase):
+
+    def test_tools_are_grouped_by_catalog_service(self):
+        """Multi-word services stay apart, and a selection is grouped like the full catalog."""
+        tools = TOOLS + [
+            {"name": "google_drive_find_a_file", "description": "Find a file.", "parameters": ["title"]},
+            {"name": "google_calendar_find_event", "description": "Find an event.", "parameters": ["query"]},
+            {"name": "google_calendar_quick_add_event", "description": "Add an event from text.", "parameters": ["text"]},
+        ]
+        service = PromptService()
+        prompt = service.generate_system_prompt(tools, [tools[-1]])
+
+        self.assertIn("gmail (2), zoom (1), google_drive (1), google_calendar (2)", prompt)
+        self.assertIn("## Google Calendar Tools\n- **google_calendar_quick_add_event**", prompt)
+
+    def test_compact_rendering(self):
+        """Prefixes are written once, shared parameters hoisted and descriptions normalized."""
+        service = PromptService(render_mode="compact", max_description_chars=40)
+        prompt = service.generate_system_prompt(TOOLS)
+
+        self.assertIn("[gmail_*] all take: instructions\nsend_email(to, subject): Send an email message\n", prompt)
+        self.assertIn("find_email(query): Find an email by query\n", prompt)
+        zoom_line = next(line for line in prompt.splitlines() if line.startswith("create_meeting(topic)"))
+        self.assertTrue(zoom_line.endswith("..."))
+        self.assertNotIn("EXAMPLES:", prompt)
+
+    def test_token_report_compares_modes(self):
+        """The report shows the compact catalog is smaller than the markdown one."""
+        service = PromptService(render_mode="compact")
+        service.build_index(TOOLS)
+        report = service.get_prompt_report()
+
+        self.assertLess(report["compact"]["tokens"], report["markdown"]["tokens"])
+        self.assertGreater(report["savings_percent"], 0)
+
+    def test_relevance_filtered_prompt(self):
+        """With a selection, only the selected tools are described after the service list."""
+        service = PromptService(top_k=1)
+        service.build_index(TOOLS)
+        selected = service.select_tools("schedule a zoom meeting")
+        prompt = service.generate_system_prompt(TOOLS, selected)
+
+        self.assertEqual([tool["name"] for tool in selected], ["zoom_create_meeting"])
+        self.assertIn("gmail (2), zoom (1)", prompt)
+        self.assertIn("**zoom_create_meeting**", prompt)
+        self.assertNotIn("**gmail_send_email**", prompt)
+
+    def test_rejects_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            PromptService(render_mode="yaml")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from chatbot.backend.services.provider_registry import ProviderRegistry
+
+class FakeProvider:
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    def get_stats(self):
+        return {"pool_limit": 4}
+
+class TestProviderRegistry(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.gemini = object()
+        self.local = FakeProvider()
+        self.registry = ProviderRegistry("gemini", model_map={
+            "fast": "local:llama-3.1-8b-instruct",
+            "llama-*": "local"
+        })
+        self.registry.register("gemini", self.gemini)
+        self.registry.register("local", self.local)
+
+    def test_unmapped_models_use_the_default_provider(self):
+        """Models matching no mapping go to the default provider under their own name."""
+        self.assertEqual(self.registry.resolve("gemini-2.5-pro"), ("gemini", self.gemini, "gemini-2.5-pro"))
+
+    def test_provider_names_select_their_default_model(self):
+        """Requesting a provider by name uses that provider's default model."""
+        self.assertEqual(self.registry.resolve("local"), ("local", self.local, None))
+
+    def test_names_match_case_insensitively(self):
+        """Provider names and mappings match whatever the case of the requested model."""
+        self.assertEqual(self.registry.resolve("LOCAL"), ("local", self.local, None))
+        self.assertEqual(self.registry.resolve("Fast"), ("local", self.local, "llama-3.1-8b-instruct"))
+
+    def test_mappings_with_upstream_model(self):
+        """Exact mappings can rename the model sent upstream."""
+        self.assertEqual(self.registry.resolve("fast"), ("local", self.local, "llama-3.1-8b-instruct"))
+
+    def test_glob_mappings(self):
+        """Glob patterns pass the requested model through."""
+        self.assertEqual(self.registry.resolve("Llama-3.2-3b"), ("local", self.local, "Llama-3.2-3b"))
+
+    def test_unregistered_provider(self):
+        """Mapping to a provider that was never registered is an error."""
+        self.registry.model_map["broken"] = "missing"
+        with self.assertRaises(KeyError):
+            self.registry.resolve("broken")
+
+    async def test_close_and_stats(self):
+        """Providers with pools are closed and report their stats."""
+        await self.registry.close()
+        self.assertTrue(self.local.closed)
+        stats = self.registry.get_stats()
+        self.assertEqual(stats["providers"]["local"], {"pool_limit": 4})
+        self.assertEqual(stats["providers"]["gemini"], {})
+
+if __name__ == "__main__":
+    unittest.main()
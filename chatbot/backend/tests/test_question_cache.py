@@ -0,0 +1,59 @@
+import time
+import unittest
+
+from chatbot.backend.services.question_cache import QuestionCache, simhash, hamming_distance
+
+class TestQuestionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QuestionCache(max_distance=3, max_entries=3)
+        self.cache.add("How do I reset my account password?", "gemini-2.5-flash",
+                       "Use the reset link.", "gemini-2.5-flash")
+
+    def test_trivial_wording_differences_hit(self):
+        """Case, punctuation and filler words do not prevent a match."""
+        hit = self.cache.lookup("how do i reset my account password", "gemini-2.5-flash")
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit["text"], "Use the reset link.")
+        self.assertLessEqual(hit["distance"], 3)
+
+        self.assertIsNotNone(self.cache.lookup("Please, how do I reset my account password??", "gemini-2.5-flash"))
+
+    def test_different_question_or_model_misses(self):
+        """Unrelated questions and other models are misses."""
+        self.assertIsNone(self.cache.lookup("What is the weather like in Paris today?", "gemini-2.5-flash"))
+        self.assertIsNone(self.cache.lookup("How do I reset my account password?", "nvidia"))
+
+    def test_short_questions_are_not_indexed(self):
+        """Questions with too few meaningful words are ignored."""
+        self.cache.add("hi there", "gemini-2.5-flash", "Hello!", "gemini-2.5-flash")
+        self.assertIsNone(self.cache.lookup("hi there", "gemini-2.5-flash"))
+
+    def test_memory_is_bounded(self):
+        """The oldest entries are evicted once the cap is reached, including their band postings."""
+        for i in range(5):
+            self.cache.add(f"question number {i} about deployment pipelines", "m", f"answer {i}", "m")
+
+        self.assertEqual(len(self.cache.entries), 3)
+        self.assertEqual(self.cache.get_stats()["evictions"], 3)
+        postings = sum(len(bucket) for band in self.cache.bands for bucket in band.values())
+        self.assertEqual(postings, 3 * self.cache.band_count)
+
+    def test_lookup_is_sub_millisecond(self):
+        """Lookups against a full index stay under a millisecond on average."""
+        cache = QuestionCache(max_entries=2000)
+        for i in range(2000):
+            cache.add(f"question {i} about topic {i * 7} and detail {i * 13}", "m", "a", "m")
+
+        started = time.perf_counter()
+        for _ in range(200):
+            cache.lookup("question 42 about topic 294 and detail 546", "m")
+        self.assertLess((time.perf_counter() - started) / 200, 0.001)
+
+    def test_hamming_distance(self):
+        """Identical texts have identical fingerprints."""
+        self.assertEqual(hamming_distance(simhash("same text here"), simhash("same text here")), 0)
+        self.assertEqual(hamming_distance(0b1011, 0b0001), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import patch
+
+from chatbot.backend.services.rate_limiter import (
+    ProviderRateLimiter, RateLimitTimeout, RetryPolicy, RetryableError, TokenBucket, parse_retry_after
+)
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_wait(self):
+        """A full bucket serves a burst immediately; the next request has to wait."""
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0, places=1)
+
+    def test_refund(self):
+        """Refunded tokens become available again."""
+        bucket = TokenBucket(rate_per_minute=60, capacity=1)
+        bucket.reserve()
+        bucket.refund()
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_parse_retry_after(self):
+        """Retry-After accepts seconds and rejects garbage."""
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+class TestProviderRateLimiter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_queued_wait_is_recorded(self):
+        """Requests over the limit are queued and the wait is exposed in stats."""
+        limiter = ProviderRateLimiter({"gemini": {"requests_per_minute": 600}})
+        limiter.buckets["gemini"] = (TokenBucket(600, capacity=1), None)
+
+        with patch("chatbot.backend.services.rate_limiter.asyncio.sleep") as sleep:
+            await limiter.acquire("gemini", "gemini-2.5-flash")
+            await limiter.acquire("gemini", "gemini-2.5-flash")
+
+        sleep.assert_called_once()
+        stats = limiter.get_stats()["gemini:gemini-2.5-flash"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_seconds"], 0)
+
+    async def test_per_model_limit_and_max_wait(self):
+        """Per-model limits apply on top of provider limits; excessive waits are rejected."""
+        limiter = ProviderRateLimiter({"gemini:gemini-2.5-pro": {"tokens_per_minute": 100}}, max_wait_seconds=1)
+        await limiter.acquire("gemini", "gemini-2.5-pro", tokens=100)
+        with self.assertRaises(RateLimitTimeout):
+            await limiter.acquire("gemini", "gemini-2.5-pro", tokens=100)
+
+        # Other models are unaffected
+        await limiter.acquire("gemini", "gemini-2.5-flash", tokens=100)
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+
+    async def test_retries_throttled_calls_honouring_retry_after(self):
+        """429s are retried with at least the Retry-After delay, then succeed."""
+        limiter = ProviderRateLimiter()
+        policy = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=5, rate_limiter=limiter)
+        attempts = []
+
+        def operation():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RetryableError("throttled", status_code=429, retry_after=2)
+            return "ok"
+
+        with patch("chatbot.backend.services.rate_limiter.asyncio.sleep") as sleep:
+            self.assertEqual(await policy.call(operation, "nvidia", "m"), "ok")
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [2, 2])
+        self.assertEqual(limiter.get_stats()["nvidia:m"]["retries"], 2)
+        self.assertEqual(limiter.get_stats()["nvidia:m"]["throttled"], 2)
+
+    async def test_gives_up_and_skips_non_retryable(self):
+        """Retries stop after max_retries; non-retryable errors are raised immediately."""
+        policy = RetryPolicy(max_retries=2, base_delay=0)
+        calls = []
+
+        async def throttled():
+            calls.append(1)
+            raise RetryableError("throttled", status_code=503)
+
+        with self.assertRaises(RetryableError):
+            await policy.call(throttled, "gemini")
+        self.assertEqual(len(calls), 3)
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            await policy.call(broken, "gemini")
+        self.assertEqual(len(calls), 4)
+
+    def test_backoff_is_capped(self):
+        """Backoff never exceeds max_delay, even with a large Retry-After."""
+        policy = RetryPolicy(base_delay=1, max_delay=4)
+        self.assertLessEqual(policy.backoff(10), 4)
+        self.assertEqual(policy.backoff(1, retry_after=100), 4)
+
+if __name__ == '__main__':
+    unittest.main()
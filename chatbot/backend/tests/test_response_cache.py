@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+
+from chatbot.backend.services.response_cache import ResponseCache
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(cache_dir=self.tmp.name, max_entries=2, ttl_seconds=60, replay_chunk_size=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_normalizes_prompt_and_tracks_history_tail(self):
+        """Whitespace/case differences share a key; different context or model does not."""
+        history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+        key = self.cache.make_key("gemini-2.5-flash", "What is  MCP?", history)
+
+        self.assertEqual(key, self.cache.make_key("gemini-2.5-flash", " what is mcp? ", history))
+        self.assertNotEqual(key, self.cache.make_key("gemini-2.5-flash", "What is MCP?", history[:1]))
+        self.assertNotEqual(key, self.cache.make_key("nvidia", "What is MCP?", history))
+
+    def test_memory_lru_eviction_falls_back_to_disk(self):
+        """Entries evicted from memory are still served from disk."""
+        for name in ("a", "b", "c"):
+            self.cache.set(name, f"answer {name}", "gemini-2.5-flash")
+
+        self.assertNotIn("a", self.cache.memory)
+        self.assertEqual(self.cache.get("a")["text"], "answer a")
+        self.assertEqual(self.cache.get_stats()["disk_hits"], 1)
+
+    def test_expired_entries_are_misses(self):
+        """Entries past their TTL are not returned from either tier."""
+        self.cache.set("k", "stale", "nvidia", ttl_seconds=-1)
+        self.assertIsNone(self.cache.get("k"))
+
+        fresh = ResponseCache(cache_dir=self.tmp.name)
+        self.assertIsNone(fresh.get("k"))
+
+    def test_disk_tier_is_swept(self):
+        """Expired files are deleted at startup and the disk tier is trimmed to its cap, oldest first."""
+        self.cache.set("expired", "stale", "nvidia", ttl_seconds=-1)
+        for name in ("a", "b", "c"):
+            self.cache.set(name, f"answer {name}", "gemini-2.5-flash")
+
+        capped = ResponseCache(cache_dir=self.tmp.name, max_disk_entries=2, sweep_interval=2)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["b.json", "c.json"])
+        self.assertEqual(capped.get_stats()["disk_evictions"], 2)
+
+        capped.set("d", "answer d", "nvidia")
+        capped.set("e", "answer e", "nvidia")
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["d.json", "e.json"])
+
+    async def test_replay_matches_stream_format(self):
+        """Replay yields content chunks that reassemble the answer, then a complete chunk."""
+        self.cache.set("k", "hello world", "gemini-2.5-flash")
+        chunks = [chunk async for chunk in self.cache.replay(self.cache.get("k"))]
+
+        self.assertEqual([c["type"] for c in chunks[:-1]], ["content"] * 3)
+        self.assertEqual("".join(c["text"] for c in chunks[:-1]), "hello world")
+        self.assertEqual(chunks[-1], {
+            "type": "complete",
+            "text": "hello world",
+            "model_used": "gemini-2.5-flash",
+            "cached": True
+        })
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+
+from chatbot.backend.utils.session_store import SessionStore, trim_messages
+
+class TestSessionStore(unittest.TestCase):
+
+    def test_sessions_are_isolated(self):
+        """Each session gets its own state, reused on later calls."""
+        store = SessionStore(list)
+        store.get("a").append("hello")
+        self.assertEqual(store.get("a"), ["hello"])
+        self.assertEqual(store.get("b"), [])
+
+    def test_lru_eviction(self):
+        """The least recently used session is evicted when the store is full."""
+        store = SessionStore(list, max_sessions=2)
+        store.get("a").append(1)
+        store.get("b")
+        store.get("a")
+        store.get("c")
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get("a"), [1])
+        self.assertEqual(store.get_stats()["evictions"], 1)
+
+    def test_idle_sessions_expire(self):
+        """Sessions idle for longer than the TTL start over."""
+        store = SessionStore(list, ttl_seconds=10)
+        with patch("chatbot.backend.utils.session_store.time.monotonic", return_value=100):
+            store.get("a").append(1)
+        with patch("chatbot.backend.utils.session_store.time.monotonic", return_value=111):
+            self.assertEqual(store.get("a"), [])
+
+    def test_reset(self):
+        """Resetting a session drops its state."""
+        store = SessionStore(list)
+        store.get("a").append(1)
+        store.reset("a")
+        self.assertEqual(store.get("a"), [])
+
+class TestTrimMessages(unittest.TestCase):
+
+    def test_keeps_prefix_and_recent_pairs(self):
+        """The prefix survives and recent messages are kept in whole exchanges."""
+        messages = ["system"] + [f"{role}{i}" for i in range(5) for role in ("user", "assistant")]
+        trimmed = trim_messages(messages, 6, keep_first=1)
+        self.assertEqual(trimmed, ["system", "user3", "assistant3", "user4", "assistant4"])
+
+    def test_short_conversations_untouched(self):
+        """Conversations within the cap are returned as-is."""
+        messages = ["system", "user0", "assistant0"]
+        self.assertIs(trim_messages(messages, 10, keep_first=1), messages)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import unittest
+
+from chatbot.backend.services.single_flight import StreamCoalescer
+
+class TestStreamCoalescer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.coalescer = StreamCoalescer()
+        self.upstream_calls = 0
+
+    def upstream(self, delay=0.01):
+        async def stream():
+            self.upstream_calls += 1
+            for i in range(3):
+                await asyncio.sleep(delay)
+                yield {"type": "content", "text": str(i)}
+            yield {"type": "complete", "text": "012"}
+        return stream()
+
+    async def collect(self, key):
+        return [chunk async for chunk in self.coalescer.stream(key, self.upstream)]
+
+    async def test_concurrent_identical_requests_share_upstream(self):
+        """Identical concurrent requests make one upstream call and see the same chunks."""
+        key = StreamCoalescer.make_key("gemini-2.5-flash", "hi", [])
+        results = await asyncio.gather(*(self.collect(key) for _ in range(3)))
+
+        self.assertEqual(self.upstream_calls, 1)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertEqual(self.coalescer.get_stats(), {"leaders": 1, "followers": 2, "in_flight": 0})
+
+    async def test_different_keys_do_not_share(self):
+        """Different prompts or contexts run separately."""
+        key_a = StreamCoalescer.make_key("gemini-2.5-flash", "hi", [])
+        key_b = StreamCoalescer.make_key("gemini-2.5-flash", "hi", [{"role": "user", "content": "earlier"}])
+        await asyncio.gather(self.collect(key_a), self.collect(key_b))
+        self.assertEqual(self.upstream_calls, 2)
+
+    async def test_late_joiner_gets_full_stream(self):
+        """A follower that joins mid-stream still receives the chunks already produced."""
+        key = "k"
+        leader = asyncio.ensure_future(self.collect(key))
+        await asyncio.sleep(0.015)
+        follower = await self.collect(key)
+        self.assertEqual(follower, await leader)
+        self.assertEqual(self.upstream_calls, 1)
+
+    async def test_followers_on_other_event_loops(self):
+        """Requests served by other threads with their own event loops are coalesced too."""
+        key = "k"
+        leader = asyncio.ensure_future(self.collect(key))
+        await asyncio.sleep(0)
+        results = []
+
+        def follower():
+            loop = asyncio.new_event_loop()
+            try:
+                results.append(loop.run_until_complete(self.collect(key)))
+            finally:
+                loop.close()
+
+        thread = threading.Thread(target=follower)
+        thread.start()
+        leader_chunks = await leader
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+        self.assertEqual(results, [leader_chunks])
+        self.assertEqual(self.upstream_calls, 1)
+
+    async def test_call_shares_result(self):
+        """Awaitable calls are coalesced and every caller gets the same result."""
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "answer", "gemini-2.5-flash"
+
+        results = await asyncio.gather(*(self.coalescer.call("k", generate) for _ in range(3)))
+        self.assertEqual(calls, 1)
+        self.assertEqual(set(results), {("answer", "gemini-2.5-flash")})
+
+if __name__ == '__main__':
+    unittest.main()
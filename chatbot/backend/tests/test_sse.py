@@ -0,0 +1,38 @@
+import unittest
+
+from chatbot.backend.services.sse import SSEParser, parse_completion_delta
+
+class TestSSEParser(unittest.TestCase):
+
+    def test_events_split_across_chunks(self):
+        """Events split at arbitrary byte boundaries, including inside UTF-8 sequences, are reassembled."""
+        payload = 'data: {"choices": [{"delta": {"content": "hé"}}]}\n\ndata: [DONE]\n\n'.encode("utf-8")
+        parser = SSEParser()
+        events = []
+        for i in range(len(payload)):
+            events.extend(parser.feed(payload[i:i + 1]))
+
+        self.assertEqual([event["data"] for event in events], ['{"choices": [{"delta": {"content": "hé"}}]}', "[DONE]"])
+        self.assertEqual(parse_completion_delta(events[0]["data"]), "hé")
+
+    def test_crlf_comments_and_multiline_data(self):
+        """CRLF line endings, comments, event names and multi-line data follow the SSE spec."""
+        parser = SSEParser()
+        events = parser.feed(b": keep-alive\r\nevent: update\r\ndata: a\r\ndata: b\r")
+        self.assertEqual(events, [])
+        events = parser.feed(b"\n\r\n")
+        self.assertEqual(events, [{"event": "update", "data": "a\nb", "id": None}])
+
+    def test_close_flushes_unterminated_event(self):
+        """An event cut off by the end of the stream is still delivered."""
+        parser = SSEParser()
+        self.assertEqual(parser.feed(b"data: last"), [])
+        self.assertEqual([event["data"] for event in parser.close()], ["last"])
+
+    def test_delta_without_content(self):
+        """Role-only and malformed chunks carry no text."""
+        self.assertIsNone(parse_completion_delta('{"choices": [{"delta": {"role": "assistant"}}]}'))
+        self.assertIsNone(parse_completion_delta("not json"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from chatbot.backend.services.tool_index import ToolIndex, tokenize
+
+TOOLS = [
+    {"name": "gmail_send_email", "description": "Send an email message", "parameters": ["to", "subject", "body"]},
+    {"name": "gmail_find_email", "description": "Find an email by search query", "parameters": ["query"]},
+    {"name": "zoom_create_meeting", "description": "Schedule a new meeting", "parameters": ["topic", "start_time"]},
+    {"name": "google_drive_find_a_file", "description": "Search for a file by name", "parameters": ["title"]},
+    {"name": "notion_create_page", "description": "Create a page", "parameters": ["title", "content"]},
+]
+
+class TestToolIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ToolIndex(TOOLS)
+
+    def names(self, query, k=3):
+        return [tool["name"] for tool, _ in self.index.search(query, k)]
+
+    def test_tokenize(self):
+        """Underscores split words, stopwords are dropped and plurals are folded."""
+        self.assertEqual(tokenize("Find my emails in google_drive"), ["find", "email", "google", "drive"])
+
+    def test_ranks_relevant_tools_first(self):
+        """Name and description matches rank the right tools at the top."""
+        self.assertEqual(self.names("please send an email to bob", k=1), ["gmail_send_email"])
+        self.assertEqual(self.names("schedule a zoom meeting tomorrow", k=1), ["zoom_create_meeting"])
+        self.assertEqual(set(self.names("find emails from sarah", k=2)), {"gmail_find_email", "gmail_send_email"})
+
+    def test_unrelated_queries_select_nothing(self):
+        """Messages sharing no terms with the catalog select no tools."""
+        self.assertEqual(self.index.search("what is the derivative of x squared"), [])
+        self.assertEqual(self.index.get_stats()["empty_queries"], 1)
+
+    def test_hit_rate(self):
+        """Used tools are counted as hits when they were offered in the prompt."""
+        selected = self.names("send an email")
+        self.index.record_usage("gmail_send_email", selected)
+        self.index.record_usage("notion_create_page", selected)
+        stats = self.index.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from chatbot.backend.services.mcp.tool_policy import catalog_services, is_read_only_tool, tool_service
+
+class TestIsReadOnlyTool(unittest.TestCase):
+
+    def test_lookups_are_read_only(self):
+        """Find, search, get and list tools are safe to speculate."""
+        for name in ("gmail_find_email", "google_drive_find_a_file", "google_calendar_list_events", "notion_get_page"):
+            self.assertTrue(is_read_only_tool(name), name)
+
+    def test_side_effects_are_never_read_only(self):
+        """Send/create tools and mixed names such as find-or-create are excluded."""
+        for name in ("gmail_send_email", "zoom_create_meeting", "google_contacts_find_or_create_contact",
+                     "gmail_add_label_to_email", "google_drive_upload_file"):
+            self.assertFalse(is_read_only_tool(name), name)
+
+    def test_unknown_verbs_are_not_read_only(self):
+        """Tools without a recognised read verb are treated as side-effecting."""
+        self.assertFalse(is_read_only_tool("pdf_convert_document"))
+        self.assertFalse(is_read_only_tool("google_drive_searchable"))
+
+class TestToolService(unittest.TestCase):
+
+    def test_service_is_the_prefix_before_the_verb(self):
+        """Multi-word services keep every token before the first verb."""
+        self.assertEqual(tool_service("google_drive_find_a_file"), "google_drive")
+        self.assertEqual(tool_service("gmail_send_email"), "gmail")
+        self.assertEqual(tool_service("google_calendar_list_events"), "google_calendar")
+
+    def test_unknown_verbs_use_the_first_token(self):
+        """Names without a known verb fall back to their first token."""
+        self.assertEqual(tool_service("pdf_convert_document"), "pdf")
+
+    def test_known_services_take_the_longest_prefix(self):
+        """With the catalog's services, a tool belongs to the longest one prefixing its name."""
+        services = catalog_services(["google_calendar_find_event", "google_calendar_quick_add_event",
+                                     "google_drive_find_a_file", "gmail_send_email"])
+        self.assertEqual(services, {"google_calendar", "google_drive", "gmail"})
+        self.assertEqual(tool_service("google_calendar_quick_add_event", services), "google_calendar")
+        self.assertEqual(tool_service("google_calendar_quick_add_event", {"google", "google_calendar"}),
+                         "google_calendar")
+
+if __name__ == "__main__":
+    unittest.main()
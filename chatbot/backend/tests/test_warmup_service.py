@@ -0,0 +1,87 @@
+import unittest
+
+from chatbot.backend.services.warmup_service import WarmupService
+
+class FakeGeminiService:
+    """Stands in for GeminiService; records what was warmed up."""
+
+    MODELS = {"gemini-2.5-flash": "flash", "gemini-2.5-pro": "pro"}
+
+    def __init__(self):
+        self.warmed_models = []
+        self.connections = 0
+
+    def warm_up_model(self, model_name, probe=False):
+        self.warmed_models.append((model_name, probe))
+        return {"status": "ready", "probed": probe}
+
+    def warm_up(self):
+        self.connections += 1
+        return {"status": "ready"}
+
+class FakeProvider:
+    """Stands in for an OpenAI-compatible provider service."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.connections = 0
+
+    def warm_up(self):
+        self.connections += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        return {"status": "ready"}
+
+class TestWarmupService(unittest.TestCase):
+
+    def setUp(self):
+        self.gemini = FakeGeminiService()
+        self.nvidia = FakeProvider()
+
+    def test_warms_every_target_including_the_gemini_connection(self):
+        """Without a probe, models are created and the Gemini connection is still opened."""
+        other = FakeProvider()
+        warmup = WarmupService(self.gemini, self.nvidia, providers={"openrouter": other})
+        warmup.run()
+
+        state = warmup.get_state()
+        self.assertEqual(state["status"], "complete")
+        self.assertEqual(sorted(state["steps"]), ["gemini:connection", "gemini:gemini-2.5-flash",
+                                                  "gemini:gemini-2.5-pro", "nvidia:connection",
+                                                  "openrouter:connection"])
+        self.assertEqual(self.gemini.warmed_models, [("gemini-2.5-flash", False), ("gemini-2.5-pro", False)])
+        self.assertEqual((self.gemini.connections, self.nvidia.connections, other.connections), (1, 1, 1))
+
+    def test_probes_replace_the_connection_step(self):
+        """Probing each model already opens the connection, so no separate step runs."""
+        warmup = WarmupService(self.gemini, self.nvidia, probe=True)
+        warmup.run()
+
+        self.assertNotIn("gemini:connection", warmup.get_state()["steps"])
+        self.assertEqual(self.gemini.connections, 0)
+        self.assertTrue(all(probe for _, probe in self.gemini.warmed_models))
+
+    def test_failed_steps_degrade_without_stopping_the_rest(self):
+        """A failing step is recorded and the remaining steps still run."""
+        other = FakeProvider()
+        warmup = WarmupService(self.gemini, FakeProvider(error="connection refused"), providers={"openrouter": other})
+        warmup.run()
+
+        state = warmup.get_state()
+        self.assertEqual(state["status"], "degraded")
+        self.assertEqual(state["steps"]["nvidia:connection"], {"status": "failed", "error": "connection refused"})
+        self.assertEqual(other.connections, 1)
+        self.assertIsNotNone(state["finished_at"])
+
+    def test_start_runs_once_in_the_background(self):
+        """start() runs the warm-up in a thread; starting again does nothing."""
+        warmup = WarmupService(self.gemini, self.nvidia)
+        self.assertFalse(warmup.wait(0))
+        warmup.start()
+        warmup.start()
+
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual(self.nvidia.connections, 1)
+
+if __name__ == "__main__":
+    unittest.main()
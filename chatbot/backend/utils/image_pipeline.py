@@ -0,0 +1,217 @@
+"""
+Image preprocessing for vision model requests.
+"""
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it only small images can be sent
+    Image = None
+    ImageOps = None
+
+# Bytes read per step when hashing or encoding; a multiple of 3 so base64 chunks join without padding
+CHUNK_SIZE = 3 * 16 * 1024
+
+# Formats vision models accept as-is
+PASSTHROUGH_MIME_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
+
+class ImageProcessingError(ValueError):
+    """Raised when an image cannot be made to fit the provider limit."""
+
+def base64_length(size):
+    """
+    Get the length of the base64 encoding of a number of bytes.
+
+    Args:
+        size (int): The number of raw bytes.
+
+    Returns:
+        int: The number of base64 characters.
+    """
+    return 4 * ((size + 2) // 3)
+
+def encode_base64(stream, chunk_size=CHUNK_SIZE):
+    """
+    Base64-encode a binary stream chunk by chunk.
+
+    Args:
+        stream: A readable binary file object.
+        chunk_size (int): Bytes read per step. Must be a multiple of 3.
+
+    Returns:
+        str: The base64 text.
+    """
+    if chunk_size % 3:
+        raise ValueError("chunk_size must be a multiple of 3")
+
+    output = io.StringIO()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        output.write(base64.b64encode(chunk).decode("ascii"))
+    return output.getvalue()
+
+class ImagePipeline:
+    """Downsamples and re-encodes images to fit a provider's inline size limit."""
+
+    def __init__(self, cache_dir, max_base64_bytes=180_000, max_dimension=1568, min_dimension=256,
+                 qualities=(85, 75, 60, 45), max_cache_entries=256):
+        """
+        Initialize the image pipeline.
+
+        Args:
+            cache_dir (str): Directory processed images are cached in, keyed by content hash.
+            max_base64_bytes (int): Largest base64 payload the provider accepts.
+            max_dimension (int): Longest side of a processed image, in pixels.
+            min_dimension (int): Smallest longest side tried before giving up.
+            qualities (tuple): JPEG qualities tried at each size, best first.
+            max_cache_entries (int): Maximum number of processed images kept on disk.
+        """
+        self.cache_dir = cache_dir
+        self.max_base64_bytes = max_base64_bytes
+        self.max_dimension = max_dimension
+        self.min_dimension = min_dimension
+        self.qualities = qualities
+        self.max_cache_entries = max_cache_entries
+        self.stats = {"passthrough": 0, "cache_hits": 0, "processed": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def to_data_uri(self, image_path):
+        """
+        Get a data URI for an image that fits the provider limit.
+
+        Small images in a supported format are sent unchanged; larger ones are
+        downsampled and re-encoded as JPEG, and the result is cached.
+
+        Args:
+            image_path (str): Path to the image file.
+
+        Returns:
+            str: The data URI.
+
+        Raises:
+            ImageProcessingError: If the image cannot be decoded or made small enough.
+        """
+        mime_type = mimetypes.guess_type(image_path)[0]
+        if mime_type in PASSTHROUGH_MIME_TYPES and base64_length(os.path.getsize(image_path)) <= self.max_base64_bytes:
+            self._count("passthrough")
+            return self._data_uri(image_path, mime_type)
+
+        cache_path = os.path.join(self.cache_dir, f"{self._cache_key(image_path)}.jpg")
+        if os.path.exists(cache_path):
+            self._count("cache_hits")
+            os.utime(cache_path)
+            return self._data_uri(cache_path, "image/jpeg")
+
+        if Image is None:
+            self._count("failed")
+            raise ImageProcessingError(
+                f"Image is too large. Please use an image smaller than {self.max_base64_bytes * 3 // 4 // 1000}KB."
+            )
+
+        data = self._process(image_path)
+        self._store(cache_path, data)
+        self._count("processed")
+        return self._data_uri(cache_path, "image/jpeg")
+
+    def get_stats(self):
+        """
+        Get pipeline statistics.
+
+        Returns:
+            dict: Counters of passthrough, cached, processed and failed images.
+        """
+        with self._lock:
+            return dict(self.stats)
+
+    def _cache_key(self, image_path):
+        """Hash the image content together with the settings that shape the output."""
+        digest = hashlib.sha256()
+        digest.update(f"{self.max_base64_bytes}:{self.max_dimension}:{self.qualities}".encode("utf-8"))
+        with open(image_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _process(self, image_path):
+        """
+        Decode, downsample and re-encode an image until it fits the limit.
+
+        Args:
+            image_path (str): Path to the image file.
+
+        Returns:
+            bytes: The JPEG data.
+        """
+        try:
+            with Image.open(image_path) as image:
+                # Let the JPEG decoder downscale while decoding instead of materialising full resolution
+                image.draft("RGB", (self.max_dimension, self.max_dimension))
+                image = ImageOps.exif_transpose(image)
+                image = self._flatten(image)
+        except Exception as e:
+            self._count("failed")
+            raise ImageProcessingError(f"Could not read the image: {e}")
+
+        # The first sweep runs at the image's own size even when it is under min_dimension
+        dimension = min(self.max_dimension, max(image.size))
+        while True:
+            resized = image.copy()
+            resized.thumbnail((dimension, dimension), Image.LANCZOS)
+
+            for quality in self.qualities:
+                buffer = io.BytesIO()
+                resized.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+                if base64_length(buffer.tell()) <= self.max_base64_bytes:
+                    return buffer.getvalue()
+
+            dimension = int(dimension * 0.75)
+            if dimension < self.min_dimension:
+                break
+
+        self._count("failed")
+        raise ImageProcessingError("Image could not be compressed enough for the vision model.")
+
+    @staticmethod
+    def _flatten(image):
+        """Convert to RGB, compositing any transparency onto white."""
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            return background
+        return image.convert("RGB")
+
+    def _store(self, cache_path, data):
+        """Write a processed image atomically and prune the oldest cache entries."""
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, cache_path)
+
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".jpg")]
+        if len(entries) > self.max_cache_entries:
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:len(entries) - self.max_cache_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _data_uri(self, path, mime_type):
+        """Build a data URI by streaming the file through the base64 encoder."""
+        with open(path, "rb") as f:
+            return f"data:{mime_type};base64,{encode_base64(f)}"
+
+    def _count(self, key):
+        """Increment a counter."""
+        with self._lock:
+            self.stats[key] += 1
@@ -0,0 +1,113 @@
+"""
+Bounded per-session state for the legacy chat services.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class SessionStore:
+    """Thread-safe map of session IDs to state with LRU and idle-TTL eviction."""
+
+    def __init__(self, factory, max_sessions=1000, ttl_seconds=3600):
+        """
+        Initialize the session store.
+
+        Args:
+            factory (callable): Creates the state for a new session.
+            max_sessions (int): Maximum number of sessions kept; the least recently used is evicted.
+            ttl_seconds (float): Sessions idle for longer than this are evicted.
+        """
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sessions = OrderedDict()
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """
+        Get the state of a session, creating it if necessary.
+
+        Args:
+            session_id (str): The session ID.
+
+        Returns:
+            The session's state.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_expired(now)
+
+            if session_id in self.sessions:
+                state, _ = self.sessions.pop(session_id)
+            else:
+                state = self.factory()
+
+            self.sessions[session_id] = (state, now)
+
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.evictions += 1
+
+            return state
+
+    def reset(self, session_id):
+        """
+        Drop the state of a session.
+
+        Args:
+            session_id (str): The session ID.
+        """
+        with self._lock:
+            self.sessions.pop(session_id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.sessions)
+
+    def get_stats(self):
+        """
+        Get store statistics.
+
+        Returns:
+            dict: The number of live sessions, the limits and the eviction count.
+        """
+        with self._lock:
+            return {
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions
+            }
+
+    def _evict_expired(self, now):
+        """Evict sessions idle for longer than the TTL. The caller must hold the lock."""
+        # The dict is ordered by last use, so expired sessions are at the front
+        while self.sessions:
+            session_id, (_, last_used) = next(iter(self.sessions.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            del self.sessions[session_id]
+            self.evictions += 1
+
+def trim_messages(messages, max_messages, keep_first=0):
+    """
+    Keep a leading prefix and the most recent exchanges of a conversation.
+
+    Recent messages are kept in whole user/assistant pairs so the trimmed
+    conversation still alternates roles after the prefix.
+
+    Args:
+        messages (list): The conversation messages, oldest first, ending with an assistant turn.
+        max_messages (int): Maximum number of messages to keep, including the prefix.
+        keep_first (int): Number of leading messages (system prompt, priming turns) always kept.
+
+    Returns:
+        list: The trimmed messages.
+    """
+    if len(messages) <= max_messages:
+        return messages
+
+    recent = max(max_messages - keep_first, 0) // 2 * 2
+    return messages[:keep_first] + (messages[-recent:] if recent else [])